@@ -0,0 +1,122 @@
+#   SPDX-License-Identifier: Apache-2.0
+# © Copyright Ecosteer 2024
+
+#   ver:    1.0
+#   date:   18/10/2026
+
+"""
+In-process cache of the authentication lookups (session, auth_token) -> (Session, User).
+
+The entries live for a short TTL (well below DopUtils.MAX_AGE) and the cache is
+bounded (least recently used entries are evicted first). The persistence provider
+invalidates the entries of a session (or of a user) when they are updated or
+deleted; the TTL bounds the staleness of the entries modified by other processes.
+"""
+
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional, Tuple
+
+from common.python.model.models import Session, User
+
+
+class AuthCache:
+
+    DEFAULT_SIZE = 4096
+    DEFAULT_TTL = 15      # seconds
+
+    def __init__(self, max_size: int = DEFAULT_SIZE, ttl_s: float = DEFAULT_TTL):
+        self._max_size = max_size
+        self._ttl_s = ttl_s
+        self._lock = Lock()
+        self._entries = OrderedDict()   # (session, token) -> (expires_at, Session, User)
+        self._by_session = {}           # Session.id -> set of keys
+        self._by_user = {}              # User.id -> set of keys
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl_s
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _unindex(self, index: dict, ref, key):
+        keys = index.get(ref, None)
+        if keys is None:
+            return
+        keys.discard(key)
+        if len(keys) == 0:
+            del index[ref]
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        _, session_obj, user = entry
+        self._unindex(self._by_session, session_obj.id, key)
+        self._unindex(self._by_user, user.id, key)
+
+    def get(self, session: str, token: str) -> Optional[Tuple[Session, User]]:
+        key = (session, token)
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is None:
+                return None
+            expires_at, session_obj, user = entry
+            if time.monotonic() >= expires_at:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return session_obj, user
+
+    def get_session(self, session: str, token: str) -> Optional[Session]:
+        entry = self.get(session, token)
+        return None if entry is None else entry[0]
+
+    def put(self, session: str, token: str, session_obj: Session, user: User):
+        key = (session, token)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + self._ttl_s, session_obj, user)
+            self._by_session.setdefault(session_obj.id, set()).add(key)
+            self._by_user.setdefault(user.id, set()).add(key)
+            while len(self._entries) > self._max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_session(self, session_id):
+        with self._lock:
+            for key in list(self._by_session.get(session_id, ())):
+                self._remove(key)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in list(self._by_user.get(user_id, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_session.clear()
+            self._by_user.clear()
+
+
+_shared_lock = Lock()
+_shared = {}
+
+
+def shared_auth_cache(max_size: int = AuthCache.DEFAULT_SIZE, ttl_s: float = AuthCache.DEFAULT_TTL) -> AuthCache:
+    """
+    Return the cache shared by all the persistence providers of the process
+    configured with the same size and TTL (e.g. the providers of the execution lanes)
+    """
+    with _shared_lock:
+        cache = _shared.get((max_size, ttl_s), None)
+        if cache is None:
+            cache = AuthCache(max_size, ttl_s)
+            _shared[(max_size, ttl_s)] = cache
+        return cache
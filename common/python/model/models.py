@@ -6,6 +6,8 @@
 #   date:       18/01/2024
 
  
+import json
+from operator import attrgetter
 from typing import Optional
 
 from numpy import int32 
@@ -16,6 +18,7 @@ class TableName:
     PRODUCT = 'product'
 
     TRANSACTION = 'blk_transaction'
+    OUTBOX = 'blk_outbox'
     SESSION = 'session'
     TOKEN = 'token'                            
     PROPERTY = 'property'
@@ -31,17 +34,88 @@ class TableName:
 
  
 
+def _dump_str(value):
+    return value if value is None else str(value)
+
+
+def _dump_int(value):
+    return value if value is None else int(value)
+
+
+def _dump_bool(value):
+    return value if value is None else bool(value)
+
+
+def _dump_datetime(value):
+    # isoformat, as the DateTime fields of the schemas
+    return value if value is None or isinstance(value, str) else value.isoformat()
+
+
+def _dump_native(value):
+    return value
+
+
+_DICT_DUMPERS = {'str': _dump_str, 'int': _dump_int, 'bool': _dump_bool, 'datetime': _dump_datetime}
+# the row keeps the datetime values as they are (they are bound as SQL parameters)
+_ROW_DUMPERS = dict(_DICT_DUMPERS, datetime=_dump_native)
+
+
 class Model(object):
+    """
+    The models keep their attributes in __slots__ (no per-instance __dict__).
+    _columns lists the persisted attributes with their kind, as the fields of
+    the model schema in schemas.py: to_dict and to_row are generated from it
+    and replace the schema dump on the hot paths (the schemas are left to the
+    validation of the input).
+    """
+    __slots__ = ()
+    _columns = ()       # ((attribute, 'str' | 'int' | 'bool' | 'datetime'), ...)
+
     def __init__(self,
                  **kargs):
         pass
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        names = tuple(name for name, _ in cls._columns)
+        cls._column_names = names
+        cls._dict_dumpers = tuple(_DICT_DUMPERS[kind] for _, kind in cls._columns)
+        cls._row_dumpers = tuple(_ROW_DUMPERS[kind] for _, kind in cls._columns)
+        if len(names) > 1:
+            cls._get_columns = attrgetter(*names)
+        else:
+            cls._get_columns = lambda obj: tuple(getattr(obj, name) for name in names)
+
+    def to_dict(self) -> dict:
+        """
+        The persisted attributes, JSON serializable (same output of the schema dump)
+        """
+        return {name: dump(value) for name, dump, value in
+                zip(self._column_names, self._dict_dumpers, self._get_columns(self))}
+
+    def to_row(self) -> dict:
+        """
+        The persisted attributes as column values of the table of the model
+        """
+        return {name: dump(value) for name, dump, value in
+                zip(self._column_names, self._row_dumpers, self._get_columns(self))}
+
     @classmethod
     def table_name(cls):
         raise NotImplementedError
 
 
 class User(Model):
+    __slots__ = (
+        'id', 'username', 'name', 'password',
+        'blk_address', 'blk_password', 'is_admin', 'recipient',
+    )
+    _columns = (
+        ('id', 'str'), ('username', 'str'), ('name', 'str'),
+        ('blk_address', 'str'), ('blk_password', 'str'), ('password', 'str'),
+        ('is_admin', 'bool'), ('recipient', 'str'),
+    )
+
     def __init__(self,
                  *,
                  id: Optional[str] = None,
@@ -66,6 +140,24 @@ class User(Model):
 
 
 class Product(Model):
+    __slots__ = (
+        'id', 'label', 'tariff_price', 'tariff_period',
+        'data_origin_id', 'publisher', 'secret', 'latitude',
+        'longitude', 'elevation', 'address', 'city',
+        'height', 'status', 'sensor_type', 'notes',
+        'blk_address', 'connstring_protocol', 'connstring_hostname', 'connstring_port',
+        'created_at', 'blk_specific',
+    )
+    _columns = (
+        ('id', 'str'), ('sensor_type', 'str'), ('notes', 'str'),
+        ('latitude', 'str'), ('longitude', 'str'), ('connstring_port', 'str'),
+        ('connstring_protocol', 'str'), ('connstring_hostname', 'str'), ('city', 'str'),
+        ('address', 'str'), ('height', 'int'), ('status', 'int'),
+        ('label', 'str'), ('tariff_price', 'int'), ('tariff_period', 'int'),
+        ('publisher', 'str'), ('secret', 'str'), ('blk_address', 'str'),
+        ('blk_specific', 'str'), ('data_origin_id', 'str'),
+    )
+
     STATUS_CANCELLED = 0
     STATUS_CREATED = 1
     STATUS_PUBLISHED = 2
@@ -122,6 +214,15 @@ class Product(Model):
 
 
 class Transaction(Model):
+    __slots__ = (
+        'event_name', 'client', 'hash', 'task',
+        'params', 'id', 'uuid',
+    )
+    _columns = (
+        ('id', 'int'), ('hash', 'str'), ('client', 'str'),
+        ('event_name', 'str'), ('params', 'str'), ('task', 'str'),
+        ('uuid', 'str'),
+    )
 
     def __init__(self,
                  *,
@@ -144,7 +245,74 @@ class Transaction(Model):
     def table_name(cls): return TableName.TRANSACTION
 
 
+class OutboxTransaction(Model):
+    """
+    The contract call of a write processor (a function of the blockchain provider,
+    with its arguments as a JSON list), sent by the submitter component: once the
+    transaction is signed (or sent) the submitter saves the Transaction
+    (event_name, client, task, params, uuid) with its hash
+    """
+    PENDING = 0
+    SIGNED = 1
+    SENT = 2
+    FAILED = 3
+    CALLING = 4     # the node is being called (without use_pk): not claimed again
+
+    __slots__ = (
+        'contract_function', 'contract_args', 'event_name', 'client',
+        'task', 'params', 'id', 'uuid',
+    )
+    _columns = (
+        ('id', 'int'), ('contract_function', 'str'), ('contract_args', 'str'),
+        ('event_name', 'str'), ('client', 'str'), ('params', 'str'),
+        ('task', 'str'), ('uuid', 'str'),
+    )
+
+    def __init__(self,
+                 *,
+                 contract_function: str,
+                 contract_args: str,
+                 event_name: str,
+                 client: str,
+                 task: Optional[str] = None,
+                 params: Optional[str] = None,
+                 id: Optional[int] = None,
+                 uuid: Optional[str] = None):
+        self.contract_function = contract_function
+        self.contract_args = contract_args
+        self.event_name = event_name
+        self.client = client
+        self.task = task
+        self.params = params
+        self.id = id
+        self.uuid = uuid
+
+    @classmethod
+    def of(cls, transaction: Transaction, contract_function: str, args: list):
+        # the call whose transaction is saved as transaction (without hash)
+        return cls(contract_function=contract_function,
+                   contract_args=json.dumps(args),
+                   event_name=transaction.event_name,
+                   client=transaction.client,
+                   task=transaction.task,
+                   params=transaction.params,
+                   uuid=transaction.uuid)
+
+    @classmethod
+    def table_name(cls): return TableName.OUTBOX
+
+
 class Session(Model):
+    __slots__ = (
+        'client', 'value', 'token', 'status',
+        'created_at', 'updated_at', 'last_updated', 'id',
+    )
+    _columns = (
+        ('id', 'int'), ('client', 'str'), ('value', 'str'),
+        ('status', 'int'), ('token', 'str'), ('created_at', 'datetime'),
+        ('updated_at', 'datetime'), ('last_updated', 'datetime'),
+    )
+
     def __init__(self, *,
                  client: str,
                  value: str,
@@ -167,6 +335,16 @@ class Session(Model):
     def table_name(cls): return TableName.SESSION
 
 class EncryptedSession(Model):
+    __slots__ = (
+        'id', 'session_id', 'cipher_name', 'cipher_mode',
+        'cipher_keylength', 'key', 'encoding', 'integrity_fun',
+    )
+    _columns = (
+        ('id', 'int'), ('session_id', 'int'), ('cipher_name', 'str'),
+        ('cipher_mode', 'str'), ('cipher_keylength', 'int'), ('key', 'str'),
+        ('encoding', 'str'), ('integrity_fun', 'str'),
+    )
+
     def __init__(self, 
                 *,
                 id: Optional[int] = None, # for the creation of the object before having it in the db
@@ -191,6 +369,17 @@ class EncryptedSession(Model):
 
 
 class ProductSubscription(Model): 
+    __slots__ = (
+        'id', 'subscriber', 'subscriber_secret', 'product',
+        'purpose_id', 'created_at', 'granted', 'pending',
+        'blk_address',
+    )
+    _columns = (
+        ('id', 'str'), ('subscriber', 'str'), ('subscriber_secret', 'str'),
+        ('product', 'str'), ('purpose_id', 'str'), ('created_at', 'datetime'),
+        ('granted', 'int'), ('pending', 'bool'), ('blk_address', 'str'),
+    )
+
     def __init__(
             self, 
             *,
@@ -218,6 +407,14 @@ class ProductSubscription(Model):
     def table_name(cls): return TableName.PRODUCT_SUBSCRIPTION
 
 class PurposeOfUsage(Model):
+    __slots__ = (
+        'id', 'subscriber', 'label', 'url',
+    )
+    _columns = (
+        ('id', 'str'), ('subscriber', 'str'), ('label', 'str'),
+        ('url', 'str'),
+    )
+
     def __init__(self, 
                  *, 
                  id: str,
@@ -235,6 +432,13 @@ class PurposeOfUsage(Model):
 
 
 class PropertyProduct(Model):
+    __slots__ = (
+        'id', 'property', 'product',
+    )
+    _columns = (
+        ('id', 'int'), ('property', 'int'), ('product', 'str'),
+    )
+
     def __init__(self,
                  *,
                  id: Optional[int] = None,
@@ -249,6 +453,13 @@ class PropertyProduct(Model):
 
 
 class Property(Model):
+    __slots__ = (
+        'id', 'property_value', 'property_name',
+    )
+    _columns = (
+        ('id', 'int'), ('property_name', 'str'), ('property_value', 'str'),
+    )
+
     def __init__(self,
                  *,
                  id: Optional[int] = None,
@@ -262,6 +473,13 @@ class Property(Model):
     def table_name(cls): return TableName.PROPERTY
 
 class ProductUsage(Model):
+    __slots__ = (
+        'id', 'product_id', 'account_id', 'usage',
+    )
+    _columns = (
+        ('id', 'int'), ('product_id', 'str'), ('account_id', 'str'),
+        ('usage', 'int'),
+    )
 
     def __init__(self, 
                 *, 
@@ -282,6 +500,13 @@ class ProductUsage(Model):
 
 
 class AccountRole(Model):
+    __slots__ = (
+        'id', 'account_id', 'role',
+    )
+    _columns = (
+        ('id', 'int'), ('account_id', 'str'), ('role', 'str'),
+    )
+
     def __init__(self, 
                 *, 
                 id: Optional[int] = None, 
@@ -31,6 +31,16 @@ class TransactionSchema(Schema):
     uuid = fields.Str()
 
  
+class OutboxTransactionSchema(Schema):
+    id = fields.Int()
+    contract_function = fields.Str(required=True)
+    contract_args = fields.Str(required=True)
+    event_name = fields.Str(required=True)
+    client = fields.Str(required=True)
+    params = fields.Str()
+    task = fields.Str()
+    uuid = fields.Str()
+
 class SessionSchema(Schema):
     id = fields.Int()
     client = fields.Str(required=True)
@@ -34,6 +34,10 @@ class ProcessorEnvs:
             'data' :  PipelineMemory()  
         }
 
+        # notify(prop, event) -> DopError: set by the worker, notifies an event 
+        # before the end of the pipeline (None if the events can only be pushed)
+        self.__notify = None
+
     @property
     def resource_managers(self):
         return self.__resource_managers 
@@ -69,6 +73,14 @@ class ProcessorEnvs:
     def empty_data_stack(self): 
         self.__stack['data'] = PipelineMemory()
 
+    @property
+    def notify(self):
+        return self.__notify
+
+    @notify.setter
+    def notify(self, notify):
+        self.__notify = notify
+
     @property
     def db_provider(self):
         return self.__resource_managers.get('db_provider', None)
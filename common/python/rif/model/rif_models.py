@@ -19,6 +19,16 @@ class RifTableName(TableName):
 
 
 class RifAdvertisement(Model):
+    __slots__ = (
+        'id', 'ads_lock', 'description', 'purpose_id',
+        'partner_id', 'created_at', 'recipient_ads_id',
+    )
+    _columns = (
+        ('id', 'str'), ('ads_lock', 'str'), ('description', 'str'),
+        ('purpose_id', 'str'), ('partner_id', 'str'), ('recipient_ads_id', 'str'),
+        ('created_at', 'datetime'),
+    )
+
     def __init__(self, 
                  *, 
                  id: Optional[str] = None, 
@@ -44,6 +54,15 @@ class RifAdvertisement(Model):
     
     
 class RifAdvertisementInterest(Model):
+    __slots__ = (
+        'id', 'account_id', 'advertisement_id', 'accept',
+        'product_id', 'created_at',
+    )
+    _columns = (
+        ('id', 'str'), ('account_id', 'str'), ('advertisement_id', 'str'),
+        ('accept', 'bool'), ('product_id', 'str'), ('created_at', 'datetime'),
+    )
+
     def __init__(self, 
                  *, 
                  id: Optional[str] = None, 
@@ -68,6 +87,15 @@ class RifAdvertisementInterest(Model):
     
     
 class RifPrivateMessage(Model):
+    __slots__ = (
+        'id', 'lock', 'subscription_id', 'message',
+        'send_to', 'created_at',
+    )
+    _columns = (
+        ('id', 'str'), ('lock', 'str'), ('subscription_id', 'str'),
+        ('message', 'str'), ('send_to', 'str'), ('created_at', 'datetime'),
+    )
+
     def __init__(self, 
                  *, 
                  id: Optional[str] = None, 
@@ -90,6 +118,16 @@ class RifPrivateMessage(Model):
         return RifTableName.RIF_PRIVATE_MESSAGE
     
 class RifSubscriptionNews(Model):
+    __slots__ = (
+        'id', 'subscription_id', 'product_id', 'supplicant_id',
+        'purpose_id', 'action', 'send_to', 'created_at',
+    )
+    _columns = (
+        ('id', 'str'), ('subscription_id', 'str'), ('product_id', 'str'),
+        ('supplicant_id', 'str'), ('purpose_id', 'str'), ('action', 'int'),
+        ('send_to', 'str'), ('created_at', 'datetime'),
+    )
+
     def __init__(self, 
                  *, 
                  id: Optional[str] = None,  
@@ -116,6 +154,15 @@ class RifSubscriptionNews(Model):
         return RifTableName.RIF_SUBSCRIPTION_NEWS
 
 class DopNotification(Model):
+    __slots__ = (
+        'id', 'subscription_id', 'content', 'send_to',
+        'created_at',
+    )
+    _columns = (
+        ('id', 'str'), ('subscription_id', 'str'), ('content', 'str'),
+        ('send_to', 'str'), ('created_at', 'datetime'),
+    )
+
     def __init__(self, 
                  *, 
                  id: Optional[str] = None,  
@@ -245,6 +245,9 @@ class DopUtils:
 
     ERR_INSUFF_FUNDS = {"id": 841, "msg": "Cannot complete operation due to insufficient funds."}
 
+    ERR_TRANSACTION = {"id": 842, "msg": "The transaction could not be committed."}  # infrastructure, the request is retried
+    ERR_DB_UNAVAILABLE = {"id": 843, "msg": "The database is unavailable."}  # infrastructure, the request is requeued
+
     MAX_AGE = 43200
 
 
@@ -507,9 +510,15 @@ class DopUtils:
         return DopError()
 
     @staticmethod    
-    def is_session_expired(session) -> bool:
+    def is_session_expired(session, db = None) -> bool:
         now = datetime.datetime.utcnow()
-        difference = (now - session.last_updated).total_seconds()
+        last_updated = session.last_updated
+        if db is not None:
+            # a touch not yet written by the persistence provider (write-behind)
+            last_touch = db.session_last_touch(session.id)
+            if last_touch is not None and (last_updated is None or last_touch > last_updated):
+                last_updated = last_touch
+        difference = (now - last_updated).total_seconds()
         if difference > DopUtils.MAX_AGE:
             # expired
             return True
@@ -641,7 +650,7 @@ class DopUtils:
                     return [(event, err)]
                 
                 # Check that the session is not expired
-                if DopUtils.is_session_expired(session):
+                if DopUtils.is_session_expired(session, db):
                     # may also check if there is an encrypted_session linked to this session 
                     # if not, 0 rows are deleted
                     perr = db.delete_encrypted_session(session.id)
@@ -739,7 +748,7 @@ class DopUtils:
                         DopEvent.LOG)
                     event = DopEvent(response_header, payload)
                     return [(event, err)]
-                if DopUtils.is_session_expired(session):
+                if DopUtils.is_session_expired(session, db):
                     perr = db.delete_encrypted_session(session.id)
                     if perr.isError():
                         err = DopUtils.create_dop_error(DopUtils.ERR_PL_SESSION_1)
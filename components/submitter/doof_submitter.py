@@ -0,0 +1,288 @@
+#   SPDX-License-Identifier: Apache-2.0
+#   © Copyright Ecosteer 2024
+
+#   ver:    1.0
+#   date:   18/10/2026
+
+"""
+Submitter of the transactions of the outbox (blk_outbox).
+
+The write processors configured with "outbox": true save their contract calls
+in the outbox, within the transaction of their pipeline, instead of sending the
+transactions. The submitter claims the calls one at a time, oldest first
+(SELECT ... FOR UPDATE SKIP LOCKED), and:
+
+-   if the blockchain provider signs the transactions (use_pk), it signs the
+    transaction and saves, in one database transaction, the blk_transaction row
+    with its hash and the signed transaction (status signed); then it sends it.
+    A signed transaction is sent again, as it is, until the node accepts it (or
+    knows it already), thus a submitter restarted after a crash does not send
+    the call twice; if its nonce was used by another transaction, the call is
+    signed again;
+-   otherwise it sets the call as calling (status 4) and commits, then it calls
+    the function of the provider (the node signs) and saves the blk_transaction
+    row with the returned hash. A call the node signs cannot be sent again as it
+    is: the calling calls are not claimed again, thus a submitter stopped (or a
+    database failed) between the call and the save of its outcome leaves the
+    call calling, to be checked manually, instead of sending it twice.
+
+The failed attempts are retried with exponential backoff, maxattempts failed
+attempts set the call as failed (status 3). The arguments of the call are
+cleared once it is sent or failed.
+
+USAGE:  python doof_submitter.py configurationfile
+"""
+
+from inspect import currentframe, getframeinfo
+import json
+import signal
+import sys
+import time
+import traceback
+
+from common.python.error import DopError
+from common.python.utils import DopUtils
+from common.python.threads import DopStopEvent
+from common.python.model.models import OutboxTransaction, Transaction
+
+
+globalStopEvent = DopStopEvent()
+
+
+def progstop():
+    print('Exiting ...')
+    globalStopEvent.stop()
+
+def signalHandlerExit(signalNumber, frame):
+    progstop()
+
+def signalManagement():
+    signal.signal(signal.SIGTERM, signalHandlerExit)
+    signal.signal(signal.SIGINT, signalHandlerExit)
+    signal.signal(signal.SIGQUIT, signalHandlerExit)
+
+
+class Submitter:
+
+    DEFAULT_MAX_ATTEMPTS = 10
+    DEFAULT_RETRY_DELAY = 2         # seconds, doubled at every failed attempt
+    DEFAULT_MAX_RETRY_DELAY = 300   # seconds
+
+    def __init__(self, db_provider, blk_provider,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 retry_delay_s: int = DEFAULT_RETRY_DELAY,
+                 max_retry_delay_s: int = DEFAULT_MAX_RETRY_DELAY):
+        self._db = db_provider
+        self._blk = blk_provider
+        self._max_attempts = max(max_attempts, 1)
+        self._retry_delay_s = retry_delay_s
+        self._max_retry_delay_s = max(max_retry_delay_s, retry_delay_s)
+        self.submitted = 0
+        self.failed = 0
+
+    def _print(self, msg: str):
+        print(f"{int(time.time())} | {getframeinfo(currentframe()).filename} | {msg}", file=sys.stderr)
+        sys.stderr.flush()
+
+    def _retry_s(self, attempts: int) -> int:
+        return int(min(self._max_retry_delay_s, self._retry_delay_s * (2 ** min(attempts, 16))))
+
+    @staticmethod
+    def _transaction(outbox: dict, tx_hash: str) -> Transaction:
+        return Transaction(
+            hash=tx_hash,
+            event_name=outbox['event_name'],
+            client=str(outbox['client']),
+            task=outbox['task'],
+            params=outbox['params'],
+            uuid=None if outbox['uuid'] is None else str(outbox['uuid'])
+        )
+
+    def _attempt_failed(self, outbox: dict, err: DopError, status: int, tx_hash: str = None,
+                        raw_tx: str = None) -> DopError:
+        # status: the one of the outbox transaction if it is going to be retried
+        attempts = outbox['attempts'] + 1
+        error = f"{err.code} {err.msg}"
+        if attempts >= self._max_attempts:
+            self.failed += 1
+            self._print(f"outbox transaction {outbox['id']} ({outbox['contract_function']}, "\
+                        f"{outbox['event_name']}) failed after {attempts} attempts: {error}")
+            if tx_hash is not None:
+                # the signed transaction is not going to be sent
+                self._db.delete_transaction(tx_hash)
+                self._blk.release_transaction({'hash': tx_hash})
+            return self._db.update_outbox_transaction(outbox['id'], OutboxTransaction.FAILED, error=error)
+        return self._db.update_outbox_transaction(outbox['id'], status, tx_hash, raw_tx, error,
+                                                  self._retry_s(attempts - 1))
+
+    def _send(self, outbox: dict, tx_hash: str, raw_tx: str) -> DopError:
+        # within a transaction of the database
+        err, _ = self._blk.send_raw_transaction(raw_tx, tx_hash)
+        if not err.isError():
+            self.submitted += 1
+            return self._db.update_outbox_transaction(outbox['id'], OutboxTransaction.SENT, tx_hash)
+        if err.code == self._blk.ERR_SIGN_AGAIN:
+            # the nonce was used by another transaction: the call is signed again
+            perr = self._db.delete_transaction(tx_hash)
+            if perr.isError():
+                return perr
+            return self._db.update_outbox_transaction(outbox['id'], OutboxTransaction.PENDING,
+                                                      error=f"{err.code} {err.msg}")
+        return self._attempt_failed(outbox, err, OutboxTransaction.SIGNED, tx_hash, raw_tx)
+
+    def _sign(self, outbox: dict, args: list) -> DopError:
+        # within the transaction of the claim: committed before the transaction is sent
+        err, signed = self._blk.sign_transaction(outbox['contract_function'], args)
+        if err.isError():
+            perr = self._attempt_failed(outbox, err, OutboxTransaction.PENDING)
+            return self._end(perr)
+
+        perr = self._db.create_transaction(self._transaction(outbox, signed['hash']))
+        if not perr.isError():
+            # the other submitters do not claim it while it is sent
+            perr = self._db.update_outbox_transaction(outbox['id'], OutboxTransaction.SIGNED,
+                                                      signed['hash'], signed['raw'],
+                                                      retry_s=self._retry_s(outbox['attempts']))
+        perr = self._end(perr)
+        if perr.isError():
+            self._blk.release_transaction(signed)
+            return perr
+
+        self._db.begin_transaction()
+        return self._end(self._send(outbox, signed['hash'], signed['raw']))
+
+    def _call(self, outbox: dict, args: list) -> DopError:
+        # the node signs: the call is set as calling (and committed) before it is made
+        perr = self._end(self._db.update_outbox_transaction(outbox['id'], OutboxTransaction.CALLING))
+        if perr.isError():
+            return perr
+
+        err, tx_hash = getattr(self._blk, outbox['contract_function'])(*args)
+        self._db.begin_transaction()
+        if err.isError():
+            perr = self._end(self._attempt_failed(outbox, err, OutboxTransaction.PENDING))
+            if perr.isError():
+                self._print(f"outbox transaction {outbox['id']} left calling, the call failed: {err.code} {err.msg}")
+            return perr
+        self.submitted += 1
+        perr = self._db.create_transaction(self._transaction(outbox, tx_hash))
+        if not perr.isError():
+            perr = self._db.update_outbox_transaction(outbox['id'], OutboxTransaction.SENT, tx_hash)
+        perr = self._end(perr)
+        if perr.isError():
+            self._print(f"outbox transaction {outbox['id']} left calling, sent ({tx_hash}) but not saved: "\
+                        f"{perr.code} {perr.msg}")
+        return perr
+
+    def _end(self, perr: DopError) -> DopError:
+        # commit the transaction of the database, rollback on error
+        if perr.isError():
+            self._db.rollback()
+            return perr
+        return self._db.commit()
+
+    def submit_next(self) -> bool:
+        """
+        Claim and submit the oldest transaction of the outbox: False if there is
+        none (or the database cannot be used)
+        """
+        self._db.begin_transaction()
+        outbox, perr = self._db.claim_outbox_transaction()
+        if perr.isError() or len(outbox) == 0:
+            self._db.rollback()
+            if perr.isError():
+                self._print(f"cannot claim the outbox transactions: {perr.code} {perr.msg}")
+            return False
+
+        try:
+            if outbox['status'] == OutboxTransaction.SIGNED:
+                perr = self._end(self._send(outbox, outbox['tx_hash'], outbox['raw_tx']))
+            elif outbox['contract_function'] not in self._blk.TRANSACTION_FUNCTIONS:
+                perr = self._end(self._db.update_outbox_transaction(outbox['id'], OutboxTransaction.FAILED,
+                        error=f"unknown function {outbox['contract_function']}"))
+            else:
+                args = json.loads(outbox['contract_args'])
+                if self._blk.can_sign():
+                    perr = self._sign(outbox, args)
+                else:
+                    perr = self._call(outbox, args)
+        except Exception as e:
+            self._db.rollback()
+            self._print(f"outbox transaction {outbox['id']}: {type(e)} | {traceback.format_exc()}")
+            return False
+
+        if perr.isError():
+            self._print(f"outbox transaction {outbox['id']}: {perr.code} {perr.msg}")
+            return False
+        return True
+
+
+def main(confFilePath: str) -> DopError:
+
+    configurationTuple = DopUtils.parse_yaml_configuration(confFilePath)
+    if configurationTuple[0].isError():
+        return configurationTuple[0]
+    configuration: dict = configurationTuple[1]
+
+    process: dict = configuration.get('process', {}) or {}
+    try:
+        poll_delay = float(process.get('polldelay', 1))
+        batch = int(process.get('batch', 50))
+        max_attempts = int(process.get('maxattempts', Submitter.DEFAULT_MAX_ATTEMPTS))
+        retry_delay = int(process.get('retrydelay', Submitter.DEFAULT_RETRY_DELAY))
+        max_retry_delay = int(process.get('maxretrydelay', Submitter.DEFAULT_MAX_RETRY_DELAY))
+    except (TypeError, ValueError):
+        return DopError(102, "Configuration value error: process values must be numbers.")
+
+    #=================================================================
+    #   allocate, initialize and open the providers
+    #=================================================================
+    providers = []
+    for key in ('persistenceProvider', 'intermediationWorkerProvider'):
+        if key not in configuration:
+            return DopError(101, f"Configuration error: missing {key}.")
+        err, provider = DopUtils.load_provider(configuration[key])
+        if err.isError():
+            return err
+        err = provider.init(configuration[key]['configuration'])
+        if err.isError():
+            return err
+        print(f"opening {key}")
+        err = provider.open()
+        if err.isError():
+            return err
+        provider.attach_stop_event(globalStopEvent)
+        providers.append(provider)
+    db_provider, blk_provider = providers
+
+    submitter = Submitter(db_provider, blk_provider, max_attempts, retry_delay, max_retry_delay)
+
+    #=================================================================
+    #   main loop: the outbox is polled every polldelay seconds when
+    #   it is empty, batch transactions at most are submitted in a row
+    #=================================================================
+    while not globalStopEvent.is_exiting():
+        if not db_provider.available(poll_delay):
+            continue
+        submitted = 0
+        while submitted < batch and not globalStopEvent.is_exiting() and submitter.submit_next():
+            submitted += 1
+        if submitted < batch:
+            globalStopEvent.wait(poll_delay)
+
+    print(f"submitted: {submitter.submitted}, failed: {submitter.failed}")
+    blk_provider.close()
+    db_provider.close()
+    return DopError()
+
+
+if __name__ == "__main__":
+    #   python doof_submitter.py %fileconf
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(2)
+    signalManagement()
+    error: DopError = main(sys.argv[1])
+    if error.isError():
+        print(error.msg)
+        sys.exit(1)
@@ -0,0 +1,21 @@
+#!/bin/bash
+
+ROOT_DIR="/home/ecosteer/NGI-TRUSTCHAIN/DOOF"
+VENV_DIR="/home/ecosteer/virtualenv"
+CONFHOME="/home/ecosteer/conf"
+
+cd ${ROOT_DIR}/components/submitter
+
+pwd
+
+source ${VENV_DIR}/dop/bin/activate
+source env.sh
+
+#	BEFORE STARTING 
+#	the submitter component needs availability of 
+#	a)	blockchain service 
+#	b)	database (table blk_outbox, see installation/database/create_tables.sql)
+
+#	the submitter sends the transactions saved in the outbox by the
+#	processors of the worker configured with "outbox": true
+python doof_submitter.py ${CONFHOME}/submitter/submitter_config.template
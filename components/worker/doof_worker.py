@@ -29,8 +29,12 @@ from common.python.utils import DopUtils
 from common.python.threads import DopStopEvent
 from common.python.event import DopEvent, DopEventHeader, DopEventPayload
 from common.python.new_processor_env import ProcessorEnvs
+from common.python.pipeline_memory import PipelineMemory
+from provider.python.presentation.input.provider_pres_input import InputDelivery
 
 import load_processors_pipeline as lpp 
+from worker_lanes import BatchCompletion, LaneDispatcher
+from worker_supervisor import WorkerSupervisor
 
 def get_args(argl = None):
     parser = argparse.ArgumentParser(description='Worker')
@@ -39,6 +43,13 @@ def get_args(argl = None):
                     action="store",
                     required=False,
                     dest="config", help='path to config file')
+    parser.add_argument('-p',
+                    '--processes',
+                    action="store",
+                    required=False,
+                    type=int,
+                    default=1,
+                    dest="processes", help='number of worker processes (supervised)')
     return parser.parse_args()
  
 
@@ -65,6 +76,8 @@ def signalManagement():
 class Worker:
     """ This is the userdata class assigned to the input provider
     for an asynchronous event processing  """
+    DB_UNAVAILABLE_WAIT = 1     # seconds an event waits for the database circuit to close before being requeued
+
     def __init__(self): 
         # Declare providers and processors
         self._output = None
@@ -73,6 +86,11 @@ class Worker:
         self._logger = None
         self._lookup_table = None 
         self._processor_envs = ProcessorEnvs() # or None
+        self._lanes = None          # LaneDispatcher, if the worker runs with execution lanes
+        self._dispatch_index = None # event -> list of lpp.DispatchEntry of the main pipeline
+        self._delivery = None       # InputDelivery of the event being processed (if settled by the worker)
+        self._retryable = False     # True if the main pipeline failed because of an infrastructure error
+        self._pipeline_finally = [] # finally pipeline of the event being processed (see _notify)
 
     @property 
     def output(self):
@@ -117,6 +135,14 @@ class Worker:
     def lookup_table(self, lookup):
         self._lookup_table = lookup
 
+    @property 
+    def dispatch_index(self):
+        return self._dispatch_index
+
+    @dispatch_index.setter
+    def dispatch_index(self, dispatch_index):
+        self._dispatch_index = dispatch_index
+
     
     @property 
     def encryption_table(self):
@@ -142,6 +168,48 @@ class Worker:
     def processor_envs(self, processor_envs):
         self._processor_envs = processor_envs
 
+    @property 
+    def lanes(self):
+        return self._lanes 
+
+    @lanes.setter
+    def lanes(self, lanes):
+        self._lanes = lanes
+
+    def lane_worker(self, db_provider):
+        """
+        Return a worker for an execution lane: output, blockchain, logger 
+        and pipelines are shared with this worker, while the lane gets its own 
+        ProcessorEnvs (events and data stacks) and its own persistence provider
+        """
+        worker = type(self)()
+        worker.output = self._output
+        worker.database = db_provider
+        worker.blockchain = self._blockchain
+        worker.logger = self._logger
+        worker.lookup_table = self._lookup_table
+        worker.dispatch_index = self._dispatch_index
+
+        proc_envs = ProcessorEnvs()
+        proc_envs.db_provider = db_provider
+        proc_envs.blk_provider = self._processor_envs.blk_provider
+        proc_envs.integrity_provider = self._processor_envs.integrity_provider
+        proc_envs.encoding_provider = self._processor_envs.encoding_provider
+        proc_envs.crypto_providers = self._processor_envs.crypto_providers
+        proc_envs.logger_provider = self._processor_envs.logger_provider
+        worker.processor_envs = proc_envs
+        return worker
+
+    def create_lanes(self, db_providers: list, queue_size: int, stop_event: DopStopEvent):
+        """
+        Return the dispatcher of the execution lanes (one lane for each persistence 
+        provider), or None if the events are processed by this worker
+        """
+        if len(db_providers) < 2:
+            return None
+        return LaneDispatcher([self.lane_worker(db_provider) for db_provider in db_providers],
+                              queue_size, stop_event, self._logger)
+
     def tracefun(self, called: str):
         #print('\x1b[1;91m Worker [' + called + ']' + '\x1b[0m')
         # could be a call to the logger
@@ -253,65 +321,140 @@ class Worker:
         return DopError(), body
 
 
-    def _execute_main_pipeline(self, event: DopEvent, pipeline: list):
+    def _begin_main_pipeline(self, event: DopEvent):
         
         self._processor_envs.empty_events_stack()
         self._processor_envs.empty_data_stack()
+        self._retryable = False
+        self._database.set_query_context(event.header.event)
+
+        if self._delivery is not None:
+            # processors can check, e.g., if the event is being processed again
+            self._processor_envs.data.push(InputDelivery.__name__, self._delivery)
+        # processors can notify events before the end of the pipeline
+        self._processor_envs.notify = self._notify
         
         self._logger.log(24604, LogSeverity.INFO, 
                             getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno,
                             {"msg":"Event lookup OK.", "opt": f"handling event with {event.header.event} pipeline."})
+
+    def _begin_transaction(self):
+        #   before the processor is fired, the transaction is begun (2PC/XA compliant logic)
+        #   against the external resource managers in a distributed transaction processing env
+        self._database.begin_transaction()
+        self._blockchain.begin_transaction()
+
+    def _end_transaction(self, err_occurred: bool) -> DopError:
+        self._database.set_read_only(False)
+        if err_occurred: 
+            self._database.rollback()
+            self._blockchain.rollback()
+            return DopError()
+            
+        perr = self._database.commit()
+        if perr.isError():
+            self._blockchain.rollback()
+            self._retryable = True
+
+            err = DopUtils.create_dop_error(DopUtils.ERR_TRANSACTION)
+            err.perr = perr
+            self._logger.log(err.code, LogSeverity.ERROR, 
+                        getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno,
+                        {"msg": err.msg, "per": perr.to_dict()})
+            return err
+
+        perr = self._blockchain.commit()
+        if perr.isError():
+            # the persistence transaction is committed already: logged only
+            self._logger.log(perr.code, LogSeverity.ERROR, 
+                        getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno,
+                        {"msg": "Error in committing the blockchain transaction.", "per": perr.to_dict()})
+        return DopError()
+
+    def _database_unavailable(self, cause: DopError = None) -> DopError:
+        # the database circuit is open: the event is requeued (neither notified nor 
+        # counted as a retry) instead of waiting for the database to recover
+        self._retryable = True
+        if self._delivery is not None:
+            self._delivery.defer()
+        err = DopUtils.create_dop_error(DopUtils.ERR_DB_UNAVAILABLE)
+        err.perr = cause
+        self._logger.log(err.code, LogSeverity.WARN, 
+                    getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno,
+                    {"msg": err.msg, "per": cause.to_dict() if cause is not None else None})
+        return err
+
+    def _processor_error(self, processor_handle, event: DopEvent, err: DopError) -> bool:
+        # returns True if the processor returned an error (and the pipeline has to be interrupted)
+        if err.isError():
+            self._logger.log(f"Error returned by processor {processor_handle} for input event {event.header.event}", 
+                        LogSeverity.ERROR, getframeinfo(currentframe()).filename, 
+                        getframeinfo(currentframe()).lineno, err.to_dict())
+            
+            # worker empties the events stack and pushes the event-ified error on it 
+            return True
+    
+        self._logger.log(24605, LogSeverity.DEBUG, 
+                getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno, 
+                {"msg": f"Processor {processor_handle} handled event.", "output": err.to_dict()})
+        return False
+
+    def _pipeline_exception(self, e: Exception, trace: str) -> DopError:
+        self._database.set_read_only(False)
+        self._database.rollback()
+        self._blockchain.rollback()
+        self._retryable = True
+
+        err = DopUtils.create_dop_error(DopUtils.ERR_REQ_PROCESSING)
+        self._logger.log(err.code, LogSeverity.ERROR, 
+                    getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno,
+                    {"msg": err.msg})
+        
+        print(f"""{int(time.time())} | {getframeinfo(currentframe()).filename} |
+                {getframeinfo(currentframe()).lineno} | {type(e)} | {trace}""", file = sys.stderr)
+        sys.stderr.flush()
+        return err
+
+    def _main_pipeline_entries(self, event: DopEvent, pipeline: dict) -> list:
+        # the dispatch entries (see lpp.build_dispatch_index) of the main pipeline of the event
+        if self._dispatch_index is not None and event.header.event in self._dispatch_index:
+            return self._dispatch_index[event.header.event]
+        return lpp.dispatch_entries(event.header.event, pipeline.get('main', []), pipeline.get('read_only', False))
+
+    def _execute_main_pipeline(self, event: DopEvent, pipeline: list):
+        
+        self._begin_main_pipeline(event)
+        if not self._database.available(self.DB_UNAVAILABLE_WAIT):
+            return self._database_unavailable()
  
         try: 
-            #   before the processor is fired, the transaction is begun (2PC/XA compliant logic)
-            #   against the external resource managers in a distributed transaction processing env
-            self._database.begin_transaction()
-            self._blockchain.begin_transaction()
+            self._begin_transaction()
             err = DopError()
             err_occurred = False
+            event_ids = lpp.event_set_ids(event.payload.to_dict())
             #   the selected processor pipeline is fired against the incoming event: 
             #   processors are called in the order specified in configuration file for the given input event;
-            for processor_handle in pipeline:
+            #   processors that cannot act on the event are skipped
+            for entry in pipeline:
+                if not entry.accepts(event_ids, self._processor_envs):
+                    continue
+                processor_handle = entry.processor
                 
                 # processors either handle the input event or events which were
                 # placed by other processors in the stack data structure
-        
+                self._database.set_read_only(entry.read_only)
                 err =  processor_handle.handle_event(event, self._processor_envs)
                     
-                if err.isError():
+                if self._processor_error(processor_handle, event, err):
                     err_occurred = True
-                    self._logger.log(f"Error returned by processor {processor_handle} for input event {event.header.event}", 
-                                LogSeverity.ERROR, getframeinfo(currentframe()).filename, 
-                                getframeinfo(currentframe()).lineno, err.to_dict())
-                    
-                    # worker empties the events stack and pushes the event-ified error on it 
-
                     break
-            
-                self._logger.log(24605, LogSeverity.DEBUG, 
-                        getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno, 
-                        {"msg": f"Processor {processor_handle} handled event.", "output": err.to_dict()})
                 
-            if err_occurred: 
-                self._database.rollback()
-                self._blockchain.rollback()
-               
-            else: 
-                self._database.commit()
-                self._blockchain.commit()
+            terr = self._end_transaction(err_occurred)
+            if terr.isError():
+                err = terr
 
         except Exception as e: 
-            self._database.rollback()
-            self._blockchain.rollback()
-
-            err = DopUtils.create_dop_error(DopUtils.ERR_REQ_PROCESSING)
-            self._logger.log(err.code, LogSeverity.ERROR, 
-                        getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno,
-                        {"msg": err.msg})
-            
-            print(f"""{int(time.time())} | {getframeinfo(currentframe()).filename} |
-                    {getframeinfo(currentframe()).lineno} | {type(e)} | {traceback.format_exc()}""", file = sys.stderr)
-            sys.stderr.flush()
+            err = self._pipeline_exception(e, traceback.format_exc())
                     
         return err
     
@@ -341,10 +484,29 @@ class Worker:
         return err
 
 
+    def _notify(self, prop, event: DopEvent) -> DopError:
+        """
+        Notify an event while the main pipeline is running (e.g. a page of a 
+        streamed result set): the event goes through the finally pipeline of 
+        the event being processed, as the events of the events stack do, and 
+        is written to the output right away
+        """
+        stack = {'events': PipelineMemory(), 'data': self._processor_envs.data}
+        stack['events'].push(prop, event)
+        for processor_handle in self._pipeline_finally:
+            err = processor_handle.handle_pipeline_stack(stack, self._processor_envs.providers)
+            if err.isError():
+                return err
+        self._write_events(stack['events'])
+        return DopError()
+
     def _notification(self, event: DopEvent):
+        self._write_events(self._processor_envs.events)
+
+    def _write_events(self, events: PipelineMemory):
         
-        for session in self._processor_envs.events.properties():
-            for out_event in self._processor_envs.events.pop(session):
+        for session in events.properties():
+            for out_event in events.pop(session):
                 try:
                     event_str = json.dumps(out_event.to_dict())
                 except AttributeError as e:
@@ -363,18 +525,21 @@ class Worker:
                     self._logger.log(f"Error in writing event to output", LogSeverity.ERROR, 
                                      getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno, err.to_dict())
     
-    def handlemsg(self, event: str):
-
-        if self._output is None: 
-            return 
-        
+    def _select_pipeline(self, event: str):
+        """
+        Validate the input event and select its pipeline: returns a tuple
+        (err, in_event_dict, in_event, pipeline) where err is the validation/lookup 
+        error (the event can never be processed), in_event_dict is None if the 
+        event could not be validated at all (nothing to notify), in_event and 
+        pipeline are None if the event is not valid or there is no pipeline for it
+        """
         try:
             err, in_event_dict = self._input_validation(event) 
         except Exception as e: 
             self._logger.log("An exception occurred in validating input", LogSeverity.ERROR, 
                 getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno,
                 {"input_event" : event})  
-            return
+            return DopUtils.create_dop_error(DopUtils.ERR_JSON), None, None, None
             
 
         if err.isError():
@@ -386,65 +551,158 @@ class Worker:
             """
             # TODO checks: is any of the replies from input_validation notifiable?
             """
-        else: 
-            in_event_header = DopEventHeader(
-                                in_event_dict.get('session'),
-                                in_event_dict.get('task', None),
-                                in_event_dict.get('event'))
-            
-            in_event = DopEvent(in_event_header,
-                                DopEventPayload(in_event_dict.get('params',{})))
+            return err, in_event_dict, None, None
+
+        in_event_header = DopEventHeader(
+                            in_event_dict.get('session'),
+                            in_event_dict.get('task', None),
+                            in_event_dict.get('event'))
+        
+        in_event = DopEvent(in_event_header,
+                            DopEventPayload(in_event_dict.get('params',{})))
+        
+        # in_event = eventified input event
+        self._logger.log(24601, LogSeverity.DEBUG,
+            getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno, 
+            {"msg":"A new event was received.", "event": in_event.to_dict()})
             
-            # in_event = eventified input event
-            self._logger.log(24601, LogSeverity.DEBUG,
-                getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno, 
-                {"msg":"A new event was received.", "event": in_event.to_dict()})
-                
-            # pipeline selection
-            pipeline = self.lookup_table.get(in_event_header.event, None)
+        # pipeline selection
+        pipeline = self.lookup_table.get(in_event_header.event, None)
 
-            if pipeline is None: 
-                # No pipeline found
-                err = DopUtils.create_dop_error(DopUtils.ERR_UNRECOGNIZED_EVENT)
-                err.notifiable = False
-                self._logger.log(int(f"24{err.code}") , LogSeverity.DEBUG, 
-                    getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno,
-                    {"msg": err.msg}) 
-                
-                if err.notifiable: 
-                    # TODO check if this is ok here
-                    err_event = self._eventify_err(in_event_header, err,
-                                    {"input_event" : in_event_header.event}, werr= True)
-                    self._processor_envs.events.push(err_event.header.session, err_event)
-                    # notification at the end
-
-            else:
-                pipeline_main = pipeline.get('main', [])
-                pipeline_finally = pipeline.get('finally', [])
-
-                # MLE-MULTISESSION-MACRO: lookup happens in pipeline
-                err = self._execute_main_pipeline(in_event, pipeline_main)
-                if err.isError():
-                    self._processor_envs.empty_events_stack()
-                    
-                    if err.notifiable:
-                        out_event = self._eventify_err(in_event_header, err, {"input_event" : in_event_header.event})    
-                        self._processor_envs.events.push(out_event.header.event, out_event)
-                
-                # finally pipeline: there is a finally for each event pipeline;
-                err = self._execute_finally_pipeline(pipeline_finally)
-                if err.isError(): 
-                    # TODO CHECK What happens if there is an error in this step? do we need a finally 
-                    # for the finally which we know for sure that can return no error? 
-                    self._processor_envs.empty_events_stack()
-                    if err.notifiable:
-                        out_event = self._eventify_err(in_event_header, err, {"input_event" : in_event_header.event})    
-                        #delete session from out_event header
-
-                        self._processor_envs.events.push(out_event.header.session, out_event)
+        if pipeline is None: 
+            # No pipeline found
+            err = DopUtils.create_dop_error(DopUtils.ERR_UNRECOGNIZED_EVENT)
+            err.notifiable = False
+            self._logger.log(int(f"24{err.code}") , LogSeverity.DEBUG, 
+                getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno,
+                {"msg": err.msg}) 
+            
+            if err.notifiable: 
+                # TODO check if this is ok here
+                err_event = self._eventify_err(in_event_header, err,
+                                {"input_event" : in_event_header.event}, werr= True)
+                self._processor_envs.events.push(err_event.header.session, err_event)
                 # notification at the end
+            return err, in_event_dict, in_event, None
+
+        return DopError(), in_event_dict, in_event, pipeline
+
+    def _main_pipeline_error(self, in_event_header: DopEventHeader, err: DopError):
+        if err.isError():
+            self._processor_envs.empty_events_stack()
+            
+            if err.notifiable:
+                out_event = self._eventify_err(in_event_header, err, {"input_event" : in_event_header.event})    
+                self._processor_envs.events.push(out_event.header.event, out_event)
+
+    def _finally_pipeline_error(self, in_event_header: DopEventHeader, err: DopError):
+        if err.isError(): 
+            # TODO CHECK What happens if there is an error in this step? do we need a finally 
+            # for the finally which we know for sure that can return no error? 
+            self._processor_envs.empty_events_stack()
+            if err.notifiable:
+                out_event = self._eventify_err(in_event_header, err, {"input_event" : in_event_header.event})    
+                #delete session from out_event header
+
+                self._processor_envs.events.push(out_event.header.session, out_event)
+    
+    def _retry_delivery(self, err: DopError) -> bool:
+        # True if the main pipeline failed because of an infrastructure error and the 
+        # event will be delivered again: the error is not notified to the client
+        return self._delivery is not None and err.isError() and self._retryable \
+            and self._delivery.will_retry(err)
+
+    def _delivery_error(self, err: DopError) -> DopError:
+        # the error settling the delivery of the event (see InputDelivery.settle): the 
+        # events that failed for business reasons were notified, thus they are acknowledged
+        if err.isError() and self._retryable:
+            return err
+        return DopError()
+
+    def _poison_error(self, err: DopError) -> DopError:
+        # the event cannot be processed, no matter how many times it is delivered
+        err.rip()
+        return err
+
+    def _handle_delivery(self, event: str, delivery: InputDelivery, handle):
+        # run handle(event), then settle the delivery with the returned error
+        self._delivery = delivery
+        try:
+            err = handle(event)
+        except Exception:
+            err = DopUtils.create_dop_error(DopUtils.ERR_REQ_PROCESSING)
+            raise
+        finally:
+            self._delivery = None
+            if delivery is not None:
+                delivery.settle(err)
+
+    def _handlemsg(self, event: str) -> DopError:
+        # returns the error settling the delivery of the event
+
+        err, in_event_dict, in_event, pipeline = self._select_pipeline(event)
+        if in_event_dict is None:
+            return self._poison_error(err)
+
+        if pipeline is not None:
+            pipeline_main = self._main_pipeline_entries(in_event, pipeline)
+            pipeline_finally = pipeline.get('finally', [])
+            self._pipeline_finally = pipeline_finally
+
+            # MLE-MULTISESSION-MACRO: lookup happens in pipeline
+            err = self._execute_main_pipeline(in_event, pipeline_main)
+            if err.isError() and not self._database.available():
+                err = self._database_unavailable(err)
+            if self._retry_delivery(err):
+                self._processor_envs.empty_events_stack()
+                return err
+            self._main_pipeline_error(in_event.header, err)
+            delivery_err = self._delivery_error(err)
+            
+            # finally pipeline: there is a finally for each event pipeline;
+            err = self._execute_finally_pipeline(pipeline_finally)
+            self._finally_pipeline_error(in_event.header, err)
+        elif err.code == DopUtils.ERR_JSON['id']:
+            # malformed event: it can be inspected in the dead letter queue
+            delivery_err = self._poison_error(err)
+        else:
+            # invalid or unrecognized event: already logged (and notified, if notifiable)
+            delivery_err = DopError()
         
+        # notification at the end
         self._notification(in_event_dict)
+        return delivery_err
+
+    def handlemsg(self, event: str, delivery: InputDelivery = None):
+
+        if self._output is None: 
+            return 
+
+        if self._lanes is not None:
+            # the event is processed by the execution lane of its session
+            self._lanes.dispatch(event, None, delivery)
+            return
+
+        self._handle_delivery(event, delivery, self._handlemsg)
+
+    def handlebatch(self, events: list):
+        """
+        Handle a batch of events: the method returns when all the 
+        events of the batch have been processed
+        """
+        if self._output is None: 
+            return 
+
+        if self._lanes is None:
+            for event in events:
+                self.handlemsg(event)
+            return
+
+        # the events are processed in parallel by the lanes
+        batch = BatchCompletion(len(events))
+        for event in events:
+            self._lanes.dispatch(event, batch.done)
+        batch.wait()
                 
 
 
@@ -472,6 +730,27 @@ def in_data_callback(message_topic: str, message_payload: str, userdata):
     return
 
 
+def in_delivery_callback(message_topic: str, message_payload: str, delivery: InputDelivery, userdata):
+
+    worker: Worker = userdata
+    worker.tracefun('in_delivery_callback')
+
+    # the worker settles the delivery after the commit/rollback of the pipeline
+    worker.handlemsg(message_payload, delivery)
+    
+    return
+
+
+def in_data_batch_callback(message_topic: str, message_payloads: list, userdata):
+
+    worker: Worker = userdata
+    worker.tracefun('in_data_batch_callback')
+
+    worker.handlebatch(message_payloads)
+    
+    return
+
+
 def out_error_callback(err: DopError, userdata):
     if err.isError():
         print('\x1b[1;33m' + 'err: ' + str(err.code) + ' msg: ' + err.msg + '\x1b[0m')
@@ -479,7 +758,7 @@ def out_error_callback(err: DopError, userdata):
         print('\x1b[1;33m' +  'log: ' + err.msg+ '\x1b[0m')
 
 
-def check_providers_in_conf(configuration_dict) -> DopError:
+def check_providers_in_conf(configuration_dict, processes: int = 1) -> DopError:
     # CHECKS
     conf_list = ['inputProvider', 'outputProvider', 'databaseProvider', # TODO persistenceProvider
             'intermediationWorkerProvider', 'pipelines', 'loggingProvider', 
@@ -493,17 +772,70 @@ def check_providers_in_conf(configuration_dict) -> DopError:
         "cryptoProviders":118
     }
 
+    lanes_configuration = configuration_dict.get('executionLanes', {})
+    try:
+        if int(lanes_configuration.get('lanes', 1)) < 1 or int(lanes_configuration.get('queue_size', 64)) < 1:
+            return DopError(24119, "Configuration value error: executionLanes lanes and queue_size must be positive.")
+    except (AttributeError, TypeError, ValueError):
+        return DopError(24119, "Configuration value error: executionLanes lanes and queue_size must be integers.")
+
+    try:
+        if int(configuration_dict.get('persistenceStats', {}).get('interval', 0)) < 0:
+            return DopError(24120, "Configuration value error: persistenceStats interval must not be negative.")
+    except (AttributeError, TypeError, ValueError):
+        return DopError(24120, "Configuration value error: persistenceStats interval must be an integer.")
+
     for item in conf_list: 
         if item not in configuration_dict:
             
             return DopError(int(f"24{errs[item]}"), f"Configuration value error: {item} key \
                 is undefined/missing.")
+
+    if processes > 1:
+        # the nonces of the signed transactions are handed out by each process: the 
+        # processes would sign different transactions with the same nonces
+        blk_configuration = configuration_dict['intermediationWorkerProvider'].get('configuration', '')
+        perr, blk_config = DopUtils.config_to_dict(blk_configuration)
+        if not perr.isError() and blk_config.get('use_pk') == 'True':
+            return DopError(24121, "Configuration value error: use_pk=True requires a single worker process (one signer per process).")
     
     return DopError()
 
 
+def check_configuration(confFilePath, processes: int) -> DopError:
+    # checked by the supervisor before the worker processes are started
+    try: 
+        with open(confFilePath) as conf:
+            configuration_dict: dict = json.loads(conf.read())
+    except Exception as e :
+        print(e)
+        return DopError(24102,"Error in parsing the configuration file")
+    return check_providers_in_conf(configuration_dict, processes)
+
+
+def publish_persistence_stats(logger_provider, db_providers: list):
+    # the query statistics and the pool are shared by the providers of the process,
+    # the prepared statements are per provider (lane)
+    logger_provider.log(24608, LogSeverity.INFO,
+            getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno,
+            {'msg': "Persistence statistics.", 'queries': db_providers[0].query_stats(),
+             'pool': db_providers[0].pool_stats(), 'circuit': db_providers[0].circuit_stats(),
+             'replica': [db_provider.replica_stats() for db_provider in db_providers],
+             'sql_cache': [db_provider.sql_cache_stats() for db_provider in db_providers]})
+
+
+def publish_blockchain_stats(logger_provider, blk_provider):
+    # the cache of the read-only contract calls is shared by the lanes
+    logger_provider.log(24609, LogSeverity.INFO,
+            getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno,
+            {'msg': "Blockchain statistics.", 'calls': blk_provider.call_cache_stats()})
+
+
+def main(confFilePath, args, open_providers, worker: Worker = None) -> DopError:
+
+    if worker is None:
+        worker = globalWorkerIN
 
-def main(confFilePath, args, open_providers) -> DopError:
 
     # GET CONFIGURATION
 
@@ -549,6 +881,15 @@ def main(confFilePath, args, open_providers) -> DopError:
     # processors (take the whole array of processor configurations) 
     processors_configuration: dict = configuration_dict['pipelines']
 
+    # execution lanes (optional): events of different sessions are processed in parallel
+    lanes_configuration: dict = configuration_dict.get('executionLanes', {})
+    lanes = int(lanes_configuration.get('lanes', 1))
+    lanes_queue_size = int(lanes_configuration.get('queue_size', 64))
+
+    # persistence statistics (optional): published every interval seconds (0: at exit only)
+    stats_configuration: dict = configuration_dict.get('persistenceStats', {})
+    stats_interval = int(stats_configuration.get('interval', 0))
+
     
     # LOGGING
     tupleLoadProvider = DopUtils.load_provider(logger_configuration)
@@ -576,7 +917,7 @@ def main(confFilePath, args, open_providers) -> DopError:
     open_providers.append(logger_provider)
 
 
-    globalWorkerIN.logger = logger_provider 
+    worker.logger = logger_provider 
 
 
     #   loading outputProvider
@@ -644,6 +985,29 @@ def main(confFilePath, args, open_providers) -> DopError:
                 {'msg': error.msg, 'per': per.to_dict()})
         
         return error
+
+    # one more persistence provider (i.e. db connection) for each additional lane:
+    # the first lane uses db_provider
+    lanes_db_providers = [db_provider]
+    for lane in range(1, lanes):
+        tupleLoadProvider = DopUtils.load_provider(db_configuration)
+        if tupleLoadProvider[0].isError():
+            error = DopError(24205,"Error in loading the persistence provider.")
+            logger_provider.log(error.code, LogSeverity.CRITICAL,
+                    getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno, 
+                    {'msg':error.msg, 'cause':tupleLoadProvider[0].to_dict(), 'lane': lane})
+            return tupleLoadProvider[0]
+        lane_db_provider = tupleLoadProvider[1]
+
+        per: DopError = lane_db_provider.init(db_confstring)
+        if per.isError():  
+            error = DopError(24206,"Error in initializing the persistence provider.")
+            error.perr = per
+            logger_provider.log(error.code, LogSeverity.CRITICAL,
+                    getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno,
+                    {'msg': error.msg, 'per': per.to_dict(), 'lane': lane})
+            return error
+        lanes_db_providers.append(lane_db_provider)
     
      # loading blk provider
     tupleLoadProvider = DopUtils.load_provider(blk_configuration)
@@ -766,21 +1130,26 @@ def main(confFilePath, args, open_providers) -> DopError:
 
     input_provider.attach_stop_event(globalStopEvent)
     input_provider.set_on_data_callback(in_data_callback)
+    input_provider.set_on_data_batch_callback(in_data_batch_callback)
+    input_provider.set_on_delivery_callback(in_delivery_callback)
     input_provider.set_on_error_callback(in_error_callback)  
-    input_provider.set_userdata(globalWorkerIN)
+    input_provider.set_userdata(worker)
     
     
-    db_provider.attach_stop_event(globalStopEvent)
+    for lane_db_provider in lanes_db_providers:
+        lane_db_provider.attach_stop_event(globalStopEvent)
+        lane_db_provider.attach_logger(logger_provider)
 
     blk_provider.attach_stop_event(globalStopEvent)
 
 
     
     # SET WORKER VARIABLES
-    globalWorkerIN.output = output_provider
-    globalWorkerIN.database = db_provider 
-    globalWorkerIN.blockchain = blk_provider
-    globalWorkerIN.lookup_table = pipeline
+    worker.output = output_provider
+    worker.database = db_provider 
+    worker.blockchain = blk_provider
+    worker.lookup_table = pipeline
+    worker.dispatch_index = lpp.build_dispatch_index(pipeline)
 
     proc_envs = ProcessorEnvs()
     proc_envs.db_provider = db_provider
@@ -789,15 +1158,17 @@ def main(confFilePath, args, open_providers) -> DopError:
     proc_envs.encoding_provider = encoding_provider 
     proc_envs.crypto_providers = cryptos
     proc_envs.logger_provider = logger_provider
-    globalWorkerIN.processor_envs = proc_envs
+    worker.processor_envs = proc_envs
+
+    lanes_dispatcher = worker.create_lanes(lanes_db_providers, lanes_queue_size, globalStopEvent)
    
 
     # open providers
 
     # processors (in case they need to open other modules etc ...)
     for event, pipelines in pipeline.items():
-        for top, procs in pipelines.items():
-            for proc in procs: 
+        for top in ("main", "finally"):
+            for proc in pipelines[top]: 
                 per: DopError = proc.open()
                 if per.isError(): 
                     error = DopError(24307,"Error in opening processor.")
@@ -842,16 +1213,17 @@ def main(confFilePath, args, open_providers) -> DopError:
         return DopError(24302,"Error in opening the input provider.")
 
 
-    per: DopError = db_provider.open()
-    if per.isError(): 
-        error = DopError(24305, "Error in opening the persistence .")
-        error.perr = per
-        logger_provider.log(error.code, LogSeverity.CRITICAL,\
-                getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno, 
-                {'msg': error.msg, 'per': per.to_dict()})
-       
-        return error
-    open_providers.append(db_provider)
+    for lane, lane_db_provider in enumerate(lanes_db_providers):
+        per: DopError = lane_db_provider.open()
+        if per.isError(): 
+            error = DopError(24305, "Error in opening the persistence .")
+            error.perr = per
+            logger_provider.log(error.code, LogSeverity.CRITICAL,\
+                    getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno, 
+                    {'msg': error.msg, 'per': per.to_dict(), 'lane': lane})
+        
+            return error
+        open_providers.append(lane_db_provider)
 
     
     per: DopError = blk_provider.open()
@@ -865,16 +1237,28 @@ def main(confFilePath, args, open_providers) -> DopError:
         return error
     open_providers.append(blk_provider)
     
+    if lanes_dispatcher is not None:
+        lanes_dispatcher.open()
+        worker.lanes = lanes_dispatcher
+        logger_provider.log(24603, LogSeverity.INFO,
+                getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno,
+                {'msg': "Execution lanes started.", 'lanes': lanes, 'queue_size': lanes_queue_size})
+
     ### LOOP ###
 
     input_provider.read()
 
     
+    stats_published = time.time()
     while True:
         if globalStopEvent.is_exiting():
             break
         globalStopEvent.wait(10)       #   do not waste too time within this wait - this is in seconds
         #time.sleep(10)
+        if stats_interval > 0 and time.time() - stats_published >= stats_interval:
+            publish_persistence_stats(logger_provider, lanes_db_providers)
+            publish_blockchain_stats(logger_provider, blk_provider)
+            stats_published = time.time()
 
     ### EXIT ###
 
@@ -892,6 +1276,16 @@ def main(confFilePath, args, open_providers) -> DopError:
                 {'msg': error.msg, 'per': per.to_dict()})
         return error
 
+    if lanes_dispatcher is not None:
+        # no more events from the input: drain the lanes before closing the providers they use
+        logger_provider.log(24556, LogSeverity.INFO,\
+                    getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno,
+                    {'msg': "Closing execution lanes."})
+        lanes_dispatcher.close()
+
+    publish_persistence_stats(logger_provider, lanes_db_providers)
+    publish_blockchain_stats(logger_provider, blk_provider)
+
     logger_provider.log(24551, LogSeverity.DEBUG,\
                 getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno,
                 {'msg': "Closing output provider."})
@@ -935,15 +1329,16 @@ def main(confFilePath, args, open_providers) -> DopError:
     logger_provider.log(24555, LogSeverity.INFO,\
                 getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno,
                 {'msg': "Closing persistence provider."})
-    per: DopError = db_provider.close()
-    if per.isError():
-        error = DopError(24503,"Error in closing the persistence provider.")
-        error.perr = per
-        logger_provider.log(error.code, LogSeverity.CRITICAL,\
-                getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno,
-                {'msg': error.msg, 'per': per.to_dict()})
-           
-        return error
+    for lane_db_provider in lanes_db_providers:
+        per: DopError = lane_db_provider.close()
+        if per.isError():
+            error = DopError(24503,"Error in closing the persistence provider.")
+            error.perr = per
+            logger_provider.log(error.code, LogSeverity.CRITICAL,\
+                    getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno,
+                    {'msg': error.msg, 'per': per.to_dict()})
+            
+            return error
     # blk_provider.close
 
 
@@ -952,17 +1347,9 @@ def main(confFilePath, args, open_providers) -> DopError:
     return DopError()
 
     
-if __name__ == "__main__":
-    signalManagement()
-    
-    args = get_args()
-    if args.config:
-        config_file = args.config
-    else: 
-        config_file = ""
-    print(config_file)
+def run(config_file, worker: Worker = None) -> DopError:
     providers_to_stop = []
-    error:DopError = main(config_file,[], providers_to_stop)
+    error:DopError = main(config_file,[], providers_to_stop, worker)
     
     
     globalStopEvent.stop()
@@ -971,4 +1358,34 @@ if __name__ == "__main__":
 
     if error.isError():
         print(f"Exit - {error}") # already logged
+    return error
+
+
+def run_process(config_file, worker: Worker = None):
+    #   entry point of a supervised worker process
+    error: DopError = run(config_file, worker)
+    sys.exit(1 if error.isError() else 0)
 
+    
+if __name__ == "__main__":
+    signalManagement()
+    
+    args = get_args()
+    if args.config:
+        config_file = args.config
+    else: 
+        config_file = ""
+    print(config_file)
+
+    if args.processes > 1:
+        error: DopError = check_configuration(config_file, args.processes)
+        if error.isError():
+            print(f"Exit - {error}")
+            sys.exit(1)
+        supervisor = WorkerSupervisor(run_process, (config_file,), args.processes, globalStopEvent)
+        error: DopError = supervisor.run()
+        if error.isError():
+            print(f"Exit - {error}")
+            sys.exit(1)
+    else:
+        run(config_file)
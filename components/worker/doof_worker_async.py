@@ -0,0 +1,269 @@
+#   SPDX-License-Identifier: Apache-2.0
+# © Copyright Ecosteer 2024
+
+#   ver:    1.0
+#   date:   18/10/2026
+
+"""
+Asyncio runtime of the worker.
+
+The same JSON configuration (providers, pipelines, macros) of doof_worker
+drives this runtime: the difference is that the imperatives are handled by
+an event loop, so that many imperatives can be in flight at the same time.
+
+Every in-flight imperative takes a slot: a slot is an AsyncWorker with its
+own ProcessorEnvs and its own persistence provider (the number of slots is
+the "lanes" of the executionLanes configuration). The imperatives of the
+same session are serialized by a per-session lock, thus they keep their
+order.
+
+Processors may declare a coroutine
+
+    async def handle_event_async(self, event: DopEvent, envs: ProcessorEnvs) -> DopError
+
+which is awaited by the runtime; processors that only implement the
+ProcessorProvider.handle_event are run by a thread pool (as well as the
+begin_transaction/commit/rollback of the resource managers), so that the
+event loop is never blocked.
+
+NOTE this runtime is scaffolding: no processor implements handle_event_async
+yet, and the persistence (pyodbc) and blockchain (web3) providers are
+synchronous, so every processor runs in the thread pool and the imperatives
+in flight are bounded by the slots, as with the execution lanes of
+doof_worker. The runtime pays off once there are asynchronous providers for
+the processors to await.
+"""
+
+import asyncio
+import sys
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from inspect import currentframe, getframeinfo
+from threading import Semaphore, Thread
+
+from common.python.error import DopError, LogSeverity
+from common.python.event import DopEvent
+from common.python.threads import DopStopEvent
+from common.python.utils import DopUtils
+from provider.python.presentation.input.provider_pres_input import InputDelivery
+
+import doof_worker as dw
+from worker_lanes import session_key
+from worker_supervisor import WorkerSupervisor
+
+
+class AsyncWorker(dw.Worker):
+
+    def create_lanes(self, db_providers: list, queue_size: int, stop_event: DopStopEvent):
+        # the asyncio runtime is always used, even with a single slot
+        return AsyncRuntime([self.lane_worker(db_provider) for db_provider in db_providers],
+                            queue_size, stop_event, self._logger)
+
+    async def _execute_main_pipeline_async(self, event: DopEvent, pipeline: list, executor):
+        loop = asyncio.get_running_loop()
+
+        self._begin_main_pipeline(event)
+        if not await loop.run_in_executor(executor, self._database.available, self.DB_UNAVAILABLE_WAIT):
+            return self._database_unavailable()
+        try:
+            await loop.run_in_executor(executor, self._begin_transaction)
+            err = DopError()
+            err_occurred = False
+            event_ids = dw.lpp.event_set_ids(event.payload.to_dict())
+            for entry in pipeline:
+                if not entry.accepts(event_ids, self._processor_envs):
+                    continue
+                processor_handle = entry.processor
+                self._database.set_read_only(entry.read_only)
+                handle_event_async = getattr(processor_handle, "handle_event_async", None)
+                if handle_event_async is not None:
+                    err = await handle_event_async(event, self._processor_envs)
+                else:
+                    # thread-offload adapter for the (synchronous) processors
+                    err = await loop.run_in_executor(executor, processor_handle.handle_event,
+                                                     event, self._processor_envs)
+
+                if self._processor_error(processor_handle, event, err):
+                    err_occurred = True
+                    break
+
+            terr = await loop.run_in_executor(executor, self._end_transaction, err_occurred)
+            if terr.isError():
+                err = terr
+
+        except Exception as e:
+            err = await loop.run_in_executor(executor, self._pipeline_exception,
+                                             e, traceback.format_exc())
+        return err
+
+    async def _handlemsg_async(self, event: str, executor) -> DopError:
+        # returns the error settling the delivery of the event (see Worker._handlemsg)
+        loop = asyncio.get_running_loop()
+
+        err, in_event_dict, in_event, pipeline = self._select_pipeline(event)
+        if in_event_dict is None:
+            return self._poison_error(err)
+
+        if pipeline is not None:
+            self._pipeline_finally = pipeline.get('finally', [])
+            err = await self._execute_main_pipeline_async(in_event, self._main_pipeline_entries(in_event, pipeline),
+                                                          executor)
+            if err.isError() and not self._database.available():
+                err = self._database_unavailable(err)
+            if self._retry_delivery(err):
+                self._processor_envs.empty_events_stack()
+                return err
+            self._main_pipeline_error(in_event.header, err)
+            delivery_err = self._delivery_error(err)
+
+            err = await loop.run_in_executor(executor, self._execute_finally_pipeline,
+                                             pipeline.get('finally', []))
+            self._finally_pipeline_error(in_event.header, err)
+        elif err.code == DopUtils.ERR_JSON['id']:
+            # malformed event: it can be inspected in the dead letter queue
+            delivery_err = self._poison_error(err)
+        else:
+            # invalid or unrecognized event: already logged (and notified, if notifiable)
+            delivery_err = DopError()
+
+        await loop.run_in_executor(executor, self._notification, in_event_dict)
+        return delivery_err
+
+    async def handlemsg_async(self, event: str, executor, delivery: InputDelivery = None):
+
+        if self._output is None:
+            return
+
+        self._delivery = delivery
+        try:
+            err = await self._handlemsg_async(event, executor)
+        except Exception:
+            err = DopUtils.create_dop_error(DopUtils.ERR_REQ_PROCESSING)
+            raise
+        finally:
+            self._delivery = None
+            if delivery is not None:
+                delivery.settle(err)
+
+
+class AsyncRuntime:
+    """
+    The event loop of the asyncio runtime: it has the same interface of the
+    worker_lanes.LaneDispatcher (open, close, dispatch)
+    """
+
+    def __init__(self, workers: list, queue_size: int, stop_event: DopStopEvent, logger = None):
+        self._workers = workers
+        self._stop_event = stop_event
+        self._logger = logger
+
+        # the number of imperatives accepted (in flight or waiting for a slot) is bounded,
+        # the input provider is blocked when the bound is reached (backpressure)
+        self._accepted = Semaphore(len(workers) * (queue_size + 1))
+        self._executor = ThreadPoolExecutor(max_workers=len(workers) * 2, thread_name_prefix="doof-async")
+        self._loop = asyncio.new_event_loop()
+        self._thread = Thread(target=self._run_loop, args=(), name="doof-async-loop", daemon=True)
+
+        # the following are used only by the event loop thread
+        self._slots = None
+        self._sessions = {}         # session -> [asyncio.Lock, number of imperatives of the session]
+        self._pending = set()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    async def _setup(self):
+        self._slots = asyncio.Queue()
+        for worker in self._workers:
+            self._slots.put_nowait(worker)
+
+    async def _drain(self):
+        while len(self._pending) > 0:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    def open(self) -> DopError:
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._setup(), self._loop).result()
+        return DopError()
+
+    def close(self) -> DopError:
+        #   the imperatives already accepted are processed before the loop is stopped
+        asyncio.run_coroutine_threadsafe(self._drain(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._executor.shutdown(wait=True)
+        return DopError()
+
+    async def _handle(self, event: str, session: str, done, delivery):
+        task = asyncio.current_task()
+        self._pending.add(task)
+
+        entry = self._sessions.get(session, None)
+        if entry is None:
+            entry = [asyncio.Lock(), 0]
+            self._sessions[session] = entry
+        entry[1] += 1
+
+        try:
+            # asyncio.Lock is fair: the imperatives of a session are processed in arrival order
+            async with entry[0]:
+                worker = await self._slots.get()
+                try:
+                    await worker.handlemsg_async(event, self._executor, delivery)
+                finally:
+                    self._slots.put_nowait(worker)
+        except Exception as e:
+            print(f"{int(time.time())} | {getframeinfo(currentframe()).filename} | "\
+                    f"{getframeinfo(currentframe()).lineno} | {type(e)} | {traceback.format_exc()}", file = sys.stderr)
+            sys.stderr.flush()
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._sessions.pop(session, None)
+            self._pending.discard(task)
+            self._accepted.release()
+            if done is not None:
+                done()
+
+    def dispatch(self, event: str, done = None, delivery = None):
+        while not self._accepted.acquire(timeout=1):
+            if self._stop_event.is_exiting():
+                if self._logger is not None:
+                    self._logger.log(24607, LogSeverity.WARN,
+                        getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno,
+                        {"msg": "Event dropped: exit signaled while the runtime was full."})
+                if done is not None:
+                    done()
+                return
+        asyncio.run_coroutine_threadsafe(self._handle(event, session_key(event), done, delivery), self._loop)
+
+
+globalAsyncWorker = AsyncWorker()
+
+
+if __name__ == "__main__":
+    dw.signalManagement()
+
+    args = dw.get_args()
+    if args.config:
+        config_file = args.config
+    else:
+        config_file = ""
+    print(config_file)
+
+    if args.processes > 1:
+        error: DopError = dw.check_configuration(config_file, args.processes)
+        if error.isError():
+            print(f"Exit - {error}")
+            sys.exit(1)
+        supervisor = WorkerSupervisor(dw.run_process, (config_file, globalAsyncWorker),
+                                      args.processes, dw.globalStopEvent)
+        error: DopError = supervisor.run()
+        if error.isError():
+            print(f"Exit - {error}")
+            sys.exit(1)
+    else:
+        dw.run(config_file, globalAsyncWorker)
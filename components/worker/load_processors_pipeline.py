@@ -54,6 +54,11 @@ def load_processor(proc_entry: dict) -> Tuple[DopError, object]:
         error = DopError(24216,"Error in initializing processor.")
         error.perr = per
         return error, processor
+
+    if proc_entry.get('read_only', False):
+        processor.read_only = True
+    if proc_entry.get('outbox', False):
+        processor.outbox = True
     
     return DopError(), processor
 
@@ -277,9 +282,12 @@ def load_processors(processors_configuration, loaded_macros):
     pipeline = {}
     for event, processors in processors_configuration.items(): 
          
-        pipeline[event] = {"main": [], "finally": []}
+        # "read_only": true, the main processors of the pipeline only read (see DispatchEntry)
+        pipeline[event] = {"main": [], "finally": [], "read_only": bool(processors.get('read_only', False))}
         
         for k, pipelines in processors.items():
+            if k not in ("main", "finally"):
+                continue
             for entry in pipelines: 
                 if is_macro(entry):
                     # Assume macro was already loaded
@@ -302,12 +310,99 @@ def load_processors(processors_configuration, loaded_macros):
                         error = DopError(24216,"Error in initializing processor.")
                         error.perr = per
                         return error
+                    if entry.get('read_only', False):
+                        processor.read_only = True
+                    if entry.get('outbox', False):
+                        processor.outbox = True
 
 
                     pipeline[event][k].append(processor) #k = main/finally
-        
+
     return pipeline
 
+
+"""
+Dispatch index: for each event of the pipelines, the main processors are
+compiled into DispatchEntry objects, so that at runtime the worker invokes only
+the processors that can act on the event:
+- processors handling any event ("*") or the event of the pipeline are always invoked;
+- processors consuming blockchain logs (e.g. LogMemberCreateProcessor in the event_set
+  pipeline) are invoked only if the event_set contains one of their event_ids;
+- processors declared for another event type are invoked only if an event of that
+  type was pushed on the events stack by the processors preceding them.
+An entry is read_only if its processor or its pipeline is declared read_only:
+the worker lets the persistence provider execute its selects on the read replica.
+"""
+
+DISPATCH_ALWAYS = 0
+DISPATCH_EVENT_ID = 1
+DISPATCH_STACK = 2
+
+EVENT_SET = "event_set"
+EVENT_ID = "event_id"
+
+
+class DispatchEntry:
+    __slots__ = ("processor", "mode", "keys", "read_only")
+
+    def __init__(self, processor, mode: int, keys = None, read_only: bool = False):
+        self.processor = processor
+        self.mode = mode
+        self.keys = keys
+        self.read_only = read_only or getattr(processor, "read_only", False)
+
+    def accepts(self, event_ids: set, envs) -> bool:
+        if self.mode == DISPATCH_ALWAYS:
+            return True
+        if self.mode == DISPATCH_EVENT_ID:
+            return not self.keys.isdisjoint(event_ids)
+        # DISPATCH_STACK
+        return not self.keys.isdisjoint(envs.events.properties())
+
+
+def dispatch_entry(event: str, processor, read_only: bool = False) -> DispatchEntry:
+    event_types_f = getattr(processor, "event_types", None)
+    if event_types_f is None:
+        # not a ProcessorProvider (e.g. a placeholder of a macro)
+        return DispatchEntry(processor, DISPATCH_ALWAYS, read_only=read_only)
+
+    event_types = event_types_f()
+    if event_types is None:
+        return DispatchEntry(processor, DISPATCH_ALWAYS, read_only=read_only)
+
+    if event in event_types:
+        event_ids = processor.event_ids()
+        if event_ids is None:
+            return DispatchEntry(processor, DISPATCH_ALWAYS, read_only=read_only)
+        return DispatchEntry(processor, DISPATCH_EVENT_ID, event_ids, read_only)
+
+    return DispatchEntry(processor, DISPATCH_STACK, event_types, read_only)
+
+
+def dispatch_entries(event: str, processors: list, read_only: bool = False) -> list:
+    return [dispatch_entry(event, processor, read_only) for processor in processors]
+
+
+def build_dispatch_index(pipeline: dict) -> dict:
+    """
+    Return a dictionary event -> list of DispatchEntry of the main pipeline
+    """
+    index = {}
+    for event, pipelines in pipeline.items():
+        index[event] = dispatch_entries(event, pipelines.get('main', []), pipelines.get('read_only', False))
+    return index
+
+
+def event_set_ids(payload: dict) -> set:
+    """
+    Return the set of the event_ids of the blockchain logs of an event_set
+    (empty set if the event is not an event_set)
+    """
+    blk_events = payload.get(EVENT_SET, None)
+    if not isinstance(blk_events, list):
+        return set()
+    return {blk_ev.get(EVENT_ID) for blk_ev in blk_events if isinstance(blk_ev, dict)}
+
 def main(confFilePath, args):
 
     print("hello")
@@ -0,0 +1,193 @@
+#   SPDX-License-Identifier: Apache-2.0
+# © Copyright Ecosteer 2024
+
+#   ver:    1.0
+#   date:   18/10/2026
+
+"""
+Session-partitioned execution lanes for the worker.
+
+The input provider callback thread hands every imperative to a
+LaneDispatcher, which selects a lane by hashing the event session:
+events of the same session always land on the same lane (and are thus
+processed in order), while events of unrelated sessions are processed
+in parallel by the other lanes.
+
+Each lane owns a worker (see doof_worker.Worker) with its own
+ProcessorEnvs/PipelineMemory and its own persistence provider, so that
+the begin_transaction/commit/rollback cycle of a pipeline never
+interleaves with the one of another lane.
+"""
+
+import json
+import queue
+import sys
+import time
+import traceback
+import zlib
+from inspect import currentframe, getframeinfo
+from json import JSONDecodeError
+from threading import Condition, Thread
+
+from common.python.error import DopError, LogSeverity
+from common.python.threads import DopStopEvent
+
+
+NULL_SESSION = "00000000-0000-0000-0000-000000000000"
+
+
+def session_key(event: str) -> str:
+    """
+    Return the partitioning key of the (raw) event: the session,
+    or the null session if the event cannot be parsed (the worker
+    will then take care of logging the malformed event)
+    """
+    try:
+        body = json.loads(event)
+    except JSONDecodeError:
+        try:
+            # msg coming from monitor
+            body = json.loads(event.replace("'", '"'))
+        except JSONDecodeError:
+            return NULL_SESSION
+    except Exception:
+        return NULL_SESSION
+
+    if not isinstance(body, dict):
+        return NULL_SESSION
+    session = body.get("session", None)
+    if not isinstance(session, str) or session == '-':
+        return NULL_SESSION
+    return session
+
+
+class BatchCompletion:
+    """
+    Countdown of the events of a batch still to be processed by the lanes
+    """
+
+    def __init__(self, count: int):
+        self._count = count
+        self._cond = Condition()
+
+    def done(self):
+        with self._cond:
+            self._count -= 1
+            if self._count <= 0:
+                self._cond.notify_all()
+
+    def wait(self):
+        with self._cond:
+            while self._count > 0:
+                self._cond.wait()
+
+
+class ExecutionLane:
+    """
+    A lane is a thread consuming the imperatives queued for it
+    and handing them, one at a time, to its own worker
+    """
+
+    def __init__(self, index: int, worker, queue_size: int):
+        self._index = index
+        self._worker = worker
+        self._queue = queue.Queue(maxsize=queue_size)
+        # the inner stop event allows the lane to drain its queue when
+        # the worker is closing, independently from the globalStopEvent
+        self._innerStopEvent = DopStopEvent()
+        self._loop = Thread(target=self._inner_loop, args=(),
+                            name=f"lane-{index}", daemon=True)
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @property
+    def worker(self):
+        return self._worker
+
+    def start(self):
+        self._loop.start()
+
+    def put(self, event: str, stop_event: DopStopEvent, done = None, delivery = None) -> bool:
+        # the put blocks when the lane is full (backpressure on the input
+        # provider); the wait is interrupted if an exit condition is signaled
+        # done (optional) is called when the event has been processed
+        # delivery (optional) is settled by the worker of the lane
+        while True:
+            try:
+                self._queue.put((event, done, delivery), timeout=1)
+                return True
+            except queue.Full:
+                if stop_event.is_exiting() or self._innerStopEvent.is_exiting():
+                    return False
+
+    def _inner_loop(self):
+        while True:
+            try:
+                event, done, delivery = self._queue.get(timeout=1)
+            except queue.Empty:
+                if self._innerStopEvent.is_exiting():
+                    break
+                continue
+
+            try:
+                self._worker.handlemsg(event, delivery)
+            except Exception as e:
+                print(f"{int(time.time())} | {getframeinfo(currentframe()).filename} | "\
+                        f"{getframeinfo(currentframe()).lineno} | {type(e)} | {traceback.format_exc()}", file = sys.stderr)
+                sys.stderr.flush()
+            finally:
+                if done is not None:
+                    done()
+                self._queue.task_done()
+
+    def stop(self):
+        #   the lane exits as soon as its queue has been drained
+        self._innerStopEvent.stop()
+
+    def join(self):
+        while self._loop.is_alive():
+            self._loop.join(1)
+
+
+class LaneDispatcher:
+    """
+    Select the lane of each incoming imperative, by hashing its session
+    """
+
+    def __init__(self, workers: list, queue_size: int, stop_event: DopStopEvent, logger = None):
+        self._lanes = [ExecutionLane(i, w, queue_size) for i, w in enumerate(workers)]
+        self._stop_event = stop_event
+        self._logger = logger
+
+    @property
+    def lanes(self) -> list:
+        return self._lanes
+
+    def open(self) -> DopError:
+        for lane in self._lanes:
+            lane.start()
+        return DopError()
+
+    def close(self) -> DopError:
+        for lane in self._lanes:
+            lane.stop()
+        for lane in self._lanes:
+            lane.join()
+        return DopError()
+
+    def select(self, key: str) -> ExecutionLane:
+        # crc32 is stable across processes (unlike hash() on str)
+        return self._lanes[zlib.crc32(key.encode()) % len(self._lanes)]
+
+    def dispatch(self, event: str, done = None, delivery = None):
+        # an event that is dropped (exit signaled) is not settled: it is delivered again
+        lane = self.select(session_key(event))
+        if not lane.put(event, self._stop_event, done, delivery):
+            if done is not None:
+                done()
+            if self._logger is not None:
+                self._logger.log(24607, LogSeverity.WARN,
+                    getframeinfo(currentframe()).filename, getframeinfo(currentframe()).lineno,
+                    {"msg": "Event dropped: exit signaled while the lane was full.", "lane": lane.index})
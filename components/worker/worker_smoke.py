@@ -0,0 +1,330 @@
+#   SPDX-License-Identifier: Apache-2.0
+#   © Copyright Ecosteer 2024
+
+#   ver:    1.0
+#   date:   18/10/2026
+
+"""
+Smoke check of the worker start-up.
+
+The worker is started as doof_worker.py starts it (run, thus main() with the
+default worker) with in-memory input, output, persistence and blockchain
+providers (defined in this module) and an echo pipeline: the input delivers
+messages events and the check passes if an event is written to the output
+for each of them. No broker, database or node is needed.
+
+From components/worker, with the repository root in PYTHONPATH (env.sh):
+
+    python worker_smoke.py [-p processes] [-n messages]
+
+with -p > 1 the worker processes are started by the supervisor (run_process,
+as doof_worker.py -p does): every process consumes its own messages events,
+and the check passes if all of them are processed and the processes exit
+without errors.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import traceback
+import uuid
+
+from common.python.error import DopError
+from common.python.event import DopEvent, DopEventHeader, DopEventPayload
+from common.python.new_processor_env import ProcessorEnvs
+from common.python.utils import DopUtils
+from provider.python.provider import Provider
+from provider.python.presentation.input.provider_pres_input import inputPresentationProvider
+from provider.python.presentation.output.provider_pres_output import outputPresentationProvider
+from provider.python.intermediation.worker.provider_worker import blockchainWorkerProvider
+from provider.python.processor.provider_processor import ProcessorProvider
+
+
+SMOKE_EVENT = "smoke_echo"
+
+
+class smokeInput(inputPresentationProvider):
+    """
+    configuration: 'messages=10;'
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._messages = 0
+        self._reader = None
+
+    def init(self, config: str) -> DopError:
+        err, d_config = DopUtils.config_to_dict(config)
+        if err.isError():
+            return err
+        self._messages = int(d_config.get('messages', 10))
+        return DopError()
+
+    def open(self) -> DopError:
+        return DopError()
+
+    def close(self) -> DopError:
+        if self._reader is not None:
+            self._reader.join()
+        return DopError()
+
+    def _deliver(self):
+        for task in range(self._messages):
+            if self.stopEvent is not None and self.stopEvent.is_exiting():
+                return
+            self._on_data("smoke", json.dumps({
+                "session": str(uuid.uuid4()),
+                "task": task,
+                "event": SMOKE_EVENT,
+                "params": {"auth_token": uuid.uuid4().hex}
+            }))
+
+    def read(self) -> DopError:
+        self._reader = threading.Thread(target=self._deliver, name="smoke-input", daemon=True)
+        self._reader.start()
+        return DopError()
+
+
+class smokeOutput(outputPresentationProvider):
+    """
+    configuration: 'file=/tmp/smoke_output;' (one line is appended for each event)
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._file = None
+        self._lock = threading.Lock()
+
+    def init(self, config: str) -> DopError:
+        err, d_config = DopUtils.config_to_dict(config)
+        if err.isError():
+            return err
+        if 'file' not in d_config:
+            return DopError(1, "configuration missing [file] key")
+        self._file = d_config['file']
+        return DopError()
+
+    def open(self) -> DopError:
+        return DopError()
+
+    def close(self) -> DopError:
+        return DopError()
+
+    def write(self, msg: str, additional_info: dict = None) -> DopError:
+        return self.write_to_endpoint(msg, None)
+
+    def writeEvent(self, msg: DopEvent, additional_info: dict = None) -> DopError:
+        return self.write_to_endpoint(json.dumps(msg.to_dict()), None)
+
+    def write_to_endpoint(self, msg, endpoint, additional_info: dict = None) -> DopError:
+        with self._lock:
+            with open(self._file, "a") as f:
+                f.write(msg.replace("\n", " ") + "\n")
+        return DopError()
+
+
+class smokePersistence(Provider):
+    # the methods of the persistence provider used by the worker itself
+
+    def init(self, config: str) -> DopError:
+        return DopError()
+
+    def open(self) -> DopError:
+        return DopError()
+
+    def close(self) -> DopError:
+        return DopError()
+
+    def attach_logger(self, logger):
+        pass
+
+    def available(self, timeout_s: float = 0) -> bool:
+        return True
+
+    def set_query_context(self, label: str):
+        pass
+
+    def set_read_only(self, read_only: bool):
+        pass
+
+    def begin_transaction(self) -> DopError:
+        return DopError()
+
+    def rollback(self) -> DopError:
+        return DopError()
+
+    def commit(self) -> DopError:
+        return DopError()
+
+    def query_stats(self) -> dict:
+        return {}
+
+    def pool_stats(self) -> dict:
+        return {}
+
+    def circuit_stats(self) -> dict:
+        return {}
+
+    def replica_stats(self) -> dict:
+        return {}
+
+    def sql_cache_stats(self) -> dict:
+        return {}
+
+
+class smokeBlockchain(blockchainWorkerProvider):
+
+    def init(self, config: str) -> DopError:
+        return DopError()
+
+    def open(self) -> DopError:
+        return DopError()
+
+    def close(self) -> DopError:
+        return DopError()
+
+    def begin_transaction(self) -> DopError:
+        return DopError()
+
+    def rollback(self) -> DopError:
+        return DopError()
+
+    def commit(self) -> DopError:
+        return DopError()
+
+
+class SmokeEchoProcessor(ProcessorProvider):
+    # replies to the session of the event with the pid of the worker process
+
+    def __init__(self):
+        super().__init__()
+        self._event_type = SMOKE_EVENT
+
+    def init(self, config: str) -> DopError:
+        return DopError()
+
+    def open(self) -> DopError:
+        return DopError()
+
+    def close(self) -> DopError:
+        return DopError()
+
+    def handle_event(self, event: DopEvent, envs: ProcessorEnvs) -> DopError:
+        header = DopEventHeader(event.header.session, event.header.task, f"{SMOKE_EVENT}_reply")
+        envs.events.push(event.header.session, DopEvent(header, DopEventPayload({"pid": os.getpid()})))
+        return DopError()
+
+
+def configuration(messages: int, output_file: str) -> dict:
+    this = os.path.abspath(__file__)
+    root = os.path.dirname(os.path.dirname(os.path.dirname(this)))
+    python = os.path.join(root, "provider", "python")
+    return {
+        "databaseProvider": {"path": this, "class": "smokePersistence", "configuration": ""},
+        "intermediationWorkerProvider": {"path": this, "class": "smokeBlockchain", "configuration": ""},
+        "inputProvider": {"path": this, "class": "smokeInput", "configuration": f"messages={messages};"},
+        "outputProvider": {"path": this, "class": "smokeOutput", "configuration": f"file={output_file};"},
+        "loggingProvider": {
+            "path": os.path.join(python, "logger", "stdout", "std_stream_logger.py"),
+            "class": "stdStreamLogger",
+            "configuration": "loglevel=1-2;name=24;qsize=10000"
+        },
+        "integrityProvider": {
+            "path": os.path.join(python, "integrity", "integrity_functions.py"),
+            "class": "IntegrityFunctionProvider",
+            "configuration": ""
+        },
+        "encodingProvider": {
+            "path": os.path.join(python, "encoding", "encoding_functions.py"),
+            "class": "EncodingFunctionProvider",
+            "configuration": ""
+        },
+        "cryptoProviders": {
+            "plaintext": {
+                "path": os.path.join(python, "encryption", "plaintext", "crypto_plaintext.py"),
+                "class": "CryptoPlaintext",
+                "configuration": ""
+            }
+        },
+        "macros": {},
+        "pipelines": {
+            SMOKE_EVENT: {
+                "main": [{"path": this, "class": "SmokeEchoProcessor", "configuration": ""}],
+                "finally": []
+            }
+        }
+    }
+
+
+def _read_output(output_file: str) -> list:
+    if not os.path.exists(output_file):
+        return []
+    with open(output_file) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def check(processes: int = 1, messages: int = 10, timeout_s: float = 60) -> int:
+    # imported here: the providers of this module are loaded by the worker, too
+    import doof_worker as dw
+    from worker_supervisor import WorkerSupervisor
+
+    workdir = tempfile.mkdtemp(prefix="worker_smoke_")
+    output_file = os.path.join(workdir, "output")
+    config_file = os.path.join(workdir, "worker_config.json")
+    with open(config_file, "w") as f:
+        json.dump(configuration(messages, output_file), f, indent=2)
+
+    expected = processes * messages
+
+    def stop_when_done():
+        deadline = time.monotonic() + timeout_s
+        while time.monotonic() < deadline and not dw.globalStopEvent.is_exiting():
+            if len(_read_output(output_file)) >= expected:
+                break
+            time.sleep(0.2)
+        dw.globalStopEvent.stop()
+
+    watcher = threading.Thread(target=stop_when_done, name="smoke-watcher", daemon=True)
+    watcher.start()
+
+    try:
+        if processes > 1:
+            # the children inherit the signal handlers: SIGTERM stops them
+            dw.signalManagement()
+            error = WorkerSupervisor(dw.run_process, (config_file,), processes, dw.globalStopEvent).run()
+        else:
+            error = dw.run(config_file)
+    except Exception:
+        # the providers threads are stopped by the stop event
+        dw.globalStopEvent.stop()
+        print(traceback.format_exc(), file=sys.stderr)
+        error = DopError(1, "exception while running the worker")
+    watcher.join()
+
+    events = _read_output(output_file)
+    replies = [event for event in events if event.get("event") == f"{SMOKE_EVENT}_reply"]
+    pids = {event.get("params", {}).get("pid") for event in replies}
+    if error.isError() or len(replies) < expected or len(pids) != processes:
+        print(f"smoke check FAILED: {len(replies)}/{expected} events processed by {len(pids)}/{processes} "\
+              f"processes, error: {error.code} {error.msg} (output: {output_file})")
+        return 1
+    print(f"smoke check passed: {len(replies)} events processed by {processes} process(es)")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Worker smoke check')
+    parser.add_argument('-p', '--processes', action="store", type=int, default=1, dest="processes",
+                        help='number of worker processes (supervised)')
+    parser.add_argument('-n', '--messages', action="store", type=int, default=10, dest="messages",
+                        help='number of events delivered to each process')
+    args = parser.parse_args()
+    code = check(args.processes, args.messages)
+    # a failed start can leave the threads of the providers opened so far running
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(code)
@@ -0,0 +1,123 @@
+#   SPDX-License-Identifier: Apache-2.0
+# © Copyright Ecosteer 2024
+
+#   ver:    1.0
+#   date:   18/10/2026
+
+"""
+Multi-process supervisor for the worker.
+
+The supervisor forks N worker processes: every child loads and opens its
+own providers (shared-nothing) and consumes from the same input queue
+as a competing consumer. Children that die are restarted (with an
+exponential backoff, reset once a child has been running long enough);
+when the stop event is set the shutdown signal is forwarded to every
+child and their exit status is aggregated.
+"""
+
+import multiprocessing
+import sys
+import time
+from inspect import currentframe, getframeinfo
+
+from common.python.error import DopError
+from common.python.threads import DopStopEvent
+
+
+class WorkerSupervisor:
+
+    def __init__(self, target, args: tuple, processes: int, stop_event: DopStopEvent,
+                 restart_delay_s: float = 1, restart_max_delay_s: float = 60,
+                 stable_s: float = 60, shutdown_timeout_s: float = 30):
+        """
+        target is the function run by each child: its return value is
+        ignored, the child exit code is the one set by the target (sys.exit)
+        """
+        # fork: the children inherit the already imported modules
+        # and the signal handlers of the supervisor
+        self._ctx = multiprocessing.get_context("fork")
+        self._target = target
+        self._args = args
+        self._processes = processes
+        self._stop_event = stop_event
+        self._restart_delay_s = restart_delay_s
+        self._restart_max_delay_s = restart_max_delay_s
+        self._stable_s = stable_s
+        self._shutdown_timeout_s = shutdown_timeout_s
+
+        self._children = [None] * processes         # slot -> Process
+        self._started_at = [0.0] * processes        # slot -> start time
+        self._delays = [restart_delay_s] * processes   # slot -> next restart delay
+        self._restart_at = [0.0] * processes        # slot -> earliest restart time
+        self._exit_codes = []                       # exit codes of all the terminated children
+
+    def _trace(self, msg: str):
+        print(f"{int(time.time())} | {getframeinfo(currentframe()).filename} | "\
+                f"{getframeinfo(currentframe()).lineno} | {msg}", file = sys.stderr)
+        sys.stderr.flush()
+
+    def _spawn(self, slot: int):
+        proc = self._ctx.Process(target=self._target, args=self._args, name=f"worker-{slot}")
+        proc.start()
+        self._children[slot] = proc
+        self._started_at[slot] = time.monotonic()
+        self._trace(f"worker {slot} started (pid {proc.pid})")
+
+    def _reap(self, slot: int):
+        proc = self._children[slot]
+        proc.join()
+        self._exit_codes.append(proc.exitcode)
+        self._children[slot] = None
+
+        now = time.monotonic()
+        if now - self._started_at[slot] >= self._stable_s:
+            # the child was healthy for a while: restart it immediately
+            self._delays[slot] = self._restart_delay_s
+        self._restart_at[slot] = now + self._delays[slot]
+        self._trace(f"worker {slot} (pid {proc.pid}) exited with code {proc.exitcode}, "\
+                    f"restart in {self._delays[slot]}s")
+        self._delays[slot] = min(self._delays[slot] * 2, self._restart_max_delay_s)
+
+    def _shutdown(self):
+        alive = [p for p in self._children if p is not None and p.is_alive()]
+        for proc in alive:
+            # SIGTERM: the child sets its own stop event and closes its providers
+            proc.terminate()
+
+        deadline = time.monotonic() + self._shutdown_timeout_s
+        for proc in alive:
+            proc.join(max(0, deadline - time.monotonic()))
+            if proc.is_alive():
+                self._trace(f"worker {proc.name} (pid {proc.pid}) did not exit, killing it")
+                proc.kill()
+                proc.join()
+
+        for proc in self._children:
+            if proc is not None:
+                self._exit_codes.append(proc.exitcode)
+        self._children = [None] * self._processes
+
+    def run(self) -> DopError:
+        """
+        Run the children until the stop event is set, then return
+        an error if any of the children exited with an error
+        """
+        for slot in range(self._processes):
+            self._spawn(slot)
+
+        while not self._stop_event.is_exiting():
+            for slot in range(self._processes):
+                proc = self._children[slot]
+                if proc is not None and not proc.is_alive():
+                    self._reap(slot)
+                if self._children[slot] is None and time.monotonic() >= self._restart_at[slot] \
+                        and not self._stop_event.is_exiting():
+                    self._spawn(slot)
+            self._stop_event.wait(1)
+
+        self._shutdown()
+
+        failed = [code for code in self._exit_codes if code != 0]
+        if len(failed) > 0:
+            return DopError(24701, f"{len(failed)} of {len(self._exit_codes)} worker processes exited with an error: {failed}")
+        return DopError()
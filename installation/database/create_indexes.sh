@@ -0,0 +1,19 @@
+#!/bin/sh
+
+if [ $# != 3 ]
+then
+    echo "Please supply a database name and a database user"
+    echo "Usage: create_indexes.sh DB_NAME DB_USER DB_PASSWORD"
+    exit 1
+fi
+
+DB_NAME=$1
+DB_USER=$2
+DB_PASSWORD=$3
+
+#       adds the secondary indexes to an existing database (the tables are not
+#       locked against writes while the indexes are built)
+#       an index whose concurrent build failed is left INVALID: drop it and run
+#       the script again
+
+sudo -u ${DB_USER} psql -d ${DB_NAME} -f create_indexes.sql
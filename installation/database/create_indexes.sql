@@ -0,0 +1,59 @@
+-- Secondary indexes of the predicates of the persistence providers
+-- (dbProviderPostgres, RIFdbProviderPostgres).
+--
+-- The script is idempotent: it is run by create_tables.sh on a new database
+-- and by create_indexes.sh to migrate an existing one. The indexes are built
+-- CONCURRENTLY, thus the tables are not locked against writes while they are
+-- built on a database in use (psql -f runs every statement in its own transaction).
+--
+-- Already indexed by their constraints:
+--      account (username), product (blk_address), product (id, label),
+--      product_subscription (subscriber, product, purpose_id), that also serves
+--      the lookups by subscriber and by (subscriber, product),
+--      products_subscribers (product, subscriber),
+--      rif_advertisement_interest (advertisement_id, product_id)
+
+
+-- session: lookup by value (and token) for every authenticated imperative, by client
+CREATE INDEX CONCURRENTLY IF NOT EXISTS session_value_token_idx ON session (value, token);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS session_client_idx ON session (client);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS encrypted_session_session_id_idx ON encrypted_session (session_id);
+
+-- account: lookup by blockchain address (case insensitive)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS account_blk_address_lower_idx ON account (lower(blk_address));
+
+-- blk_transaction: lookup by hash (the log processors match it case insensitive)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS blk_transaction_hash_idx ON blk_transaction (hash);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS blk_transaction_hash_lower_idx ON blk_transaction (lower(hash));
+
+-- blk_outbox: the transactions still to be sent, in order (submitter)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS blk_outbox_unsent_idx ON blk_outbox (id) WHERE status < 2;
+
+-- product: lookup by blockchain address (case insensitive), by publisher,
+-- keyset pagination of the listings
+CREATE INDEX CONCURRENTLY IF NOT EXISTS product_blk_address_lower_idx ON product (lower(blk_address));
+CREATE INDEX CONCURRENTLY IF NOT EXISTS product_publisher_idx ON product (publisher);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS product_created_at_id_idx ON product (created_at, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS product_usage_product_id_usage_idx ON product_usage (product_id, usage);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS product_usage_account_id_usage_idx ON product_usage (account_id, usage);
+
+-- product_subscription: subscriptions of a product (counts, subscribers lists)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS product_subscription_product_idx ON product_subscription (product);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS products_subscribers_subscriber_idx ON products_subscribers (subscriber);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS property_product_product_idx ON property_product (product);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS purpose_of_usage_subscriber_idx ON purpose_of_usage (subscriber);
+
+
+-- RIF tables: lookups by user
+CREATE INDEX CONCURRENTLY IF NOT EXISTS rif_advertisement_partner_id_idx ON rif_advertisement (partner_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS rif_advertisement_interest_account_id_idx ON rif_advertisement_interest (account_id, advertisement_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS rif_private_message_send_to_idx ON rif_private_message (send_to);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS rif_subscription_news_send_to_idx ON rif_subscription_news (send_to);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS rif_subscription_news_supplicant_id_idx ON rif_subscription_news (supplicant_id);
+
+ANALYZE;
@@ -88,6 +88,32 @@ CREATE TABLE  IF NOT EXISTS blk_transaction (
         ON UPDATE NO ACTION ON DELETE NO ACTION
 );
 
+-- contract calls of the write processors, sent by the submitter component
+-- (components/submitter): status 0 pending, 1 signed (tx_hash, raw_tx), 2 sent,
+-- 3 failed, 4 calling (the node is being called: if left so by a crash, the call
+-- has to be checked manually); the blk_transaction row is saved with the hash of
+-- the transaction
+CREATE TABLE IF NOT EXISTS blk_outbox (
+    id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    contract_function text NOT NULL,
+    contract_args text,
+    event_name text NOT NULL,
+    params text,
+    client UUID NOT NULL,
+    task INTEGER,
+    uuid UUID,
+    status INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    tx_hash text,
+    raw_tx text,
+    last_error text,
+    created_at TIMESTAMP NOT NULL DEFAULT now(),
+    next_attempt_at TIMESTAMP NOT NULL DEFAULT now(),
+    CONSTRAINT blk_outbox_client_fkey FOREIGN KEY (client)
+        REFERENCES account (id) MATCH SIMPLE
+        ON UPDATE NO ACTION ON DELETE NO ACTION
+);
+
 CREATE TABLE IF NOT EXISTS product (
     id UUID NOT NULL DEFAULT uuid_generate_v1() ,
     label text NOT NULL,
@@ -0,0 +1,96 @@
+-- Synthetic volumes for the EXPLAIN regression check of the persistence providers
+-- (provider/python/persistence/postgres/explain_queries.py).
+--
+-- TO BE USED ONLY ON A DEDICATED DATABASE, created by create_tables.sh:
+--
+--      psql -d DB_NAME -v scale=20000 -f seed_volumes.sql
+--
+-- scale (default 10000) is the number of accounts, products and purposes; the
+-- other tables get one or two rows for each of them. The ids are derived from
+-- md5('<table><n>')::uuid, so that the check can address the seeded rows:
+-- account n has username seed_user_<n>, session n has value seed_session_<n>.
+
+\if :{?scale}
+\else
+    \set scale 10000
+\endif
+
+BEGIN;
+
+INSERT INTO account (id, username, password, name, blk_address, blk_password, is_admin)
+    SELECT md5('account' || n)::uuid, 'seed_user_' || n, md5('password' || n), 'Seed user ' || n,
+           '0x' || lpad(to_hex(n), 40, '0'), 'seed', false
+    FROM generate_series(1, :scale) AS n
+    ON CONFLICT DO NOTHING;
+
+INSERT INTO session (client, value, token, status, last_updated)
+    SELECT md5('account' || (n % :scale + 1))::uuid, 'seed_session_' || n, 'seed_token_' || n, 1, NOW()
+    FROM generate_series(1, 2 * :scale) AS n;
+
+INSERT INTO encrypted_session (session_id, cipher_name, cipher_mode, cipher_keylength, key, encoding, integrity_fun)
+    SELECT id, 'AES', 'CBC', 256, md5(value), 'base64', 'crc16'
+    FROM session WHERE value LIKE 'seed_session_%';
+
+INSERT INTO purpose_of_usage (id, subscriber, label, url)
+    SELECT md5('purpose' || n)::uuid, md5('account' || n)::uuid, 'c2VlZA==', 'c2VlZA=='
+    FROM generate_series(1, :scale) AS n
+    ON CONFLICT DO NOTHING;
+
+INSERT INTO product (id, label, tariff_price, tariff_period, data_origin_id, blk_address, status,
+                     publisher, secret, sensor_type, created_at)
+    SELECT md5('product' || n)::uuid, 'Seed product ' || n, n % 100, n % 30, 'seed_origin_' || n,
+           '0x' || lpad(to_hex(n), 38, '0') || 'ff', 2, md5('account' || (n % :scale + 1))::uuid,
+           'secret', 'static', NOW() - n * INTERVAL '1 second'
+    FROM generate_series(1, :scale) AS n
+    ON CONFLICT DO NOTHING;
+
+-- the publisher (usage 1) and a subscriber (usage 2) of every product
+INSERT INTO product_usage (product_id, account_id, usage)
+    SELECT md5('product' || n)::uuid, md5('account' || (n % :scale + 1))::uuid, 1
+    FROM generate_series(1, :scale) AS n;
+INSERT INTO product_usage (product_id, account_id, usage)
+    SELECT md5('product' || n)::uuid, md5('account' || ((n * 7) % :scale + 1))::uuid, 2
+    FROM generate_series(1, :scale) AS n;
+
+INSERT INTO property_product (property, product)
+    SELECT (SELECT min(id) FROM property), md5('product' || n)::uuid
+    FROM generate_series(1, :scale) AS n;
+
+-- two subscriptions of every product
+INSERT INTO product_subscription (id, subscriber, subscriber_secret, product, purpose_id, granted, pending, blk_address)
+    SELECT md5('subscription' || n)::uuid, md5('account' || s)::uuid, 'secret',
+           md5('product' || (n % :scale + 1))::uuid, md5('purpose' || s)::uuid, n % 2, false,
+           '0x' || lpad(to_hex(n), 38, '0') || 'ee'
+    FROM (SELECT n, (n * 7 + n / :scale) % :scale + 1 AS s FROM generate_series(1, 2 * :scale) AS n) AS t
+    ON CONFLICT DO NOTHING;
+
+INSERT INTO blk_transaction (hash, params, event_name, client, task, uuid)
+    SELECT '0x' || md5('transaction' || n) || md5('hash' || n), '{}', 'dop_product_create',
+           md5('account' || (n % :scale + 1))::uuid, n, md5('product' || (n % :scale + 1))::uuid
+    FROM generate_series(1, 2 * :scale) AS n;
+
+INSERT INTO rif_advertisement (id, ads_lock, description, purpose_id, partner_id, recipient_ads_id)
+    SELECT md5('advertisement' || n)::uuid, 'lock', 'Seed advertisement ' || n, md5('purpose' || n)::uuid,
+           md5('account' || n)::uuid, md5('account' || n)::uuid
+    FROM generate_series(1, :scale) AS n
+    ON CONFLICT DO NOTHING;
+
+INSERT INTO rif_advertisement_interest (account_id, advertisement_id, accept, product_id)
+    SELECT md5('account' || (n % :scale + 1))::uuid, md5('advertisement' || n)::uuid, true,
+           md5('product' || n)::uuid
+    FROM generate_series(1, :scale) AS n
+    ON CONFLICT DO NOTHING;
+
+INSERT INTO rif_private_message (lock, subscription_id, message, send_to)
+    SELECT 'lock', md5('subscription' || n)::uuid, 'Seed message ' || n, md5('account' || (n % :scale + 1))::uuid
+    FROM generate_series(1, 2 * :scale) AS n;
+
+INSERT INTO rif_subscription_news (subscription_id, product_id, supplicant_id, purpose_id, action, send_to)
+    SELECT md5('subscription' || n)::uuid, md5('product' || (n % :scale + 1))::uuid,
+           md5('account' || (n % :scale + 1))::uuid, md5('purpose' || (n % :scale + 1))::uuid, n % 3,
+           md5('account' || ((n * 7) % :scale + 1))::uuid
+    FROM generate_series(1, 2 * :scale) AS n;
+
+COMMIT;
+
+ANALYZE;
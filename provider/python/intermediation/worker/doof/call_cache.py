@@ -0,0 +1,153 @@
+#   SPDX-License-Identifier: Apache-2.0
+#   © Copyright Ecosteer 2024
+
+#   ver:    1.0
+#   date:   18/10/2026
+
+"""
+Cache of the results of the view functions of the DOOF contract (memberInfo,
+productInfo, ...), shared by the worker providers of a process.
+
+The results are keyed by (function, args, block): the latest block number is read
+from the node at most every block_ttl_s seconds and the entries of the older
+blocks are dropped when a new block is seen. A transaction submitted by the
+worker drops the entries of the addresses it affects, and the results of those
+addresses are not cached again until the next block (the transaction is pending).
+The cache holds at most max_entries results (least recently used are dropped).
+"""
+
+import time
+from collections import OrderedDict
+from threading import Lock
+
+
+class ViewCallCache:
+
+    DEFAULT_ENTRIES = 1024
+    DEFAULT_BLOCK_TTL = 1       # seconds
+
+    def __init__(self, block_fun, max_entries: int = DEFAULT_ENTRIES, block_ttl_s: float = DEFAULT_BLOCK_TTL):
+        """
+        block_fun() -> int: the number of the latest block (node)
+        """
+        self._block_fun = block_fun
+        self._max_entries = max_entries
+        self._block_ttl_s = block_ttl_s
+        self._lock = Lock()
+        self._entries = OrderedDict()   # (function, args) -> result, of self._block
+        self._block = None
+        self._block_read_at = 0
+        self._pending = set()           # addresses of the transactions submitted in self._block
+
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def _address(address) -> str:
+        return address.lower() if isinstance(address, str) else address
+
+    def _latest_block(self):
+        # None if the block number cannot be read: the call is not cached
+        with self._lock:
+            if self._block is not None and time.monotonic() - self._block_read_at < self._block_ttl_s:
+                return self._block
+        try:
+            block = self._block_fun()
+        except Exception:
+            return None
+        with self._lock:
+            self._block_read_at = time.monotonic()
+            if self._block is None or block > self._block:
+                if len(self._entries) > 0:
+                    self._invalidations += 1
+                self._entries.clear()
+                self._pending.clear()
+                self._block = block
+            return self._block
+
+    def get(self, function: str, args: tuple):
+        """
+        (block, result) of the call of the function with args for the latest block:
+        result is None if it is not cached, block is None if it cannot be cached.
+        The cached results are shared: the caller must not modify them
+        """
+        if self._max_entries <= 0:
+            return (None, None)
+        block = self._latest_block()
+        if block is None:
+            return (None, None)
+        key = (function, args)
+        with self._lock:
+            if block == self._block and key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return (block, self._entries[key])
+            self._misses += 1
+        return (block, None)
+
+    def put(self, function: str, args: tuple, block, result):
+        # block: the one returned by get before the call
+        if block is None:
+            return
+        key = (function, args)
+        addresses = {self._address(arg) for arg in args}
+        with self._lock:
+            if block != self._block or not self._pending.isdisjoint(addresses):
+                return
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def call(self, function: str, args: tuple, call_fun, cacheable=None):
+        """
+        Return the result of call_fun() (the call of the function with args) for the
+        latest block; the result is cached if cacheable(result) is True (or None)
+        """
+        block, result = self.get(function, args)
+        if result is not None:
+            return result
+        result = call_fun()
+        if cacheable is None or cacheable(result):
+            self.put(function, args, block, result)
+        return result
+
+    def invalidate(self, *addresses):
+        # a transaction affecting the addresses is being submitted
+        addresses = {self._address(address) for address in addresses}
+        with self._lock:
+            self._pending.update(addresses)
+            stale = [key for key in self._entries
+                     if not addresses.isdisjoint(self._address(arg) for arg in key[1])]
+            for key in stale:
+                del self._entries[key]
+            if len(stale) > 0:
+                self._invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "invalidations": self._invalidations,
+                "entries": len(self._entries),
+                "block": self._block
+            }
+
+
+_shared_lock = Lock()
+_shared_caches = {}
+
+
+def shared_view_call_cache(key, block_fun, **kwargs) -> ViewCallCache:
+    """
+    Return the cache shared by the providers of the process with the same key
+    (e.g. the endpoint of the node and the address of the contract)
+    """
+    with _shared_lock:
+        cache = _shared_caches.get(key, None)
+        if cache is None:
+            cache = ViewCallCache(block_fun, **kwargs)
+            _shared_caches[key] = cache
+        return cache
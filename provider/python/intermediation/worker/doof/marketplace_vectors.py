@@ -0,0 +1,99 @@
+#   SPDX-License-Identifier: Apache-2.0
+#   © Copyright Ecosteer 2024
+
+#   ver:    1.0
+#   date:   18/10/2026
+
+"""
+Test vectors of marketplaceAddress and marketplaceHash (Doof.sol), computed
+locally by workerDoof: marketplace_vectors.json holds the input of each vector
+(UUIDs, empty string, multi-byte utf-8, inputs around the 136 bytes block of
+keccak256) and its output.
+
+NOTE the outputs of marketplace_vectors.json were computed offline with
+keccak256, not by the contract: until they are written by generate against a
+deployed contract, check without a configuration only compares the local
+computation with itself.
+
+From the repository root:
+
+    python -m provider.python.intermediation.worker.doof.marketplace_vectors check [config]
+
+        compare the local computation with the vectors and, if the configuration
+        string of the provider is given, with the deployed contract
+
+    python -m provider.python.intermediation.worker.doof.marketplace_vectors generate config
+
+        write the outputs of the deployed contract for the inputs of the vectors
+"""
+
+import json
+import os
+import sys
+
+from provider.python.intermediation.worker.doof.worker_doof import workerDoof
+
+
+VECTORS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "marketplace_vectors.json")
+
+
+def load(path: str = VECTORS_PATH) -> list:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def open_provider(config: str) -> workerDoof:
+    # the contract functions are called (local_hashes=False)
+    provider = workerDoof()
+    err = provider.init(config.rstrip(';') + ";local_hashes=False;")
+    if not err.isError():
+        err = provider.open()
+    if err.isError():
+        raise RuntimeError(f"cannot open the provider: {err.code} {err.msg}")
+    return provider
+
+
+def generate(config: str, path: str = VECTORS_PATH) -> int:
+    provider = open_provider(config)
+    vectors = load(path)
+    for vector in vectors:
+        err, output = getattr(provider, vector["function"])(vector["input"])
+        if err.isError():
+            print(f"{vector['function']}({vector['input']!r}): error {err.code}", file=sys.stderr)
+            return 1
+        vector["output"] = output
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(vectors, f, indent=2, ensure_ascii=False)
+    print(f"{len(vectors)} vectors written to {path}")
+    return 0
+
+
+def check(config: str = None, path: str = VECTORS_PATH) -> int:
+    provider = open_provider(config) if config else None
+    if provider is None:
+        print("no configuration: the vectors are checked against their outputs only")
+    failures = 0
+    for vector in load(path):
+        local = workerDoof.keccak_text(vector["input"])
+        expected = vector["output"]
+        if provider is not None:
+            err, expected = getattr(provider, vector["function"])(vector["input"])
+            if err.isError():
+                print(f"FAIL {vector['function']}({vector['input']!r}): contract error {err.code}")
+                failures += 1
+                continue
+        if local != expected:
+            print(f"FAIL {vector['function']}({vector['input']!r}): local {local}, expected {expected}")
+            failures += 1
+    print(f"{failures} failure(s)")
+    return 1 if failures > 0 else 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ("check", "generate") \
+            or (sys.argv[1] == "generate" and len(sys.argv) < 3):
+        print(__doc__)
+        sys.exit(2)
+    if sys.argv[1] == "generate":
+        sys.exit(generate(sys.argv[2]))
+    sys.exit(check(sys.argv[2] if len(sys.argv) > 2 else None))
@@ -0,0 +1,114 @@
+#   SPDX-License-Identifier: Apache-2.0
+#   © Copyright Ecosteer 2024
+
+#   ver:    1.0
+#   date:   18/10/2026
+
+"""
+Local state of the signed (private key) transactions of the DOOF worker provider.
+
+NonceManager hands out the nonces of an account locally: the pending transaction
+count is read from the node only the first time (and after a resync), then the
+nonce is incremented in memory for every transaction. It is thread-safe, so that
+the providers of several pipelines (execution lanes) can share it. The nonces are
+not shared between processes: an account must be used by one process only (the
+worker refuses use_pk with more than one process).
+
+GasLimitCache keeps the gas limit of the latest block for max_age_s seconds,
+instead of reading the latest block before every transaction.
+"""
+
+import time
+from threading import Lock
+
+
+# errors of the node (geth, Besu) meaning that the nonce has been used already
+_NONCE_USED = ("nonce too low", "nonce_too_low", "already known", "known transaction",
+               "replacement transaction underpriced")
+
+
+def nonce_used(e: Exception) -> bool:
+    return any(message in str(e).lower() for message in _NONCE_USED)
+
+
+class NonceManager:
+
+    def __init__(self, fetch_fun):
+        """
+        fetch_fun(address) -> int: the pending transaction count of the address (node)
+        """
+        self._fetch_fun = fetch_fun
+        self._lock = Lock()
+        self._next = {}     # address -> next nonce
+        self._resyncs = 0
+
+    def next(self, address: str) -> int:
+        with self._lock:
+            nonce = self._next.get(address, None)
+            if nonce is None:
+                nonce = self._fetch_fun(address)
+            self._next[address] = nonce + 1
+            return nonce
+
+    def release(self, address: str, nonce: int):
+        """
+        The transaction with the nonce was not sent: the nonce is handed out again
+        if it is the last one, otherwise (a gap) the nonces are read again from the node
+        """
+        with self._lock:
+            if self._next.get(address, None) == nonce + 1:
+                self._next[address] = nonce
+            else:
+                self._next.pop(address, None)
+
+    def resync(self, address: str):
+        # e.g. "nonce too low": the account was used by another process
+        with self._lock:
+            self._next.pop(address, None)
+            self._resyncs += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"accounts": len(self._next), "resyncs": self._resyncs}
+
+
+class GasLimitCache:
+
+    DEFAULT_MAX_AGE = 60    # seconds
+
+    def __init__(self, fetch_fun, max_age_s: float = DEFAULT_MAX_AGE):
+        """
+        fetch_fun() -> int: the gas limit of the latest block
+        """
+        self._fetch_fun = fetch_fun
+        self._max_age_s = max_age_s
+        self._lock = Lock()
+        self._gas_limit = None
+        self._read_at = 0
+
+    def get(self) -> int:
+        with self._lock:
+            if self._gas_limit is not None and time.monotonic() - self._read_at < self._max_age_s:
+                return self._gas_limit
+        gas_limit = self._fetch_fun()
+        with self._lock:
+            self._gas_limit = gas_limit
+            self._read_at = time.monotonic()
+        return gas_limit
+
+
+_shared_lock = Lock()
+_shared_nonces = {}
+
+
+def shared_nonce_manager(key, fetch_fun) -> NonceManager:
+    """
+    Return the nonce manager shared by the providers of the process with the
+    same key (e.g. the endpoint of the node)
+    """
+    with _shared_lock:
+        manager = _shared_nonces.get(key, None)
+        if manager is None:
+            manager = NonceManager(fetch_fun)
+            _shared_nonces[key] = manager
+        return manager
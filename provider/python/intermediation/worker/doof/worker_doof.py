@@ -13,13 +13,22 @@ from typing import Tuple, Optional, Union
 from common.python.error import DopError
 from common.python.utils import DopUtils
 from provider.python.intermediation.worker.provider_worker import blockchainWorkerProvider
+from provider.python.intermediation.worker.doof.nonce_manager import GasLimitCache, NonceManager, \
+    nonce_used, shared_nonce_manager
+from provider.python.intermediation.worker.doof.call_cache import ViewCallCache, shared_view_call_cache
 
 
 from web3 import Web3
 from web3.datastructures import AttributeDict
 from web3.exceptions import InvalidAddress
 from web3.middleware import geth_poa_middleware
+from web3.utils.abi import get_abi_output_types, map_abi_data
+from web3.utils.normalizers import BASE_RETURN_NORMALIZERS
+from web3.utils.request import make_post_request
+from eth_abi import decode_abi
+from hexbytes import HexBytes
 
+import json
 import time
 import sys
 
@@ -28,6 +37,9 @@ import sys
 ERR_CANT_CALL   = 100
 ERR_CALL_EXC    = 101
 ERR_TRANS_EXC   = 102
+ERR_LOCAL_HASH  = 103     #   the local marketplaceAddress/marketplaceHash differs from the contract
+ERR_NONCE_USED  = 104     #   the nonce of the signed transaction was used by another transaction
+ERR_CANT_SIGN   = 105     #   the transactions are not signed by the provider (use_pk)
 
 
 class workerDoof(blockchainWorkerProvider):
@@ -35,6 +47,10 @@ class workerDoof(blockchainWorkerProvider):
     Ethereum/Hyperledger provider
     """
     ETHER_STARTING_VALUE = 999
+    #   the functions that send a transaction (see sign_transaction)
+    TRANSACTION_FUNCTIONS = ('memberCreate', 'productCreate', 'productUpdate', 'subscriptionCreate',
+                             'subscriptionDelete', 'subscriptionGrant', 'subscriptionRevoke')
+    ERR_SIGN_AGAIN = ERR_NONCE_USED
 
     def begin_transaction(self) -> DopError:
         return DopError()
@@ -55,6 +71,7 @@ class workerDoof(blockchainWorkerProvider):
         self.owner_address = None       #   the marketplace owner (root)
         self.owner_password = None      #   the marketplace owner password
         self.w3 = None
+        self._rpc = None                #   the web3 provider (connection to the node)
         self.contract = None            #   marketplace contract address
         self.gas = 8000000              #   default gas
         #   properties for transaction signature using private key
@@ -62,6 +79,14 @@ class workerDoof(blockchainWorkerProvider):
         signer_pk   = None  #   the private key (from the configuration file)
         signer      = None  #   the account (from the private key) that will sign transaction
         chainId     = None  #   the chain id
+        self._nonces: NonceManager = None       #   nonces of the signer, handed out locally
+        self._gas_limits: GasLimitCache = None  #   gas limit of the latest block
+        self._calls: ViewCallCache = None       #   results of the view functions (latest block)
+        #   marketplaceAddress/marketplaceHash are computed locally (they are pure functions
+        #   of Doof.sol), optionally verified against the contract
+        self.local_hashes = True
+        self.verify_local_hashes = False
+        self.call_batch_size = 100      #   contract calls of a JSON-RPC batch request
 
 
         super().__init__()
@@ -142,7 +167,8 @@ class workerDoof(blockchainWorkerProvider):
             web3_provider = self._get_provider(provider)
         except NameError as e:
             return DopError(103, "Blockchain communication provider is not known/undefined.")
-        self.w3 = Web3(web3_provider(endpoint))
+        self._rpc = web3_provider(endpoint)
+        self.w3 = Web3(self._rpc)
         self.w3.middleware_stack.inject(geth_poa_middleware, layer=0)
         is_connected = self.w3.isConnected()
         if not is_connected:
@@ -159,6 +185,35 @@ class workerDoof(blockchainWorkerProvider):
         if self.use_pk == True:
             #   initialize the account
             self.signer = self.w3.eth.account.privateKeyToAccount(self.signer_pk)
+            #   the nonces of the signer are shared by the providers of the process (lanes)
+            self._nonces = shared_nonce_manager((endpoint, self.signer.address),
+                            lambda address: self.w3.eth.getTransactionCount(address, 'pending'))
+
+        self.local_hashes = (self.config.get('local_hashes', 'True') == 'True')
+        self.verify_local_hashes = (self.config.get('verify_local_hashes') == 'True')
+
+        #   gas_limit_ttl: seconds the gas limit of the latest block is cached for (0: read every time)
+        try:
+            gas_limit_ttl = int(self.config.get('gas_limit_ttl', GasLimitCache.DEFAULT_MAX_AGE))
+        except ValueError:
+            return DopError(102, "Ethereum provider configuration error; gas_limit_ttl must be an integer.")
+        self._gas_limits = GasLimitCache(lambda: self.w3.eth.getBlock('latest').gasLimit, gas_limit_ttl)
+
+        #   call_cache_size: results of the view functions cached (0: no cache)
+        #   call_cache_block_ttl: seconds the number of the latest block is cached for
+        try:
+            call_cache_size = int(self.config.get('call_cache_size', ViewCallCache.DEFAULT_ENTRIES))
+            call_cache_block_ttl = float(self.config.get('call_cache_block_ttl', ViewCallCache.DEFAULT_BLOCK_TTL))
+        except ValueError:
+            return DopError(102, "Ethereum provider configuration error; call_cache_size/call_cache_block_ttl must be numbers.")
+        try:
+            self.call_batch_size = max(int(self.config.get('call_batch_size', self.call_batch_size)), 1)
+        except ValueError:
+            return DopError(102, "Ethereum provider configuration error; call_batch_size must be an integer.")
+        if call_cache_size > 0:
+            self._calls = shared_view_call_cache((endpoint, self.contract_address),
+                            lambda: self.w3.eth.blockNumber,
+                            max_entries=call_cache_size, block_ttl_s=call_cache_block_ttl)
 
 
         #   check if everything is allright
@@ -181,6 +236,11 @@ class workerDoof(blockchainWorkerProvider):
     def canCall(self) -> bool:
         return self.contract != None
 
+    def call_cache_stats(self) -> dict:
+        if self._calls is None:
+            return {}
+        return self._calls.stats()
+
     #=======================================================================================
     #   smart contract interfaces (provider APIs)
     #=======================================================================================
@@ -189,9 +249,123 @@ class workerDoof(blockchainWorkerProvider):
     #   utils
     #=======================================================================================
 
+    @staticmethod
+    def keccak_text(data: str) -> str:
+        #   keccak256(bytes(data)) of Doof.sol: the string is ABI encoded as its utf-8 bytes
+        return '0x' + bytes(Web3.sha3(text=data)).hex()
+
+    def _local_hash(self, fun: str, data) -> Tuple[DopError, str]:
+        #   fun: the name of the (pure) contract function computed locally
+        if not isinstance(data, str):
+            return (DopError(ERR_CALL_EXC),'')
+        local = self.keccak_text(data)
+        if not self.verify_local_hashes:
+            return (DopError(),local)
+
+        try:
+            b_chain = getattr(self.contract.functions, fun)(data).call()
+        except Exception as e:
+            return (DopError(ERR_CALL_EXC),'')
+        chain = '0x' + b_chain.hex()
+        if chain != local:
+            print(f"{int(time.time())} | workerDoof | local {fun}({data!r}) = {local} differs from the contract: {chain}", 
+                  file=sys.stderr)
+            return (DopError(ERR_LOCAL_HASH),chain)
+        return (DopError(),local)
+
+    def _view(self, fun: str, *args) -> list:
+        #   the result (error code first) of the view function of the contract, cached
+        #   for the latest block if it is not an error; raises as the call
+        call_fun = lambda: getattr(self.contract.functions, fun)(*args).call()
+        if self._calls is None:
+            return call_fun()
+        return list(self._calls.call(fun, args, call_fun, lambda result: result[0] == 0))
+
+    def _submitting(self, *addresses):
+        #   a transaction changing the state of the addresses is going to be sent
+        if self._calls is not None:
+            self._calls.invalidate(*addresses)
+
+    def batch_call(self, calls: list) -> list:
+        """
+        calls: [(function, args), ...] of the view functions of the provider, e.g.
+        ('subscriptionInfo', (mkt_subscription_addr, mkt_supplicant_addr, supplicant_proxy_secret));
+        the contract calls (not cached) are sent in JSON-RPC batch requests (http provider)
+        and the results are returned in order, as the ones of the functions: [(DopError, result), ...]
+        """
+        if not isinstance(self._rpc, Web3.HTTPProvider):
+            return [self._single_call(fun, tuple(args)) for fun, args in calls]
+
+        results = [None] * len(calls)
+        pending = []        #   (index, function, args, block) of the calls to be sent
+        for idx, (fun, args) in enumerate(calls):
+            args = tuple(args)
+            result_fun = getattr(self, '_' + fun + 'Result', None)
+            if result_fun is None or not self.canCall():
+                results[idx] = self._single_call(fun, args)
+                continue
+            block, data = (None, None) if self._calls is None else self._calls.get(fun, args)
+            if data is not None:
+                results[idx] = result_fun(list(data))
+            else:
+                pending.append((idx, fun, args, block))
+
+        for start in range(0, len(pending), self.call_batch_size):
+            chunk = pending[start:start + self.call_batch_size]
+            try:
+                datas = self._batch_eth_call([(fun, args) for _, fun, args, _ in chunk])
+            except Exception as e:
+                #   e.g. batch requests not enabled on the node: the calls are sent one by one
+                print(f"{int(time.time())} | workerDoof | batch of {len(chunk)} calls failed: {e}", file=sys.stderr)
+                datas = [None] * len(chunk)
+            for (idx, fun, args, block), data in zip(chunk, datas):
+                if data is None or isinstance(data, Exception):
+                    results[idx] = self._single_call(fun, args)
+                    continue
+                if self._calls is not None and data[0] == 0:
+                    self._calls.put(fun, args, block, data)
+                results[idx] = getattr(self, '_' + fun + 'Result')(list(data))
+        return results
+
+    def _single_call(self, fun: str, args: tuple) -> tuple:
+        try:
+            return getattr(self, fun)(*args)
+        except Exception as e:
+            return (DopError(ERR_CALL_EXC),None)
+
+    def _batch_eth_call(self, calls: list) -> list:
+        #   the results of the contract calls (or the exception of each) of one JSON-RPC batch
+        functions = [getattr(self.contract.functions, fun)(*args) for fun, args in calls]
+        request = [{'jsonrpc': '2.0', 'id': idx, 'method': 'eth_call',
+                    'params': [{'to': self.contract_address, 'data': self.contract.encodeABI(fn_name=fun, args=list(args))},
+                               'latest']}
+                   for idx, (fun, args) in enumerate(calls)]
+        raw_response = make_post_request(self._rpc.endpoint_uri, json.dumps(request).encode(),
+                                         **self._rpc.get_request_kwargs())
+        responses = json.loads(raw_response)
+        if not isinstance(responses, list):
+            raise ValueError(responses.get('error', responses) if isinstance(responses, dict) else responses)
+        responses = {response.get('id'): response for response in responses}
+
+        results = []
+        for idx, function in enumerate(functions):
+            response = responses.get(idx, {})
+            try:
+                if 'result' not in response:
+                    raise ValueError(response.get('error', 'missing response'))
+                output_types = get_abi_output_types(function.abi)
+                data = map_abi_data(BASE_RETURN_NORMALIZERS, output_types,
+                                    decode_abi(output_types, HexBytes(response['result'])))
+                results.append(data[0] if len(data) == 1 else list(data))
+            except Exception as e:
+                results.append(e)
+        return results
+
     def marketplaceAddress(self, app_address) -> Tuple[DopError, str]:
         if not self.canCall():
             return (DopError(ERR_CANT_CALL),'')
+        if self.local_hashes:
+            return self._local_hash('marketplaceAddress', app_address)
         b_address: bytes
         try:
             b_address = self.contract.functions.marketplaceAddress(app_address).call()
@@ -204,6 +378,8 @@ class workerDoof(blockchainWorkerProvider):
     def marketplaceHash(self, data) -> Tuple[DopError, str]:
         if not self.canCall():
             return (DopError(ERR_CANT_CALL),'')
+        if self.local_hashes:
+            return self._local_hash('marketplaceHash', data)
         b_hash: bytes
         try:
             b_hash = self.contract.functions.marketplaceHash(data).call()
@@ -253,14 +429,94 @@ class workerDoof(blockchainWorkerProvider):
 
     def _pk_transaction(self) -> dict:
         t_properties = {}
-        t_properties['nonce']   = self.w3.eth.getTransactionCount(self.signer.address)
+        t_properties['nonce']   = self._nonces.next(self.signer.address)
         t_properties['from']    = self.signer.address
-        t_properties['gas']     = self.w3.eth.getBlock('latest').gasLimit
+        t_properties['gas']     = self._gas_limits.get()
         if self.chainId != None:
             t_properties['chainId'] = self.chainId
 
         return t_properties
 
+    def _sign_pk(self, contract_function):
+        #   build and sign the transaction of the contract function: (nonce, signed transaction)
+        t_properties = self._pk_transaction()
+        nonce = t_properties['nonce']
+        try:
+            transaction = contract_function.buildTransaction(t_properties)
+            return (nonce, self.w3.eth.account.signTransaction(transaction, self.signer.privateKey))
+        except Exception:
+            self._nonces.release(self.signer.address, nonce)
+            raise
+
+    def _send_pk(self, contract_function):
+        #   build, sign and send the transaction of the contract function: the transaction
+        #   is sent again (once) with a fresh nonce if the node reports the nonce as used
+        address = self.signer.address
+        for attempt in range(2):
+            nonce, signed_transaction = self._sign_pk(contract_function)
+            try:
+                return self.w3.eth.sendRawTransaction(signed_transaction.rawTransaction)
+            except Exception as e:
+                if nonce_used(e):
+                    self._nonces.resync(address)
+                    if attempt == 0:
+                        continue
+                else:
+                    #   not accepted by the node (e.g. connection error): the nonce is not used
+                    self._nonces.release(address, nonce)
+                raise
+
+
+
+    def sign_transaction(self, function: str, args: list) -> Tuple[DopError, dict]:
+        """
+        Build and sign, without sending it, the transaction of the function (one of
+        TRANSACTION_FUNCTIONS, same arguments): {'hash', 'raw', 'nonce'}.
+        The caller sends it with send_raw_transaction, or gives it back with
+        release_transaction if it is not going to be sent
+        """
+        if not self.canCall():
+            return (DopError(ERR_CANT_CALL),{})
+        if not self.use_pk or function not in self.TRANSACTION_FUNCTIONS:
+            return (DopError(ERR_CANT_SIGN),{})
+        try:
+            nonce, signed_transaction = self._sign_pk(getattr(self.contract.functions, function)(*args))
+        except Exception as e:
+            return (DopError(ERR_TRANS_EXC, e.__str__()),{})
+        return (DopError(),{'hash': signed_transaction.hash.hex(),
+                            'raw': signed_transaction.rawTransaction.hex(),
+                            'nonce': nonce})
+
+    def can_sign(self) -> bool:
+        return self.use_pk == True
+
+    def release_transaction(self, signed: dict):
+        #   the signed transaction is not going to be sent: its nonce is handed out again
+        #   (without the nonce, e.g. signed by another process, the nonces are read again)
+        if signed.get('nonce', None) is None:
+            self._nonces.resync(self.signer.address)
+        else:
+            self._nonces.release(self.signer.address, signed['nonce'])
+
+    def send_raw_transaction(self, raw: str, tx_hash: str) -> Tuple[DopError, str]:
+        """
+        Send the transaction signed by sign_transaction (raw), possibly again: it is
+        sent if the node knows it already. ERR_NONCE_USED: its nonce was used by
+        another transaction, it has to be signed again
+        """
+        try:
+            self.w3.eth.sendRawTransaction(HexBytes(raw))
+        except Exception as e:
+            if not nonce_used(e):
+                return (DopError(ERR_TRANS_EXC, e.__str__()),'')
+            try:
+                known = self.w3.eth.getTransaction(tx_hash) is not None
+            except Exception:
+                known = False
+            if not known:
+                self._nonces.resync(self.signer.address)
+                return (DopError(ERR_NONCE_USED, e.__str__()),'')
+        return (DopError(),tx_hash)
 
 
     def _memberCreatePk(self
@@ -278,11 +534,7 @@ class workerDoof(blockchainWorkerProvider):
         #   self.signer     is the account that has been found using self.w3.eth.account.privateKeyToAccount
 
         try:
-            t_properties = self._pk_transaction()
-            transaction = self.contract.functions.memberCreate(a_address, a_secret, a_proxy_secret).buildTransaction(t_properties)
-           
-            signed_transaction = self.w3.eth.account.signTransaction(transaction, self.signer.privateKey)
-            tx_hash = self.w3.eth.sendRawTransaction(signed_transaction.rawTransaction)
+            tx_hash = self._send_pk(self.contract.functions.memberCreate(a_address, a_secret, a_proxy_secret))
             
         except Exception as e:
             return (DopError(ERR_TRANS_EXC),e.__str__())
@@ -321,10 +573,13 @@ class workerDoof(blockchainWorkerProvider):
         
         info: list
         try:
-            info = self.contract.functions.memberInfo(mkt_member_addr, mkt_supplicant_addr, supplicant_proxy_secret).call()
+            info = self._view('memberInfo', mkt_member_addr, mkt_supplicant_addr, supplicant_proxy_secret)
         except Exception as e:
-            return DopError((ERR_CALL_EXC),{})
-        
+            return (DopError(ERR_CALL_EXC),{})
+        return self._memberInfoResult(info)
+
+    @staticmethod
+    def _memberInfoResult(info: list) -> Tuple [DopError, object]:
         err = DopError(info.pop(0))
         if err.isError():
             return (err,{})
@@ -386,14 +641,17 @@ class workerDoof(blockchainWorkerProvider):
         
         data: str
         try:
-            data = self.contract.functions.productGet(
-                mkt_product_addr
+            data = self._view('productGet'
+            ,   mkt_product_addr
             ,   slot_selector
             ,   mkt_supplicant_addr
-            ,   supplicant_proxy_secret).call()
+            ,   supplicant_proxy_secret)
         except Exception as e:
-            return DopError((ERR_CALL_EXC),'')
-        
+            return (DopError(ERR_CALL_EXC),'')
+        return self._productGetResult(data)
+
+    @staticmethod
+    def _productGetResult(data: list) -> Tuple [DopError, str]:
         err = DopError(data[0])
         if err.isError():
             return (err,'')
@@ -409,10 +667,13 @@ class workerDoof(blockchainWorkerProvider):
         
         data: str
         try:
-            data = self.contract.functions.productInfo(mkt_product_addr, mkt_supplicant_addr, supplicant_proxy_secret).call()
+            data = self._view('productInfo', mkt_product_addr, mkt_supplicant_addr, supplicant_proxy_secret)
         except Exception as e:
-            return DopError((ERR_CALL_EXC),{})
-        
+            return (DopError(ERR_CALL_EXC),{})
+        return self._productInfoResult(data)
+
+    @staticmethod
+    def _productInfoResult(data: list) -> Tuple [DopError, object]:
         err = DopError(data.pop(0))
         if err.isError():
             return (err,{})
@@ -441,15 +702,11 @@ class workerDoof(blockchainWorkerProvider):
             return (DopError(ERR_CANT_CALL),'')
         
         try:
-            t_properties = self._pk_transaction()
-            transaction = self.contract.functions.productUpdate(
+            tx_hash = self._send_pk(self.contract.functions.productUpdate(
                 mkt_product_addr
             ,   slot_selector
             ,   owner_proxy_secret
-            ,   new_data).buildTransaction(t_properties)
-           
-            signed_transaction = self.w3.eth.account.signTransaction(transaction, self.signer.privateKey)
-            tx_hash = self.w3.eth.sendRawTransaction(signed_transaction.rawTransaction)
+            ,   new_data))
 
         except Exception:
             return (DopError(ERR_TRANS_EXC),'')
@@ -465,6 +722,7 @@ class workerDoof(blockchainWorkerProvider):
         if not self.canCall():
             return (DopError(ERR_CANT_CALL),'')
         
+        self._submitting(mkt_product_addr)
         if self.use_pk==True:
             return self._productUpdatePk(mkt_product_addr, slot_selector, owner_proxy_secret, new_data)
         
@@ -495,18 +753,13 @@ class workerDoof(blockchainWorkerProvider):
             return (DopError(ERR_CANT_CALL),'')
         
         try:
-            t_properties = self._pk_transaction()
-
-            transaction = self.contract.functions.productCreate(
+            tx_hash = self._send_pk(self.contract.functions.productCreate(
                 a_address
             ,   mkt_owner_addr
             ,   mkt_payee_addr
             ,   a_proxy_secret
             ,   price
-            ,   period).buildTransaction(t_properties)
-
-            signed_transaction = self.w3.eth.account.signTransaction(transaction, self.signer.privateKey)
-            tx_hash = self.w3.eth.sendRawTransaction(signed_transaction.rawTransaction)
+            ,   period))
 
             tx_hash = tx_hash.hex()
 
@@ -526,6 +779,7 @@ class workerDoof(blockchainWorkerProvider):
         if not self.canCall():
             return (DopError(ERR_CANT_CALL),'')
         
+        self._submitting(mkt_owner_addr, mkt_payee_addr)
         if self.use_pk:
             return self._productCreatePk(a_address, mkt_owner_addr, mkt_payee_addr, a_proxy_secret, price, period)
         
@@ -556,14 +810,17 @@ class workerDoof(blockchainWorkerProvider):
         
         b_subscriptions: list
         try:
-            b_subscriptions = self.contract.functions.productSubscriptions(
-                mkt_product_addr
+            b_subscriptions = self._view('productSubscriptions'
+            ,   mkt_product_addr
             ,   mkt_supplicant_addr
             ,   supplicant_proxy_secret
-            ).call()
+            )
         except Exception as e:
-            return DopError((ERR_CALL_EXC),[])
-        
+            return (DopError(ERR_CALL_EXC),[])
+        return self._productSubscriptionsResult(b_subscriptions)
+
+    @staticmethod
+    def _productSubscriptionsResult(b_subscriptions: list) -> Tuple[DopError, list]:
         err = DopError(b_subscriptions[0])
         if err.isError():
             return (err, [])
@@ -589,16 +846,12 @@ class workerDoof(blockchainWorkerProvider):
             return (DopError(ERR_CANT_CALL),'')
         
         try:
-            t_properties = self._pk_transaction()
-            transaction = self.contract.functions.subscriptionCreate(
+            tx_hash = self._send_pk(self.contract.functions.subscriptionCreate(
                 a_address
             ,   mkt_product_addr
             ,   mkt_sub_addr
             ,   sub_proxy_secret
-            ).buildTransaction(t_properties)
-
-            signed_transaction = self.w3.eth.account.signTransaction(transaction, self.signer.privateKey)
-            tx_hash = self.w3.eth.sendRawTransaction(signed_transaction.rawTransaction)
+            ))
 
             tx_hash = tx_hash.hex()
 
@@ -616,6 +869,7 @@ class workerDoof(blockchainWorkerProvider):
         if not self.canCall():
             return (DopError(ERR_CANT_CALL),'')
         
+        self._submitting(mkt_product_addr, mkt_sub_addr)
         if self.use_pk==True:
             return self._subscriptionCreatePk(a_address, mkt_product_addr, mkt_sub_addr, sub_proxy_secret)
         
@@ -644,16 +898,12 @@ class workerDoof(blockchainWorkerProvider):
             return (DopError(ERR_CANT_CALL),'')
         
         try:
-            t_properties = self._pk_transaction()
-            transaction = self.contract.functions.subscriptionDelete(
+            tx_hash = self._send_pk(self.contract.functions.subscriptionDelete(
                 mkt_subscription_addr
             ,   mkt_product_addr
             ,   mkt_sub_addr
             ,   sub_proxy_secret
-            ).buildTransaction(t_properties)
-
-            signed_transaction = self.w3.eth.account.signTransaction(transaction, self.signer.privateKey)
-            tx_hash = self.w3.eth.sendRawTransaction(signed_transaction.rawTransaction)
+            ))
 
             tx_hash = tx_hash.hex()
 
@@ -672,6 +922,7 @@ class workerDoof(blockchainWorkerProvider):
             return (DopError(ERR_CANT_CALL),'')
         
         
+        self._submitting(mkt_subscription_addr, mkt_product_addr, mkt_sub_addr)
         if self.use_pk==True:
             return self._subscriptionDeletePk(mkt_subscription_addr, mkt_product_addr, mkt_sub_addr, sub_proxy_secret)
         
@@ -704,10 +955,13 @@ class workerDoof(blockchainWorkerProvider):
         
         data: str
         try:
-            data = self.contract.functions.subscriptionInfo(mkt_subscription_addr, mkt_supplicant_addr, supplicant_proxy_secret).call()
+            data = self._view('subscriptionInfo', mkt_subscription_addr, mkt_supplicant_addr, supplicant_proxy_secret)
         except Exception as e:
-            return DopError((ERR_CALL_EXC),{})
-        
+            return (DopError(ERR_CALL_EXC),{})
+        return self._subscriptionInfoResult(data)
+
+    @staticmethod
+    def _subscriptionInfoResult(data: list) -> Tuple [DopError, object]:
         err = DopError(data.pop(0))
         if err.isError():
             return (err,{})
@@ -735,10 +989,13 @@ class workerDoof(blockchainWorkerProvider):
         
         data: str
         try:
-            data = self.contract.functions.subscriptionStatusGet(mkt_subscription_addr, mkt_supplicant_addr, supplicant_proxy_secret).call()
+            data = self._view('subscriptionStatusGet', mkt_subscription_addr, mkt_supplicant_addr, supplicant_proxy_secret)
         except Exception as e:
-            return DopError((ERR_CALL_EXC),{})
-        
+            return (DopError(ERR_CALL_EXC),{})
+        return self._subscriptionStatusGetResult(data)
+
+    @staticmethod
+    def _subscriptionStatusGetResult(data: list) -> Tuple [DopError, object]:
         err = DopError(data.pop(0))
         if err.isError():
             return (err,{})
@@ -760,14 +1017,10 @@ class workerDoof(blockchainWorkerProvider):
             return (DopError(ERR_CANT_CALL),'')
         
         try:
-            t_properties = self._pk_transaction()
-            transaction = self.contract.functions.subscriptionGrant(
+            tx_hash = self._send_pk(self.contract.functions.subscriptionGrant(
                 mkt_subscription_addr
             ,   owner_proxy_secret
-            ).buildTransaction(t_properties)
-           
-            signed_transaction = self.w3.eth.account.signTransaction(transaction, self.signer.privateKey)
-            tx_hash = self.w3.eth.sendRawTransaction(signed_transaction.rawTransaction)
+            ))
             
         except Exception as e:
             return (DopError(ERR_TRANS_EXC),e.__str__())
@@ -780,6 +1033,7 @@ class workerDoof(blockchainWorkerProvider):
         if not self.canCall():
             return (DopError(ERR_CANT_CALL),'')
         
+        self._submitting(mkt_subscription_addr)
         if self.use_pk==True:
             return self._subscriptionGrantPk(mkt_subscription_addr, owner_proxy_secret)
         
@@ -806,14 +1060,10 @@ class workerDoof(blockchainWorkerProvider):
         
         try:
 
-            t_properties = self._pk_transaction()
-            transaction = self.contract.functions.subscriptionRevoke(
+            tx_hash = self._send_pk(self.contract.functions.subscriptionRevoke(
                 mkt_subscription_addr
             ,   owner_proxy_secret
-            ).buildTransaction(t_properties)
-           
-            signed_transaction = self.w3.eth.account.signTransaction(transaction, self.signer.privateKey)
-            tx_hash = self.w3.eth.sendRawTransaction(signed_transaction.rawTransaction)
+            ))
 
         except Exception as e:
             return (DopError(ERR_TRANS_EXC),e.__str__())
@@ -826,6 +1076,7 @@ class workerDoof(blockchainWorkerProvider):
         if not self.canCall():
             return (DopError(ERR_CANT_CALL),'')
         
+        self._submitting(mkt_subscription_addr)
         if self.use_pk == True:
             return self._subscriptionRevokePk(mkt_subscription_addr, owner_proxy_secret)
         
@@ -919,7 +1170,7 @@ class workerDoof(blockchainWorkerProvider):
         if unlock:
             self._unlock(kwargs['from'], password)
         if not kwargs.get('gas', None):
-            kwargs['gas'] = self.w3.eth.getBlock('latest').gasLimit
+            kwargs['gas'] = self._gas_limits.get()
         return kwargs
 
     
@@ -43,3 +43,49 @@ class blockchainWorkerProvider(Provider):
     def commit(self) -> DopError:
         """
         """
+
+    #   the functions of the provider that send a transaction
+    TRANSACTION_FUNCTIONS = ()
+    #   error code of send_raw_transaction: the transaction has to be signed again
+    ERR_SIGN_AGAIN = None
+
+    def can_sign(self) -> bool:
+        """
+        True if the provider signs the transactions (sign_transaction): otherwise
+        the transactions are sent by the functions of the provider
+        """
+        return False
+
+    def sign_transaction(self, function: str, args: list) -> Tuple[DopError, dict]:
+        """
+        Build and sign, without sending it, the transaction of the function:
+        {'hash', 'raw'}; an error if the provider does not sign the transactions
+        """
+        return (DopError(1, "The provider does not sign the transactions."), {})
+
+    def release_transaction(self, signed: dict):
+        """
+        The transaction signed by sign_transaction (at least its 'hash') is not
+        going to be sent
+        """
+        pass
+
+    def send_raw_transaction(self, raw: str, tx_hash: str) -> Tuple[DopError, str]:
+        """
+        Send (again) the transaction signed by sign_transaction
+        """
+        return (DopError(1, "The provider does not sign the transactions."), '')
+
+    def batch_call(self, calls: list) -> list:
+        """
+        calls: [(function, args), ...] of the read-only functions of the provider;
+        returns [(DopError, result), ...] in order. The providers that can send
+        the calls in one request override it
+        """
+        return [getattr(self, function)(*args) for function, args in calls]
+
+    def call_cache_stats(self) -> dict:
+        """
+        hits/misses of the cache of the read-only contract calls ({} if there is no cache)
+        """
+        return {}
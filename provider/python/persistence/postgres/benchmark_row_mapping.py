@@ -0,0 +1,89 @@
+#   SPDX-License-Identifier: Apache-2.0
+# © Copyright Ecosteer 2024
+
+#   ver:    1.0
+#   date:   18/10/2026
+
+"""
+Micro-benchmark of the mapping of a result set (e.g. a subscription list)
+to records and to ProductSubscription models: the per-cell cursor.description
+lookup of the former serialize() against row_mapping.
+
+No database is needed, the cursor is simulated. Every case is timed repeat
+times (each time the mapping runs as many times as needed to last at least
+0.2 s): the minimum and the median of the time of one mapping are reported.
+From the repository root:
+
+    python -m provider.python.persistence.postgres.benchmark_row_mapping [rows] [repeat]
+"""
+
+import datetime
+import statistics
+import sys
+import timeit
+import uuid
+
+from common.python.model.models import ProductSubscription
+from provider.python.persistence.postgres.row_mapping import columns, rows_to_dicts, rows_to_models
+
+
+class FakeCursor:
+    def __init__(self, names: list):
+        # the description of a pyodbc cursor: a 7-tuple for each column
+        self.description = [(name, str, None, None, None, None, True) for name in names]
+
+
+NAMES = ["id", "subscriber", "subscriber_secret", "product", "purpose_id",
+         "created_at", "granted", "pending", "blk_address"]
+
+
+def make_rows(count: int) -> list:
+    now = datetime.datetime.utcnow()
+    return [(str(uuid.uuid4()), str(uuid.uuid4()), "secret", str(uuid.uuid4()), str(uuid.uuid4()),
+             now, 1, False, "0x" + "0" * 40) for _ in range(count)]
+
+
+def legacy_serialize(resource, cursor):
+    # the former postgres_provider.serialize
+    response = {}
+    if isinstance(resource, list):
+        response = []
+        for row in resource:
+            response.append(legacy_serialize(row, cursor))
+    else:
+        if resource:
+            for idx, value in enumerate(resource):
+                response[cursor.description[idx][0]] = value
+    return response
+
+
+def legacy_models(cursor, rows) -> list:
+    return [ProductSubscription(**element) for element in legacy_serialize(rows, cursor)]
+
+
+def measure(fun, repeat: int) -> list:
+    # the seconds of one call of fun, for each repetition
+    timer = timeit.Timer(fun)
+    number, _ = timer.autorange()
+    number = max(number, 1)
+    return [elapsed / number for elapsed in timer.repeat(repeat=repeat, number=number)]
+
+
+def run(count: int = 10000, repeat: int = 7):
+    cursor = FakeCursor(NAMES)
+    rows = make_rows(count)
+
+    cases = [
+        ("dict: per-cell description lookup", lambda: legacy_serialize(rows, cursor)),
+        ("dict: dict(zip(columns, row))", lambda: rows_to_dicts(cursor, rows)),
+        ("model: serialize + model(**dict)", lambda: legacy_models(cursor, rows)),
+        ("model: rows_to_models", lambda: rows_to_models(ProductSubscription, columns(cursor), rows)),
+    ]
+    print(f"{count} rows, {repeat} repetitions {'':11s} min   median")
+    for label, fun in cases:
+        times = measure(fun, repeat)
+        print(f"{label:40s} {min(times) * 1000:8.2f} {statistics.median(times) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,190 @@
+#   SPDX-License-Identifier: Apache-2.0
+# © Copyright Ecosteer 2024
+
+#   ver:    1.0
+#   date:   18/10/2026
+
+"""
+Circuit breaker of the database shared by the persistence providers of a process.
+
+- closed:    the statements are executed; failure_threshold consecutive recoverable
+             errors open the circuit;
+- open:      the providers fail fast (no statement is attempted, no thread sleeps);
+             a background thread probes the database with jittered exponential
+             backoff and half-opens the circuit when the probe succeeds;
+- half-open: one trial call at a time goes through: its success closes the
+             circuit, its failure opens it again.
+"""
+
+import random
+import threading
+import time
+from threading import Condition, Lock
+
+
+class CircuitBreaker:
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    DEFAULT_FAILURES = 3        # consecutive recoverable errors that open the circuit
+    DEFAULT_BACKOFF = 1         # seconds, first delay of the probes
+    DEFAULT_MAX_BACKOFF = 60    # seconds
+
+    def __init__(self, probe_fun, failure_threshold: int = DEFAULT_FAILURES,
+                 backoff_s: float = DEFAULT_BACKOFF, max_backoff_s: float = DEFAULT_MAX_BACKOFF):
+        """
+        probe_fun(): checks the database (e.g. connects and runs SELECT 1), raises on failure
+        """
+        self._probe_fun = probe_fun
+        self._failure_threshold = max(failure_threshold, 1)
+        self._backoff_s = backoff_s
+        self._max_backoff_s = max(max_backoff_s, backoff_s)
+
+        self._cond = Condition(Lock())
+        self._state = CircuitBreaker.CLOSED
+        self._failures = 0
+        self._trial_since = None    # start of the trial call (half-open)
+        self._prober = None
+        self._refs = 0
+        self._closed = False
+
+        self._opened = 0            # times the circuit was opened
+        self._probes = 0
+        self._rejected = 0          # calls failed fast
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def allow(self) -> bool:
+        """
+        True if the caller can use the database: it has to report the outcome
+        with record_success/record_failure
+        """
+        if self._state == CircuitBreaker.CLOSED:
+            return True
+        with self._cond:
+            if self._state == CircuitBreaker.CLOSED:
+                return True
+            if self._state == CircuitBreaker.HALF_OPEN:
+                # a trial that did not report within max_backoff_s is considered lost
+                now = time.monotonic()
+                if self._trial_since is None or now - self._trial_since > self._max_backoff_s:
+                    self._trial_since = now
+                    return True
+            self._rejected += 1
+            return False
+
+    def record_success(self):
+        if self._state == CircuitBreaker.CLOSED and self._failures == 0:
+            return
+        with self._cond:
+            self._failures = 0
+            self._trial_since = None
+            if self._state != CircuitBreaker.CLOSED:
+                self._state = CircuitBreaker.CLOSED
+                self._cond.notify_all()
+
+    def record_failure(self) -> bool:
+        """
+        A recoverable (connection) error: returns True if the circuit is open
+        """
+        with self._cond:
+            self._failures += 1
+            if self._state == CircuitBreaker.HALF_OPEN or self._failures >= self._failure_threshold:
+                self._open()
+            return self._state == CircuitBreaker.OPEN
+
+    def wait_closed(self, timeout_s: float) -> bool:
+        # wait (at most timeout_s) for the circuit to be no more open
+        with self._cond:
+            if self._state == CircuitBreaker.OPEN and timeout_s > 0:
+                self._cond.wait_for(lambda: self._state != CircuitBreaker.OPEN or self._closed, timeout_s)
+            return self._state != CircuitBreaker.OPEN
+
+    def _open(self):
+        # called with the lock held
+        self._trial_since = None
+        if self._state == CircuitBreaker.OPEN:
+            return
+        self._state = CircuitBreaker.OPEN
+        self._opened += 1
+        if self._closed:
+            return
+        if self._prober is None or not self._prober.is_alive():
+            self._prober = threading.Thread(target=self._probe, name="db-circuit-probe", daemon=True)
+            self._prober.start()
+
+    def _delay(self, attempt: int) -> float:
+        # exponential backoff with jitter: the probes of several processes are spread
+        delay = min(self._max_backoff_s, self._backoff_s * (2 ** attempt))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _probe(self):
+        attempt = 0
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._closed, self._delay(attempt))
+                if self._closed or self._state != CircuitBreaker.OPEN:
+                    self._prober = None
+                    return
+                self._probes += 1
+            try:
+                self._probe_fun()
+            except Exception:
+                attempt = min(attempt + 1, 32)
+                continue
+            with self._cond:
+                self._prober = None
+                if self._state == CircuitBreaker.OPEN:
+                    self._state = CircuitBreaker.HALF_OPEN
+                    self._cond.notify_all()
+                return
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "state": self._state,
+                "failures": self._failures,
+                "opened": self._opened,
+                "probes": self._probes,
+                "rejected": self._rejected
+            }
+
+    def attach(self):
+        with self._cond:
+            self._refs += 1
+
+    def detach(self):
+        # the probes are stopped when the last provider detaches
+        with self._cond:
+            self._refs -= 1
+            if self._refs > 0:
+                return
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+
+_shared_lock = Lock()
+_shared = {}
+
+
+def shared_circuit_breaker(key, probe_fun, **kwargs) -> CircuitBreaker:
+    """
+    Return the circuit breaker shared by all the persistence providers of the process
+    with the same key (e.g. the connection string): the caller attaches to it and has
+    to detach when it is closed
+    """
+    with _shared_lock:
+        breaker = _shared.get(key, None)
+        if breaker is None or breaker.closed:
+            breaker = CircuitBreaker(probe_fun, **kwargs)
+            _shared[key] = breaker
+        breaker.attach()
+        return breaker
@@ -0,0 +1,222 @@
+#   SPDX-License-Identifier: Apache-2.0
+# © Copyright Ecosteer 2024
+
+#   ver:    1.0
+#   date:   18/10/2026
+
+"""
+Pool of database connections shared by the persistence providers of a process.
+
+A provider binds one connection of the pool for the lifetime of a pipeline
+transaction (from the first statement to commit/rollback), so that concurrent
+pipelines (execution lanes, asyncio runtime) never share a transaction and
+the number of connections to the database is bounded by max_size.
+
+The connections that have been idle for a while are health-checked when
+they are checked out; broken connections are discarded (and replaced) by
+the provider that detects the error, without holding other connections.
+"""
+
+import time
+from threading import Condition, Lock
+
+
+class PoolTimeout(Exception):
+    """
+    No connection became available within the checkout timeout
+    """
+
+
+class ConnectionPool:
+
+    DEFAULT_MIN_SIZE = 1
+    DEFAULT_MAX_SIZE = 8
+    DEFAULT_TIMEOUT = 30        # seconds waited for a connection
+    DEFAULT_CHECK_IDLE = 30     # seconds of idleness after which a connection is checked on checkout
+
+    def __init__(self, connect_fun, check_fun, min_size: int = DEFAULT_MIN_SIZE, max_size: int = DEFAULT_MAX_SIZE,
+                 timeout_s: float = DEFAULT_TIMEOUT, check_idle_s: float = DEFAULT_CHECK_IDLE):
+        """
+        connect_fun() returns a new connection (it raises on failure)
+        check_fun(connection) returns True if the connection is still usable
+        """
+        self._connect_fun = connect_fun
+        self._check_fun = check_fun
+        self._min_size = min_size
+        self._max_size = max(max_size, min_size, 1)
+        self._timeout_s = timeout_s
+        self._check_idle_s = check_idle_s
+
+        self._cond = Condition(Lock())
+        self._idle = []             # (connection, released_at), most recently released last
+        self._size = 0              # connections open (idle and checked out)
+        self._closed = False
+        self._refs = 0              # providers attached to the pool
+        self._states = {}           # id(connection) -> state kept by the providers (e.g. prepared statements)
+
+        # metrics
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_total_s = 0.0
+        self._wait_max_s = 0.0
+        self._timeouts = 0
+        self._discarded = 0
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def fill(self):
+        # open the min_size connections (errors are raised to the caller)
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self._min_size:
+                    return
+                self._size += 1
+            try:
+                connection = self._connect_fun()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            self.release(connection)
+
+    def acquire(self):
+        started_at = time.monotonic()
+        waited = False
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeout("The connection pool is closed.")
+                if len(self._idle) > 0:
+                    connection, released_at = self._idle.pop()
+                    break
+                if self._size < self._max_size:
+                    self._size += 1
+                    connection, released_at = None, None
+                    break
+                remaining = self._timeout_s - (time.monotonic() - started_at)
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeout(f"No connection available within {self._timeout_s}s.")
+                waited = True
+                self._cond.wait(remaining)
+
+            wait_s = time.monotonic() - started_at
+            self._checkouts += 1
+            if waited:
+                self._waits += 1
+                self._wait_total_s += wait_s
+                self._wait_max_s = max(self._wait_max_s, wait_s)
+
+        if connection is not None:
+            if time.monotonic() - released_at < self._check_idle_s or self._check(connection):
+                return connection
+            # broken idle connection: it is replaced by a new one, in the same slot
+            self._close_quietly(connection)
+            with self._cond:
+                self._states.pop(id(connection), None)
+                self._discarded += 1
+
+        try:
+            return self._connect_fun()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def _check(self, connection) -> bool:
+        try:
+            return self._check_fun(connection)
+        except Exception:
+            return False
+
+    def _close_quietly(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def state(self, connection) -> dict:
+        # the state lives as long as the connection
+        with self._cond:
+            return self._states.setdefault(id(connection), {})
+
+    def _drop(self, connection):
+        self._close_quietly(connection)
+        with self._cond:
+            self._states.pop(id(connection), None)
+            self._size -= 1
+            self._discarded += 1
+            self._cond.notify()
+
+    def release(self, connection):
+        with self._cond:
+            if not self._closed:
+                self._idle.append((connection, time.monotonic()))
+                self._cond.notify()
+                return
+        self._drop(connection)
+
+    def discard(self, connection):
+        # the connection is broken: it is closed and its slot is freed
+        self._drop(connection)
+
+    def attach(self):
+        with self._cond:
+            self._refs += 1
+
+    def detach(self) -> bool:
+        # the pool is closed when the last provider detaches: returns True if it was closed
+        with self._cond:
+            self._refs -= 1
+            if self._refs > 0:
+                return False
+        self.close()
+        return True
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle = self._idle
+            self._idle = []
+            self._cond.notify_all()
+        for connection, _ in idle:
+            self._drop(connection)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "max_size": self._max_size,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "wait_total_s": self._wait_total_s,
+                "wait_max_s": self._wait_max_s,
+                "wait_avg_s": self._wait_total_s / self._waits if self._waits > 0 else 0.0,
+                "timeouts": self._timeouts,
+                "discarded": self._discarded
+            }
+
+
+_shared_lock = Lock()
+_shared = {}
+
+
+def shared_connection_pool(key, connect_fun, check_fun, **kwargs) -> ConnectionPool:
+    """
+    Return the pool shared by all the persistence providers of the process with the
+    same key (e.g. the connection string): the caller attaches to it and has to
+    detach when it is closed
+    """
+    with _shared_lock:
+        pool = _shared.get(key, None)
+        if pool is None or pool.closed:
+            pool = ConnectionPool(connect_fun, check_fun, **kwargs)
+            _shared[key] = pool
+        pool.attach()
+        return pool
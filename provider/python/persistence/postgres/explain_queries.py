@@ -0,0 +1,280 @@
+#   SPDX-License-Identifier: Apache-2.0
+# © Copyright Ecosteer 2024
+
+#   ver:    1.0
+#   date:   18/10/2026
+
+"""
+EXPLAIN regression check of the queries of dbProviderPostgres and
+RIFdbProviderPostgres.
+
+Every query method of the providers is called against a local database
+seeded with installation/database/seed_volumes.sql; each statement the
+providers execute is explained first (on a separate connection) and the
+check fails if a plan reads a large table (reltuples >= min_rows) with a
+sequential scan, unless the scenario expects it (e.g. the full listings).
+The statements are executed in a transaction that is rolled back at the end.
+The query methods are those of the provider classes, but for the inserts
+and the methods that execute no statement (NOT_EXPLAINED): the check fails
+for any of them without a scenario.
+
+From the repository root, with the connection string of the provider:
+
+    python -m provider.python.persistence.postgres.explain_queries \
+        "driver=PostgreSQL Unicode;servername=localhost;port=5432;database=doof_explain;uid=doof;pwd=doof" \
+        [scale] [min_rows]
+
+scale is the one used to seed the database (default 10000).
+"""
+
+import datetime
+import hashlib
+import json
+import sys
+import uuid
+
+import pyodbc
+
+from common.python.model.models import EncryptedSession, OutboxTransaction, Session
+from provider.python.persistence.postgres.postgres_provider import dbProviderPostgres
+from provider.python.persistence.postgres.rif_postgres import RIFdbProviderPostgres
+
+
+# the methods of the providers that execute no statement; the inserts (create_*, insert_*,
+# bulk_insert) are not explained either: an INSERT ... VALUES reads no table
+NOT_EXPLAINED = {
+    "init", "open", "close", "begin_transaction", "rollback", "commit", "available",
+    "set_read_only", "attach_logger", "set_query_context", "session_last_touch",
+    "pool_stats", "sql_cache_stats", "query_stats", "circuit_stats", "replica_stats",
+    "bulk_insert"
+}
+
+
+def seed_uuid(kind: str, n: int) -> str:
+    # md5('<kind><n>')::uuid of seed_volumes.sql
+    return str(uuid.UUID(hashlib.md5(f"{kind}{n}".encode()).hexdigest()))
+
+
+class ExplainingProvider(RIFdbProviderPostgres):
+    """
+    The provider that explains every statement before executing it
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.plans = []             # (query, plan, error)
+        self._explain_connection = None
+
+    def _explain(self, query, values):
+        if self._explain_connection is None:
+            self._explain_connection = pyodbc.connect(self._config, autocommit=True)
+        try:
+            cursor = self._explain_connection.cursor()
+            cursor.execute("EXPLAIN (FORMAT JSON) " + str(query), values or [])
+            self.plans.append((str(query), json.loads(cursor.fetchone()[0]), None))
+            cursor.close()
+        except Exception as e:
+            self.plans.append((str(query), None, str(e)))
+
+    def _execute_with_retry(self, query, values=None, prepare: bool = False):
+        self._explain(query, values)
+        return super()._execute_with_retry(query, values, prepare)
+
+    def close(self):
+        if self._explain_connection is not None:
+            self._explain_connection.close()
+            self._explain_connection = None
+        return super().close()
+
+
+def seq_scans(plan) -> list:
+    # the relations read with a sequential scan by the plan
+    scans = []
+    nodes = [entry["Plan"] for entry in plan]
+    while len(nodes) > 0:
+        node = nodes.pop()
+        if node.get("Node Type") == "Seq Scan":
+            scans.append(node.get("Relation Name"))
+        nodes.extend(node.get("Plans", []))
+    return scans
+
+
+def large_tables(db: ExplainingProvider, min_rows: int) -> set:
+    cursor = db._connection.cursor()
+    cursor.execute("""
+        SELECT relname FROM pg_class
+        WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace AND reltuples >= ?
+        """, [min_rows])
+    return {row[0] for row in cursor.fetchall()}
+
+
+def query_methods() -> set:
+    methods = set()
+    for cls in (dbProviderPostgres, RIFdbProviderPostgres):
+        for name, member in vars(cls).items():
+            if callable(member) and not name.startswith(("_", "create_", "insert_")) \
+                    and name not in NOT_EXPLAINED:
+                methods.add(name)
+    return methods
+
+
+def scenarios(scale: int) -> list:
+    """
+    (label, call, relations whose sequential scan is expected)
+    the ids address the rows of seed_volumes.sql
+    """
+    account = seed_uuid("account", 1)
+    product = seed_uuid("product", 1)
+    publisher = seed_uuid("account", 1 % scale + 1)
+    subscription = seed_uuid("subscription", 1)
+    subscriber = seed_uuid("account", (7 + 1 // scale) % scale + 1)
+    subscribed = seed_uuid("product", 1 % scale + 1)
+    session, token = "seed_session_1", "seed_token_1"
+    tx_hash = "0x" + hashlib.md5(b"transaction1").hexdigest() + hashlib.md5(b"hash1").hexdigest()
+    account_address = f"0x{1:040x}"
+    product_address = f"0x{1:038x}ff"
+    subscription_address = f"0x{1:038x}ee"
+    now = datetime.datetime.now(datetime.timezone.utc)
+    # the listings read the whole product table (and count the subscriptions of every product)
+    listing = ("product", "product_usage", "product_subscription", "account")
+
+    return [
+        ("user_verify", lambda db: db.user_verify("seed_user_1", "password"), ()),
+        ("isOwner", lambda db: db.isOwner(publisher, product_address), ()),
+        ("get_session_and_mle", lambda db: db.get_session_and_mle(session), ()),
+        ("get_client_sessions_and_mle", lambda db: db.get_client_sessions_and_mle(session), ()),
+        ("get_session", lambda db: db.get_session({"value": session, "token": token}), ()),
+        ("get_session by client", lambda db: db.get_session({"client": account}), ()),
+        ("get_user_from_session", lambda db: db.get_user_from_session({"value": session}), ()),
+        ("get_user", lambda db: db.get_user({"id": account}), ()),
+        ("get_user_from_username", lambda db: db.get_user_from_username("seed_user_1"), ()),
+        ("get_account_by_blkaddress", lambda db: db.get_account_by_blkaddress(account_address.upper()), ()),
+        ("get_account_by_session", lambda db: db.get_account_by_session(session, token), ()),
+        ("get_encrypted_session", lambda db: db.get_encrypted_session({"session_id": 1}), ()),
+        ("get_transaction", lambda db: db.get_transaction({"hash": tx_hash}), ()),
+        ("get_transaction_by_hash", lambda db: db.get_transaction_by_hash(tx_hash.upper()), ()),
+        ("get_product", lambda db: db.get_product({"id": product}), ()),
+        ("get_product_usage", lambda db: db.get_product_usage({"product_id": product, "usage": 1}), ()),
+        ("get_product_reference", lambda db: db.get_product_reference(product), ()),
+        ("get_product_by_blkaddress", lambda db: db.get_product_by_blkaddress(product_address.upper()), ()),
+        ("get_product_summary", lambda db: db.get_product_summary(product), ()),
+        ("get_product_details", lambda db: db.get_product_details(product), ()),
+        ("get_product_data_origin", lambda db: db.get_product_data_origin(product), ()),
+        ("get_number_of_subscriptions", lambda db: db.get_number_of_subscriptions(subscribed), ()),
+        ("get_subscription", lambda db: db.get_subscription(subscriber, subscribed), ()),
+        ("get_product_subscription", lambda db: db.get_product_subscription(
+            {"subscriber": subscriber, "product": subscribed}), ()),
+        ("get_product_subscription_no_secret", lambda db: db.get_product_subscription_no_secret(
+            {"product": subscribed}), ()),
+        ("get_additional_info_subscription", lambda db: db.get_additional_info_subscription(subscription), ()),
+        ("get_additional_info_subscription_addr",
+            lambda db: db.get_additional_info_subscription_addr(subscription_address), ()),
+        ("get_purpose_of_usage", lambda db: db.get_purpose_of_usage({"subscriber": account}), ()),
+        ("get_property", lambda db: db.get_property({"property_name": "type"}), ()),
+        ("get_products_limits", lambda db: db.get_products_limits(0, 10), listing),
+        ("get_all_products", lambda db: db.get_all_products(limit=10, offset=0), listing),
+        ("get_all_products keyset", lambda db: db.get_all_products(keyset=True, limit=10), listing),
+        ("get_other_products", lambda db: db.get_other_products(account, limit=10, offset=0), listing),
+        ("get_sets_products published", lambda db: db.get_sets_products(
+            publisher, {"set": "published"}, limit=10, offset=0), listing),
+        ("get_sets_products subscribed", lambda db: db.get_sets_products(
+            subscriber, {"set": "subscribed"}, limit=10, offset=0), listing),
+        ("update_session", lambda db: db.update_session(1, status=1), ()),
+        ("touch_session", lambda db: db.touch_session(1, now), ()),
+        ("update_or_create_session", lambda db: db.update_or_create_session(Session(
+            client=account, value="explain_session", token="explain_token", status=1)), ()),
+        ("delete_session", lambda db: db.delete_session(2), ()),
+        ("update_encrypted_session", lambda db: db.update_encrypted_session(1, cipher_name="plaintext"), ()),
+        ("update_or_create_encrypted_session", lambda db: db.update_or_create_encrypted_session(
+            EncryptedSession(session_id=1, cipher_name="plaintext", cipher_mode="", cipher_keylength=0,
+                             key="")), ()),
+        ("delete_encrypted_session", lambda db: db.delete_encrypted_session(2), ()),
+        ("update_user", lambda db: db.update_user(db.get_user({"id": account})[0]), ()),
+        ("update_product_subscription", lambda db: db.update_product_subscription(
+            subscription, db.get_product_subscription({"id": subscription})[0]), ()),
+        ("get_additional_info_for_subscriptions", lambda db: db.get_additional_info_for_subscriptions(
+            [subscription, seed_uuid("subscription", 2)]), ()),
+        ("get_account_role", lambda db: db.get_account_role({"account_id": account}), ()),
+        ("get_account_roles_str", lambda db: db.get_account_roles_str(where={"account_id": account}), ()),
+        ("delete_account_role", lambda db: db.delete_account_role(1), ()),
+        ("claim_outbox_transaction", lambda db: db.claim_outbox_transaction(), ()),
+        ("update_outbox_transaction", lambda db: db.update_outbox_transaction(
+            1, OutboxTransaction.SENT, tx_hash), ()),
+        ("delete_transaction", lambda db: db.delete_transaction(tx_hash), ()),
+        ("delete_product_subscription", lambda db: db.delete_product_subscription(
+            seed_uuid("subscription", 3), subscriber, subscribed), ()),
+        ("delete_product_subscriptions", lambda db: db.delete_product_subscriptions(
+            [subscription, seed_uuid("subscription", 2)]), ()),
+        ("delete_product_subscriptions_of_product", lambda db: db.delete_product_subscriptions_of_product(
+            subscribed), ()),
+        ("delete_product_subscriptions_of_product by subscriber",
+            lambda db: db.delete_product_subscriptions_of_product(subscribed, subscriber), ()),
+        # RIFdbProviderPostgres
+        ("get_rif_advertisement", lambda db: db.get_rif_advertisement({"partner_id": account}), ()),
+        ("get_rif_advert_interest", lambda db: db.get_rif_advert_interest({"account_id": account}), ()),
+        ("get_rif_priv_mess", lambda db: db.get_rif_priv_mess({"send_to": account}), ()),
+        ("get_mess_for_user", lambda db: db.get_mess_for_user(account), ()),
+        ("get_mess_with_info_for_user", lambda db: db.get_mess_with_info_for_user(account), ()),
+        ("get_rif_subscription_news", lambda db: db.get_rif_subscription_news({"send_to": account}), ()),
+        ("get_rif_sub_news_info", lambda db: db.get_rif_sub_news_info(account), ()),
+        # every advertisement is matched against the products of the user (cross join)
+        ("get_ads_for_user", lambda db: db.get_ads_for_user(publisher), ("rif_advertisement",)),
+        ("get_actionable_products", lambda db: db.get_actionable_products(
+            publisher, seed_uuid("advertisement", 1)), listing),
+    ]
+
+
+def run(config: str, scale: int = 10000, min_rows: int = 10000) -> int:
+    db = ExplainingProvider()
+    err = db.init(config)
+    if err.isError():
+        print(err.msg, file=sys.stderr)
+        return 2
+    err = db.open()
+    if err.isError():
+        print(err.msg, file=sys.stderr)
+        return 2
+
+    covered = {label.split()[0] for label, call, expected in scenarios(scale)}
+    missing = sorted(query_methods() - covered)
+    for method in missing:
+        print(f"FAIL {method}: no scenario")
+
+    failures = len(missing)
+    try:
+        large = large_tables(db, min_rows)
+        print(f"tables with at least {min_rows} rows: {', '.join(sorted(large))}")
+        db.begin_transaction()
+        for label, call, expected in scenarios(scale):
+            db.plans = []
+            call(db)
+            failed = False
+            for query, plan, error in db.plans:
+                if error is not None:
+                    failed = True
+                    print(f"FAIL {label}: the query could not be explained: {error}\n{query}")
+                    continue
+                scanned = [relation for relation in seq_scans(plan)
+                           if relation in large and relation not in expected]
+                if len(scanned) > 0:
+                    failed = True
+                    print(f"FAIL {label}: sequential scan of {', '.join(sorted(set(scanned)))}\n{query}")
+            if failed:
+                failures += 1
+            elif len(db.plans) == 0:
+                print(f"SKIP {label}: no statement executed")
+            else:
+                print(f"ok   {label}")
+    finally:
+        db.rollback()
+        db.close()
+
+    print(f"{failures} failure(s)")
+    return 1 if failures > 0 else 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(2)
+    sys.exit(run(sys.argv[1], *[int(arg) for arg in sys.argv[2:4]]))
@@ -8,14 +8,15 @@
 
 import copy
 import inspect
-from functools import wraps
+import json
+from functools import lru_cache, wraps
 from inspect import currentframe, getframeinfo
 
 import pyodbc
-from typing import Tuple, Type, Union
+from typing import Iterator, Tuple, Type, Union
  
 
-from common.python.error import DopError
+from common.python.error import DopError, LogSeverity
 from provider.python.persistence.provider_persistence import providerPersistence
 
 from common.python.model.models import User, Transaction, Product, Session, \
@@ -23,21 +24,20 @@ from common.python.model.models import User, Transaction, Product, Session, \
     TableName, AccountRole
 
 
-from common.python.model.schemas import EncryptedSessionSchema, TransactionSchema, \
-    ProductSchema, UserSchema, \
-    SessionSchema, PropertySchema, \
-    PropertyProductSchema, AccountRoleSchema
-
-
 from common.python.model.models import ProductUsage
-from common.python.model.schemas import ProductUsageSchema
 
 from common.python.model.models import PurposeOfUsage, ProductSubscription
-
-from common.python.model.schemas import PurposeOfUsageSchema, ProductSubscriptionSchema
+from common.python.model.models import OutboxTransaction
 
 
 from common.python.utils import DopUtils
+from common.python.auth_cache import AuthCache, shared_auth_cache
+from provider.python.persistence.session_touch import SessionTouchBuffer, shared_session_touch_buffer
+from provider.python.persistence.postgres.circuit_breaker import CircuitBreaker, shared_circuit_breaker
+from provider.python.persistence.postgres.connection_pool import ConnectionPool, PoolTimeout, shared_connection_pool
+from provider.python.persistence.postgres.sql_cache import StatementCache, shared_sql_text_cache
+from provider.python.persistence.postgres.query_stats import shared_query_stats
+from provider.python.persistence.postgres.row_mapping import columns, row_to_dict, rows_to_dicts, rows_to_models
 
 
 import time
@@ -45,22 +45,70 @@ import traceback
 import sys
 
 
+@lru_cache(maxsize=2048)
+def _is_read_query(query: str) -> bool:
+    # a select that does not lock rows: it can be executed by the replica
+    text = query.lstrip().upper()
+    return text.startswith("SELECT") and " FOR UPDATE" not in text and " FOR SHARE" not in text
+
+
 def serialize(resource, cursor):
-    response = {}
+    # a row is mapped to a dict, a list of rows to a list of dict (see row_mapping)
     if isinstance(resource, list):
-        response = []
-        for row in resource:
-            response.append(serialize(row, cursor))
-    else:
-        if resource:
-            for idx, value in enumerate(resource):
-                response[cursor.description[idx][0]] = value
-    return response
+        return rows_to_dicts(cursor, resource)
+    return row_to_dict(cursor, resource)
 
 
 class dbProviderPostgres(providerPersistence):
 
     LIMIT = 50
+    BULK_DELETE_SIZE = 1000     # subscriptions deleted by one statement
+    BULK_INSERT_SIZE = 500      # rows inserted by one statement
+
+    # configuration keys consumed by the provider (they are not passed to the odbc driver)
+    AUTH_CACHE_SIZE = "auth_cache_size"
+    AUTH_CACHE_TTL = "auth_cache_ttl"       # seconds, 0 disables the cache
+    SESSION_TOUCH_INTERVAL = "session_touch_interval"   # seconds, 0 writes every touch immediately
+    SESSION_TOUCH_MAX = "session_touch_max"             # touched sessions that trigger a flush
+    POOL_MIN_SIZE = "pool_min_size"
+    POOL_MAX_SIZE = "pool_max_size"         # 0 (default): the provider owns a single connection
+    POOL_TIMEOUT = "pool_timeout"           # seconds waited for a pooled connection
+    SLOW_QUERY_MS = "slow_query_ms"         # queries slower than this are logged, 0 disables the log
+    QUERY_BUDGET = "query_budget"           # queries of a transaction (event), 0 disables the check
+    CIRCUIT_FAILURES = "circuit_failures"   # consecutive connection errors that open the circuit
+    CIRCUIT_BACKOFF_MAX = "circuit_backoff_max"     # seconds, max delay of the reconnection probes
+    REPLICA_MAX_LAG = "replica_max_lag"     # seconds of replication lag above which the primary is read
+    PROVIDER_KEYS = (AUTH_CACHE_SIZE, AUTH_CACHE_TTL, SESSION_TOUCH_INTERVAL, SESSION_TOUCH_MAX,
+                     POOL_MIN_SIZE, POOL_MAX_SIZE, POOL_TIMEOUT, SLOW_QUERY_MS, QUERY_BUDGET,
+                     CIRCUIT_FAILURES, CIRCUIT_BACKOFF_MAX, REPLICA_MAX_LAG)
+    # replica.<odbc key>=value: the key of the connection string of the read replica,
+    # the other keys are those of the primary (e.g. replica.servername=db-replica)
+    REPLICA_PREFIX = "replica."
+    DEFAULT_REPLICA_MAX_LAG = 5
+    REPLICA_CHECK_INTERVAL = 5      # seconds between two checks of the replication lag
+    REPLICA_LAG_QUERY = """
+        SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END
+    """
+    DEFAULT_SLOW_QUERY_MS = 250
+    DEFAULT_QUERY_BUDGET = 50
+
+    # joined to the queries of the product p: the number of subscriptions (t.no_subscriptions)
+    # and the properties (props.properties, a json array) of each product returned,
+    # in the same round-trip
+    SUBSCRIPTIONS_JOIN = """
+            LEFT JOIN LATERAL (SELECT count(*) as no_subscriptions
+                        FROM {table_subscription} as ps
+                        WHERE ps.product = p.id) t ON true
+    """.format(table_subscription=TableName.PRODUCT_SUBSCRIPTION)
+    PROPERTIES_JOIN = """
+            LEFT JOIN LATERAL (SELECT COALESCE(json_agg(json_build_object(
+                            'property_name', pr.property_name,
+                            'property_value', pr.property_value)), '[]'::json) as properties
+                        FROM {table_property_product} as pp
+                        JOIN {table_property} as pr ON pp.property = pr.id
+                        WHERE pp.product = p.id) props ON true
+    """.format(table_property_product=TableName.PROPERTY_PRODUCT, table_property=TableName.PROPERTY)
 
     def __init__(self):
         
@@ -68,7 +116,45 @@ class dbProviderPostgres(providerPersistence):
         self._url = None
         self._connection = None
 
-        self._recovery_delay_s = 5    #   delay in seconds that have to be waited for before recovery
+        self._auth_cache = None
+        self._auth_dirty_sessions = set()   # sessions updated/deleted by the current transaction
+        self._auth_dirty_users = set()      # users updated by the current transaction
+        self._session_touches = None
+
+        # with the pool, self._connection is the pooled connection bound to the 
+        # current transaction (None between transactions)
+        self._pool = None
+        self._pool_conf = None
+        self._conn_state = {}       # state of the (not pooled) connection, see _statements
+
+        self._sql_texts = shared_sql_text_cache()
+        self._stmt_hits = 0         # executions of a hot statement already prepared on the connection
+        self._stmt_misses = 0
+
+        self._query_stats = shared_query_stats()
+        self._logger = None
+        self._slow_query_ms = self.DEFAULT_SLOW_QUERY_MS
+        self._query_budget = self.DEFAULT_QUERY_BUDGET
+        self._query_context = None  # label (input event) of the queries of the transaction
+        self._tx_queries = {}       # shape -> executions in the current transaction
+
+        # the statements are retried (without waiting) until the circuit opens, then the
+        # provider fails fast while the database is probed in background (see circuit_breaker)
+        self._breaker = None
+        self._breaker_conf = {}
+
+        # read replica (optional): it executes the selects of the read-only processors
+        # (see set_read_only) unless the transaction wrote already (read your writes)
+        self._replica_config = None
+        self._replica_max_lag = self.DEFAULT_REPLICA_MAX_LAG
+        self._replica = None            # autocommit connection to the replica
+        self._replica_checked = None    # time of the last check of the replication lag
+        self._replica_usable = False
+        self._replica_lag = None
+        self._replica_reads = 0
+        self._replica_fallbacks = 0     # selects of read-only processors executed by the primary
+        self._read_only = False
+        self._tx_wrote = False
         self._recovery_max = 10       #   maximum number of attempts to recover
         self._timeout = 5       # timeout in seconds for the connection setup and for the queries
 
@@ -77,22 +163,310 @@ class dbProviderPostgres(providerPersistence):
     def init(self, config: str) -> DopError:
         """Parse the configuration string: 
         "driver=PostgreSQL Unicode;servername=localhost;port=5432;database=ecosteer;uid=ecosteer;pwd=ecosteer"
+        optional keys of the provider: auth_cache_size, auth_cache_ttl, 
+        session_touch_interval, session_touch_max, pool_min_size, pool_max_size, pool_timeout,
+        slow_query_ms, query_budget, circuit_failures, circuit_backoff_max,
+        replica_max_lag, replica.<odbc key> (read replica)
         """
-        self._config = config 
+        odbc_items = []
+        provider_conf = {}
+        replica_conf = {}
+        for item in config.split(';'):
+            key, _, value = item.partition('=')
+            if key.strip() in self.PROVIDER_KEYS:
+                provider_conf[key.strip()] = value.strip()
+            elif key.strip().startswith(self.REPLICA_PREFIX):
+                replica_conf[key.strip()[len(self.REPLICA_PREFIX):].lower()] = value.strip()
+            elif len(item) > 0:
+                odbc_items.append(item)
+        self._config = ';'.join(odbc_items) + ';'
+        if len(replica_conf) > 0:
+            replica_items = []
+            for item in odbc_items:
+                key, _, _ = item.partition('=')
+                if key.strip().lower() in replica_conf:
+                    item = f"{key.strip()}={replica_conf.pop(key.strip().lower())}"
+                replica_items.append(item)
+            replica_items.extend([f"{key}={value}" for key, value in replica_conf.items()])
+            self._replica_config = ';'.join(replica_items) + ';'
+
+        try:
+            _, cache_size = DopUtils.config_get_int(provider_conf, [self.AUTH_CACHE_SIZE], AuthCache.DEFAULT_SIZE)
+            _, cache_ttl = DopUtils.config_get_int(provider_conf, [self.AUTH_CACHE_TTL], AuthCache.DEFAULT_TTL)
+            _, touch_interval = DopUtils.config_get_int(provider_conf, [self.SESSION_TOUCH_INTERVAL], 
+                                                        SessionTouchBuffer.DEFAULT_INTERVAL)
+            _, touch_max = DopUtils.config_get_int(provider_conf, [self.SESSION_TOUCH_MAX], 
+                                                   SessionTouchBuffer.DEFAULT_MAX_SESSIONS)
+            _, pool_min = DopUtils.config_get_int(provider_conf, [self.POOL_MIN_SIZE], ConnectionPool.DEFAULT_MIN_SIZE)
+            _, pool_max = DopUtils.config_get_int(provider_conf, [self.POOL_MAX_SIZE], 0)
+            _, pool_timeout = DopUtils.config_get_int(provider_conf, [self.POOL_TIMEOUT], ConnectionPool.DEFAULT_TIMEOUT)
+            _, self._slow_query_ms = DopUtils.config_get_int(provider_conf, [self.SLOW_QUERY_MS], 
+                                                             self.DEFAULT_SLOW_QUERY_MS)
+            _, self._query_budget = DopUtils.config_get_int(provider_conf, [self.QUERY_BUDGET], 
+                                                            self.DEFAULT_QUERY_BUDGET)
+            _, circuit_failures = DopUtils.config_get_int(provider_conf, [self.CIRCUIT_FAILURES], 
+                                                          CircuitBreaker.DEFAULT_FAILURES)
+            _, circuit_backoff_max = DopUtils.config_get_int(provider_conf, [self.CIRCUIT_BACKOFF_MAX], 
+                                                             CircuitBreaker.DEFAULT_MAX_BACKOFF)
+            _, self._replica_max_lag = DopUtils.config_get_int(provider_conf, [self.REPLICA_MAX_LAG], 
+                                                               self.DEFAULT_REPLICA_MAX_LAG)
+        except ValueError:
+            return DopError(1, f"{', '.join(self.PROVIDER_KEYS)} must be integers.")
+        # shared with the other providers of the process (e.g. the execution lanes)
+        if cache_size > 0 and cache_ttl > 0:
+            self._auth_cache = shared_auth_cache(cache_size, cache_ttl)
+        if touch_interval > 0 and touch_max > 0:
+            self._session_touches = shared_session_touch_buffer(touch_interval, touch_max)
+        if pool_max > 0:
+            self._pool_conf = {"min_size": min(pool_min, pool_max), "max_size": pool_max, "timeout_s": pool_timeout}
+        self._breaker_conf = {"failure_threshold": circuit_failures, "max_backoff_s": circuit_backoff_max}
         return DopError()
+
+    def pool_stats(self) -> dict:
+        if self._pool is None:
+            return {}
+        return self._pool.stats()
+
+    def sql_cache_stats(self) -> dict:
+        executions = self._stmt_hits + self._stmt_misses
+        return {
+            "sql_text": self._sql_texts.stats(),
+            "prepared": {
+                "hits": self._stmt_hits,
+                "misses": self._stmt_misses,
+                "hit_ratio": self._stmt_hits / executions if executions > 0 else 0.0
+            }
+        }
+
+    def query_stats(self) -> dict:
+        return self._query_stats.stats()
+
+    def circuit_stats(self) -> dict:
+        if self._breaker is None:
+            return {}
+        return self._breaker.stats()
+
+    def available(self, timeout_s: float = 0) -> bool:
+        if self._breaker is None:
+            return True
+        return self._breaker.wait_closed(timeout_s)
+
+    def set_read_only(self, read_only: bool):
+        self._read_only = read_only
+
+    def replica_stats(self) -> dict:
+        if self._replica_config is None:
+            return {}
+        return {
+            "usable": self._replica_usable,
+            "lag_s": self._replica_lag,
+            "reads": self._replica_reads,
+            "fallbacks": self._replica_fallbacks
+        }
+
+    def _connect_replica(self):
+        # autocommit: no transaction is kept open on the standby
+        connection = pyodbc.connect(self._replica_config, timeout = self._timeout, autocommit = True)
+        connection.setdecoding(pyodbc.SQL_WCHAR, encoding='utf-8')
+        connection.setencoding(encoding='utf-8')
+        return connection
+
+    def _drop_replica(self):
+        connection = self._replica
+        self._replica = None
+        self._replica_usable = False
+        if connection is None:
+            return
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _replica_ready(self) -> bool:
+        # bounded staleness: the replica is read only if its lag (checked every 
+        # REPLICA_CHECK_INTERVAL seconds) is within replica_max_lag
+        now = time.monotonic()
+        if self._replica_checked is not None and now - self._replica_checked < self.REPLICA_CHECK_INTERVAL:
+            return self._replica_usable
+        self._replica_checked = now
+        try:
+            if self._replica is None:
+                self._replica = self._connect_replica()
+            cursor = self._replica.cursor()
+            cursor.execute(self.REPLICA_LAG_QUERY)
+            lag = cursor.fetchone()[0]
+            cursor.close()
+        except Exception as e:
+            print(f"{int(time.time())} | {getframeinfo(currentframe()).filename} | "\
+                    f"{getframeinfo(currentframe()).lineno} | Replica unavailable: {e}\n", file = sys.stderr)
+            self._drop_replica()
+            return False
+        self._replica_lag = float(lag or 0)
+        self._replica_usable = self._replica_lag <= self._replica_max_lag
+        return self._replica_usable
+
+    def _replica_execute(self, query, values):
+        # returns None if the query has to be executed by the primary
+        if not self._replica_ready():
+            self._replica_fallbacks += 1
+            return None
+        started = time.perf_counter()
+        try:
+            cursor = self._replica.cursor()
+            cursor.execute(str(query), values)
+        except pyodbc.Error as e:
+            print(f"{int(time.time())} | {getframeinfo(currentframe()).filename} | "\
+                    f"{getframeinfo(currentframe()).lineno} | Replica error: {e}\n", file = sys.stderr)
+            self._drop_replica()
+            self._replica_fallbacks += 1
+            return None
+        self._replica_reads += 1
+        self._record_query(query, values, started, cursor.rowcount, 0, False)
+        return cursor
+
+    def attach_logger(self, logger):
+        self._logger = logger
+
+    def set_query_context(self, label: str):
+        self._query_context = label
+
+    def _log(self, code: int, severity: LogSeverity, lineno: int, properties: dict):
+        if self._logger is None:
+            print(f"{int(time.time())} | {getframeinfo(currentframe()).filename} | "\
+                    f"{lineno} | {properties}", file = sys.stderr)
+            return
+        self._logger.log(code, severity, getframeinfo(currentframe()).filename, lineno, properties)
+
+    def _record_query(self, query, values, started: float, rows: int, retries: int, error: bool):
+        elapsed_s = time.perf_counter() - started
+        shape = self._query_stats.shape(query)
+        self._query_stats.record(shape, elapsed_s, rows, retries, error)
+        self._tx_queries[shape] = self._tx_queries.get(shape, 0) + 1
+        if self._slow_query_ms > 0 and elapsed_s * 1000 >= self._slow_query_ms:
+            # the shape of the bound parameters, never their values
+            values = values or []
+            self._log(126, LogSeverity.WARN, getframeinfo(currentframe()).lineno, 
+                      {'msg': "Slow query.", 'query': shape, 'elapsed_ms': round(elapsed_s * 1000, 3),
+                       'rows': rows, 'retries': retries, 'params': [type(v).__name__ for v in values],
+                       'context': self._query_context})
+
+    def _end_query_budget(self):
+        # N+1 check: the queries executed by the transaction (i.e. by the pipeline of an event)
+        executed = sum(self._tx_queries.values())
+        if self._query_budget > 0 and executed > self._query_budget:
+            repeated = {shape: count for shape, count in self._tx_queries.items() if count > 1}
+            self._log(127, LogSeverity.WARN, getframeinfo(currentframe()).lineno, 
+                      {'msg': "Query budget of the transaction exceeded.", 'context': self._query_context,
+                       'queries': executed, 'budget': self._query_budget, 
+                       'repeated': dict(sorted(repeated.items(), key=lambda item: -item[1]))})
+        self._tx_queries = {}
+
+    def _statements(self) -> StatementCache:
+        # the prepared statements of the current connection
+        if self._pool is not None:
+            state = self._pool.state(self._connection)
+        else:
+            state = self._conn_state
+        statements = state.get('statements', None)
+        if statements is None:
+            statements = StatementCache()
+            state['statements'] = statements
+        return statements
+
+    def _connect(self):
+        connection = pyodbc.connect(self._config, timeout = self._timeout)
+        connection.autocommit = False
+        connection.setdecoding(pyodbc.SQL_WCHAR, encoding='utf-8')
+        connection.setencoding(encoding='utf-8')
+        return connection
+
+    def _probe_database(self):
+        # reconnection probe of the circuit breaker
+        connection = self._connect()
+        try:
+            self._check_connection(connection)
+        finally:
+            connection.close()
+
+    def _check_connection(self, connection) -> bool:
+        # health check of an idle pooled connection
+        cursor = connection.cursor()
+        cursor.execute("SELECT 1;")
+        cursor.fetchall()
+        cursor.close()
+        connection.rollback()
+        return True
+
+    def _disconnect(self):
+        # drop the (broken) connection before any recovery delay: the pooled 
+        # connections in use by the other pipelines are not affected
+        connection = self._connection
+        self._connection = None
+        self._conn_state = {}
+        if connection is None:
+            return
+        if self._pool is not None:
+            self._pool.discard(connection)
+            return
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _release(self):
+        # the transaction is over: the pooled connection goes back to the pool
+        if self._pool is not None and self._connection is not None:
+            self._pool.release(self._connection)
+            self._connection = None
+
+    @property
+    def auth_cache(self):
+        return self._auth_cache
+
+    def _auth_invalidate_session(self, session_id):
+        if self._auth_cache is not None:
+            self._auth_cache.invalidate_session(session_id)
+            self._auth_dirty_sessions.add(session_id)
+
+    def _auth_invalidate_user(self, user_id):
+        if self._auth_cache is not None:
+            self._auth_cache.invalidate_user(user_id)
+            self._auth_dirty_users.add(user_id)
+
+    def _auth_end_transaction(self, rolled_back: bool):
+        # the entries cached after an update of the transaction may hold 
+        # uncommitted data: they are dropped if the transaction is rolled back
+        if self._auth_cache is not None and rolled_back:
+            for session_id in self._auth_dirty_sessions:
+                self._auth_cache.invalidate_session(session_id)
+            for user_id in self._auth_dirty_users:
+                self._auth_cache.invalidate_user(user_id)
+        self._auth_dirty_sessions.clear()
+        self._auth_dirty_users.clear()
     
     def open(self) -> DopError:
         if self._connection != None:
             #   connected already (likely still ok)
             return DopError(0)
         sys.stdout.flush()
+        if self._breaker is None:
+            self._breaker = shared_circuit_breaker(self._config, self._probe_database, **self._breaker_conf)
+        if not self._breaker.allow():
+            return self._circuit_open_error()
+        if self._pool_conf is not None and self._pool is None:
+            self._pool = shared_connection_pool(self._config, self._connect, self._check_connection, 
+                                                **self._pool_conf)
         max_retry = self._recovery_max
         while max_retry > 0:
             try:
-                self._connection = pyodbc.connect(self._config, timeout = self._timeout)
-                self._connection.autocommit = False
-                self._connection.setdecoding(pyodbc.SQL_WCHAR, encoding='utf-8')
-                self._connection.setencoding(encoding='utf-8')
+                if self._pool is not None:
+                    self._pool.fill()
+                    self._connection = self._pool.acquire()
+                else:
+                    self._connection = self._connect()
+            except PoolTimeout as e:
+                self._breaker.record_success()      # the database is reachable, the pool is exhausted
+                return DopError(125, f"No pooled database connection available: {e}")
             except Exception as e:
                 print(f"{int(time.time())} | {getframeinfo(currentframe()).filename} | "\
                     f"{getframeinfo(currentframe()).lineno} | {type(e)} | {traceback.format_exc()}", file = sys.stderr)
@@ -102,10 +476,14 @@ class dbProviderPostgres(providerPersistence):
                         max_retry -= 1
                         print(f"{int(time.time())} | {getframeinfo(currentframe()).filename} | "\
                             f"{getframeinfo(currentframe()).lineno} | Recovering from last error. Retries left: {max_retry}.\n", file = sys.stderr)
-                        self._recovery_delay()
+                        err = self._recovery()
+                        if err.isError():
+                            return err
                         continue
+                self._breaker.record_success()
                 return DopError(99, "Non recoverable error while opening postgres persistence provider.") 
                 
+            self._breaker.record_success()
             return DopError(0, "Postgres provider opened.")
         return DopError(120, "Could not connect to the database: max number of attempts exceeded") 
 
@@ -122,13 +500,31 @@ class dbProviderPostgres(providerPersistence):
                 return True  
         return False
 
-    def _recovery_delay(self):
-        time.sleep(self._recovery_delay_s)
+    def _recovery(self) -> DopError:
+        # a recoverable (connection) error: the statement is retried unless the circuit opened
+        if self._breaker is not None and self._breaker.record_failure():
+            return self._circuit_open_error()
+        return DopError()
+
+    def _circuit_open_error(self) -> DopError:
+        # the caller can requeue the event: the database is probed in background
+        return DopError(128, "The database is unavailable (circuit open).")
 
     def close(self) -> DopError:
-        if self._connection:
+        if self._session_touches is not None and (self._connection or self._pool is not None):
+            self._flush_session_touches()
+        if self._pool is not None:
+            self._release()
+            self._pool.detach()
+            self._pool = None
+        elif self._connection:
             self._connection.close()
             self._connection = None 
+            self._conn_state = {}
+        if self._breaker is not None:
+            self._breaker.detach()
+            self._breaker = None
+        self._drop_replica()
         return DopError(0, "Postgres provider closed.")
 
     def _reconnect(self) -> DopError:
@@ -137,10 +533,21 @@ class dbProviderPostgres(providerPersistence):
         return DopError()
     
     def begin_transaction(self) -> DopError:
+        self._tx_queries = {}
+        self._tx_wrote = False
+        if self._pool is not None:
+            # the pooled connection is bound to the transaction until commit/rollback
+            return self.open()
         return DopError()
         
     
     def rollback(self) -> DopError:
+        self._auth_end_transaction(rolled_back=True)
+        self._end_query_budget()
+        self._tx_wrote = False
+        if self._pool is not None and self._connection is None:
+            # no statement was executed
+            return DopError()
         max_retry = self._recovery_max
         while max_retry > 0: # check exit condition: if exception is not pyodbc.Error what happens
                 
@@ -161,16 +568,22 @@ class dbProviderPostgres(providerPersistence):
                         max_retry -= 1
                         print(f"{int(time.time())} | {getframeinfo(currentframe()).filename} | "\
                             f"{getframeinfo(currentframe()).lineno} | Recovering from last error. Retries left: {max_retry}.\n", file = sys.stderr)
-                        self.close()
-                        self._recovery_delay()
+                        self._disconnect()
+                        err = self._recovery()
+                        if err.isError():
+                            return err
                         continue
 
                     return DopError(100, "Non recoverable error during rollback.")
+            self._release()
             return DopError() # rollback was successful
         return DopError(101, "Error during rollback.")
     
     def commit(self) -> DopError: 
         
+        self._auth_end_transaction(rolled_back=False)
+        self._end_query_budget()
+        self._tx_wrote = False
         max_retry = self._recovery_max
         while max_retry > 0: # check exit condition
                 
@@ -191,11 +604,16 @@ class dbProviderPostgres(providerPersistence):
                         max_retry -= 1
                         print(f"{int(time.time())} | {getframeinfo(currentframe()).filename} | "\
                             f"{getframeinfo(currentframe()).lineno} | Recovering from last error. Retries left: {max_retry}.\n", file = sys.stderr)
-                        self.close()
-                        self._recovery_delay()
+                        self._disconnect()
+                        err = self._recovery()
+                        if err.isError():
+                            return err
                         continue
                     return DopError(102, "Non recoverable error during commit.")
 
+            if self._session_touches is not None and self._session_touches.due():
+                self._flush_session_touches()
+            self._release()
             return DopError()     
         return DopError(103, "Error during commit.")
         
@@ -209,25 +627,84 @@ class dbProviderPostgres(providerPersistence):
         # TODO add utils of worker
 
         user.password = DopUtils.hash_string(user.password) 
-        _id, err = self._insert_obj(user, UserSchema)
+        _id, err = self._insert_obj(user)
         return err
     
     def update_user(self, user: User) -> DopError:
+        self._auth_invalidate_user(user.id)
         return self._sql_update(
             User.table_name(),
             _where = {'id': user.id},
-            update=UserSchema().dump(user))
+            update=user.to_row())
 
 
     
     def create_transaction(self, transaction: Transaction) -> DopError:
-        _id, err = self._insert_obj(transaction, TransactionSchema)
+        _id, err = self._insert_obj(transaction)
+        return err
+
+    def create_outbox_transaction(self, outbox: OutboxTransaction) -> DopError:
+        _id, err = self._insert_obj(outbox)
+        return err
+
+    def claim_outbox_transaction(self) -> Tuple[dict, DopError]:
+        # the other submitters skip the locked row (SKIP LOCKED): oldest first, for the nonces
+        query_outbox: str = """
+        SELECT      id, contract_function, contract_args, event_name, params,
+                    client, task, uuid, status, attempts, tx_hash, raw_tx
+        FROM        {table_outbox}
+        WHERE       status < 2 AND next_attempt_at <= now()
+        ORDER BY    id
+        LIMIT       1
+        FOR UPDATE SKIP LOCKED
+        """.format(
+            table_outbox=TableName.OUTBOX
+        )
+
+        err, cursor = self._execute_with_retry(query_outbox, prepare=True)
+        if err.isError():
+            return {}, DopError(312, "The outbox transaction could not be retrieved.")
+        try:
+            outbox = serialize(cursor.fetchall(), cursor)
+        except Exception as e:
+            print(f"{int(time.time())} | {getframeinfo(currentframe()).filename} | "\
+                    f"{getframeinfo(currentframe()).lineno} | {type(e)} | {traceback.format_exc()}", file = sys.stderr)
+            sys.stderr.flush()
+            return {}, DopError(312, "The outbox transaction could not be retrieved.")
+
+        if len(outbox) == 0:
+            return {}, DopError()
+        return outbox[0], err
+
+    def update_outbox_transaction(self, outbox_id: int, status: int, tx_hash: str = None,
+                                  raw_tx: str = None, error: str = None, retry_s: int = 0) -> DopError:
+        # the arguments of the call (e.g. proxy secrets) are cleared once it is sent or failed
+        query_outbox: str = """
+        UPDATE      {table_outbox}
+        SET         status = ?,
+                    tx_hash = ?,
+                    raw_tx = ?,
+                    last_error = ?,
+                    attempts = attempts + ?,
+                    next_attempt_at = now() + CAST(? AS INTEGER) * interval '1 second',
+                    contract_args = CASE WHEN ? IN ({sent}, {failed}) THEN NULL ELSE contract_args END
+        WHERE       id = ?
+        """.format(
+            table_outbox=TableName.OUTBOX,
+            sent=OutboxTransaction.SENT,
+            failed=OutboxTransaction.FAILED
+        )
+
+        values = (status, tx_hash, raw_tx, error, 0 if error is None else 1, int(retry_s), status, outbox_id)
+        err, cursor = self._execute_with_retry(query_outbox, values, prepare=True)
+        if err.isError():
+            return DopError(355, "The outbox transaction could not be updated.")
         return err
 
     
     def create_product(self, product: Product, uuid: str) -> Tuple[int,DopError]: 
         product.id = uuid
-        _id, err = self._insert_obj(product, ProductSchema)
+        _id, err = self._insert_obj(product)
 
         if err.isError(): 
             return 0, err 
@@ -243,14 +720,14 @@ class dbProviderPostgres(providerPersistence):
 
    
     def create_product_usage(self, product_usage: ProductUsage) -> DopError:
-        _id, err = self._insert_obj(product_usage, ProductUsageSchema)
+        _id, err = self._insert_obj(product_usage)
         return err
     
     def update_or_create_session(self, session: Session) -> DopError: 
         session_obj, err = self.get_session({'client': session.client})
 
         if not session_obj:
-            _id, err = self._insert_obj(session, SessionSchema)
+            _id, err = self._insert_obj(session)
             return err
     
         elif isinstance(session_obj, list):
@@ -262,13 +739,13 @@ class dbProviderPostgres(providerPersistence):
 
         # For multisession functionality:
         # only insert_obj here; do not update old sessions; 
-        return self.update_session(session_obj.id, **SessionSchema().dump(session))
+        return self.update_session(session_obj.id, **session.to_row())
         
 
 
 
     def create_session(self, session: Session) -> DopError:
-        _id, err = self._insert_obj(session, SessionSchema)
+        _id, err = self._insert_obj(session)
         return err
 
 
@@ -374,7 +851,8 @@ class dbProviderPostgres(providerPersistence):
 
     def get_transaction(self, where: dict) \
             -> Tuple[Union[Transaction, list, None], DopError]: 
-        return self._select_obj(Transaction, where)
+        # hot query (transaction by hash): prepared statement
+        return self._select_obj(Transaction, where, prepare=True)
 
     def get_product_usage(self, where: dict = None) \
                             -> Tuple[Union[list, ProductUsage, None], DopError]:
@@ -389,7 +867,8 @@ class dbProviderPostgres(providerPersistence):
 
         :param where:
         """
-        return self._select_obj(User, where)
+        # hot query (user by id): prepared statement
+        return self._select_obj(User, where, prepare=True)
 
       
     def get_product_reference(self, product_id) \
@@ -403,16 +882,15 @@ class dbProviderPostgres(providerPersistence):
                     {table_product}.blk_specific as product_blk_specific,
                     {table_user}.blk_address as publisher_blk_address
         FROM        {table_product},{table_user} 
-        WHERE       {table_product}.id='{pid}'
+        WHERE       {table_product}.id=?
         AND         {table_user}.id={table_product}.publisher
         """.format(
             table_product=TableName.PRODUCT,
-            table_user=TableName.USER,
-            pid=product_id
+            table_user=TableName.USER
         )
 
 
-        products, err = self._sql_select(query_product)
+        products, err = self._sql_select(query_product, values=[product_id])
         if err.isError():
             # was err 304
             return {}, DopError(304,"The requested product reference could not be retrieved. Please check if the product exists.")
@@ -478,7 +956,8 @@ class dbProviderPostgres(providerPersistence):
         # TODO status to be decided by client
         _filter['status'] = 2
 
-        return self._sql_select(query, _filter)
+        # hot query (product by id): prepared statement
+        return self._sql_select(query, _filter, prepare=True)
 
     def get_products_limits(self, start, limit)\
         -> Tuple[Union[dict, list, None], DopError]:
@@ -494,14 +973,17 @@ class dbProviderPostgres(providerPersistence):
             FROM {Product.table_name()} as p
             JOIN {User.table_name()} as a ON p.publisher = a.id
             LEFT JOIN {ProductUsage.table_name()} as pu ON pu.product_id = p.id
+            {self.SUBSCRIPTIONS_JOIN}
             WHERE pu.usage = 1
             LIMIT {limit} OFFSET {start}
         """
 
-    def get_sets_products(self, account_id, subset, where: dict = {}, limit=-1, offset= -1) \
+    def get_sets_products(self, account_id, subset, where: dict = {}, limit=-1, offset= -1,
+                          keyset: bool = False, after: dict = None, page_size: int = 0) \
         -> Tuple[Union[dict, list, None], DopError]:
         # NOTE in processor using this function, ensure that 
         # "created_at" (datetime) is serialized correctly
+        # keyset, after, page_size: see _products_page and _products_fetch
         
         _filter = copy.deepcopy(where)
 
@@ -554,26 +1036,20 @@ class dbProviderPostgres(providerPersistence):
             _filter["pu.usage"] = 2
         
         _filter["pu.account_id"] = account_id         # TODO Check:left join?
-        query = f"""{query} 
-                   
-                    JOIN (SELECT 
-                        p.id as product_id, 
-                        count(ps.id) as no_subscriptions
-                        FROM {Product.table_name()} as p 
-                        LEFT JOIN {ProductSubscription.table_name()} as ps 
-                        on p.id = ps.product 
-                        GROUP BY p.id) t     
-                    ON p.id = t.product_id
-                """
-
+        # the subscriptions are counted only for the products returned
+        query = query + self.SUBSCRIPTIONS_JOIN
 
-        return self._sql_select(query, _filter, limit=limit,offset= offset)
+        query, values = self._select_query(query, _filter)
+        query, values = self._products_page(query, values, limit, offset, keyset, after)
+        return self._products_fetch(query, values, page_size)
 
     
-    def get_all_products(self, where: dict = None, limit=-1, offset= -1) \
+    def get_all_products(self, where: dict = None, limit=-1, offset= -1,
+                         keyset: bool = False, after: dict = None, page_size: int = 0) \
         -> Tuple[Union[dict, list, None], DopError]:
         # NOTE in processor using this function, ensure that 
         # "created_at" (datetime) is serialized correctly
+        # keyset, after, page_size: see _products_page and _products_fetch
         query = """  
             SELECT p.id,
                 p.label, 
@@ -582,27 +1058,24 @@ class dbProviderPostgres(providerPersistence):
                 p.tariff_period,    
                 t.no_subscriptions
             FROM {table_product} as p
-            JOIN (SELECT 
-                        p.id as product_id, 
-                        count(ps.id) as no_subscriptions
-                        FROM {table_product} as p 
-                        LEFT JOIN {table_subscription} as ps 
-                        on p.id = ps.product 
-                        GROUP BY p.id) t     
-                    ON p.id = t.product_id
+            {subscriptions_join}
         """.format(
             table_product=TableName.PRODUCT,
-            table_subscription = TableName.PRODUCT_SUBSCRIPTION
+            subscriptions_join=self.SUBSCRIPTIONS_JOIN
         )
 
-        return self._sql_select(query, where, limit=limit,offset= offset)
+        query, values = self._select_query(query, where)
+        query, values = self._products_page(query, values, limit, offset, keyset, after)
+        return self._products_fetch(query, values, page_size)
 
 
 
-    def get_other_products(self, account_id, where: dict= None, limit=-1, offset= -1) \
+    def get_other_products(self, account_id, where: dict= None, limit=-1, offset= -1,
+                           keyset: bool = False, after: dict = None, page_size: int = 0) \
         -> Tuple[Union[dict, list, None], DopError]:
         # NOTE in processor using this function, ensure that 
         # "created_at" (datetime) is serialized correctly
+        # keyset, after, page_size: see _products_page and _products_fetch
 
         query = """  
             SELECT distinct p.id,
@@ -644,36 +1117,73 @@ class dbProviderPostgres(providerPersistence):
             query += " WHERE {where_clause}".format(
                 where_clause=' {logic_op} '.format(logic_op='AND').join(_where)
             )
-        query += " ORDER BY id"
+        # the subscriptions of the products returned are counted in the same query
+        query = "SELECT p.*, t.no_subscriptions FROM ({query}) AS p {subscriptions_join}".format(
+            query=query,
+            subscriptions_join=self.SUBSCRIPTIONS_JOIN
+        )
+        if not keyset:
+            query += " ORDER BY id"
+        query, values = self._products_page(query, values, limit, offset, keyset, after)
 
-        if limit != -1 and offset != -1:
-            query += f" LIMIT {limit} OFFSET {offset}"
+        return self._products_fetch(query, values, page_size)
 
+    def _products_page(self, query: str, values: list, limit=-1, offset=-1, 
+                       keyset: bool = False, after: dict = None) -> Tuple[str, list]:
+        """
+        Paginate a product listing query:
+        - keyset: the rows are ordered by (created_at, id) and, if after (the 
+          created_at and id of the last row of the previous page) is set, only the 
+          rows that follow it are returned; limit (if not -1) is the page size
+        - otherwise limit/offset (if both are not -1)
+        """
+        values = list(values)
+        if keyset:
+            query = f"SELECT * FROM ({query}) AS q"
+            if after:
+                query += " WHERE (q.created_at, q.id) > (CAST(? AS TIMESTAMPTZ), CAST(? AS UUID))"
+                values.extend([after.get('created_at'), after.get('id')])
+            query += " ORDER BY q.created_at, q.id"
+            if limit != -1:
+                query += " LIMIT ?"
+                values.append(int(limit))
+        elif limit != -1 and offset != -1:
+            query += " LIMIT ? OFFSET ?"
+            values.extend([int(limit), int(offset)])
+        return query, values
+
+    def _products_fetch(self, query: str, values: list, page_size: int = 0) \
+            -> Tuple[Union[list, Iterator[list]], DopError]:
+        """
+        Execute a product listing query: with page_size > 0 the result set is 
+        streamed, i.e. an iterator of lists of (at most) page_size rows is returned;
+        the iterator has to be consumed before the transaction is over. psqlODBC 
+        fetches the rows from the server a page at a time only if the connection 
+        string sets UseDeclareFetch=1 (and Fetch=page_size), otherwise the driver 
+        buffers the whole result set
+        """
         err, cursor = self._execute_with_retry(query, values)
         if err.isError():
             return [], DopError(106, "An error occurred while executing a select query.")
+        if page_size > 0:
+            return self._fetch_pages(cursor, page_size), DopError()
         try:
             row = cursor.fetchall()
             data = serialize(row, cursor)
         except Exception as e:
-            if e.args and len(e.args) > 0:
-                print(f"{int(time.time())} | {getframeinfo(currentframe()).filename} | "\
-                        f"{getframeinfo(currentframe()).lineno} | {type(e)} | {traceback.format_exc()}", file = sys.stderr)
-                sys.stderr.flush()
-                return [], DopError(107, "An exception occurred while extracting data from the result set.")
-            return [], DopError(107,
-                             "An exception occurred while extracting data from the result set.")
-
-        # data is a dictionary or a list of dictionaries
-        if isinstance(data, dict):
-            data = [data]
-
-        for el in data:
-            c, err = self.get_number_of_subscriptions(el.get('id'))
-            el['no_subscriptions'] = c
-        
+            print(f"{int(time.time())} | {getframeinfo(currentframe()).filename} | "\
+                    f"{getframeinfo(currentframe()).lineno} | {type(e)} | {traceback.format_exc()}", file = sys.stderr)
+            sys.stderr.flush()
+            return [], DopError(107, "An exception occurred while extracting data from the result set.")
         return data, DopError()
 
+    def _fetch_pages(self, cursor, page_size: int) -> Iterator[list]:
+        while True:
+            rows = cursor.fetchmany(page_size)
+            if not rows:
+                return
+            yield serialize(rows, cursor)
+
     def get_number_of_subscriptions(self, product_id)\
         -> Tuple[int, DopError]:
         query = f"""SELECT count(id) 
@@ -691,10 +1201,13 @@ class dbProviderPostgres(providerPersistence):
         """
             get a product - lookup by blockchain address
             WARNING:    this to be used only internally as it returns the product's secret
-            WARNING:    ilike is used as the blk address carried by a log event emitted
+            WARNING:    the match is case insensitive as the blk address carried by a log event emitted
                         by a smart contract might be different (lower/upper cases) from
                         an address returned on smart contract creation
+                        (lower(blk_address) is indexed)
         """
+        if not blkaddress:
+            return {}, DopError(0, "The requested product could not be retrieved.")
 
         query_product = """
         SELECT          id,
@@ -719,12 +1232,10 @@ class dbProviderPostgres(providerPersistence):
                         secret,
                         created_at
         FROM            {table_product}
-        WHERE           blk_address ilike '{s_blkaddress}'
         """.format(
-            table_product=TableName.PRODUCT,
-            s_blkaddress=blkaddress
+            table_product=TableName.PRODUCT
         )
-        products, err = self._sql_select(query_product)
+        products, err = self._sql_select(query_product, {'lower(blk_address)': blkaddress.lower()})
         if err.isError():
             return {}, DopError(305, "The requested product could not be retrieved.")
         
@@ -740,7 +1251,8 @@ class dbProviderPostgres(providerPersistence):
         """
         :param where
         """
-        return self._select_obj(Session, where)
+        # hot query (session lookup): prepared statement
+        return self._select_obj(Session, where, prepare=True)
 
      
     def get_user_from_session(self, where: dict) \
@@ -763,17 +1275,15 @@ class dbProviderPostgres(providerPersistence):
         query_subscription: str = """
         SELECT          * 
         FROM            {table_subscriptions} 
-        WHERE           subscriber='{uid}'
-        AND             product='{pid}'
+        WHERE           subscriber=?
+        AND             product=?
         """.format(
-            table_subscriptions=TableName.PRODUCTS_SUBSCRIBERS,
-            uid=user_id,
-            pid=product_id
+            table_subscriptions=TableName.PRODUCTS_SUBSCRIBERS
         ) 
 
         #logger.debug(query_subscription) # TODO logging userdata
 
-        subscriptions, err = self._sql_select(query_subscription)
+        subscriptions, err = self._sql_select(query_subscription, values=[user_id, product_id])
         if err.isError():
             return {}, DopError(306, "The user's subscription to the indicated product could not be retrieved.")
         
@@ -789,10 +1299,13 @@ class dbProviderPostgres(providerPersistence):
         """
             get a user - lookup by blockchain address
             WARNING:    this to be used only internally as it returns blk_password
-            WARNING:    ilike is used as the blk address carried by a log event emitted
+            WARNING:    the match is case insensitive as the blk address carried by a log event emitted
                         by a smart contract might be different (lower/upper cases) from
                         an address returned by personal.newAccount
+                        (lower(blk_address) is indexed)
         """
+        if not blkaddress:
+            return {}, DopError(0, "The account could not be retrieved.")
         query_account: str = """
         SELECT          {table_account}.id,
                         {table_account}.username,
@@ -800,15 +1313,14 @@ class dbProviderPostgres(providerPersistence):
                         {table_account}.blk_address,
                         {table_account}.blk_password
         FROM            {table_account}
-        where           {table_account}.blk_address ilike '{s_blkaddress}'
         """.format(
-            table_account=TableName.USER,
-            s_blkaddress=blkaddress
+            table_account=TableName.USER
         )
 
         #logger.debug(query_account) # TODO a better logging with userdata
 
-        accounts, err = self._sql_select(query_account)
+        accounts, err = self._sql_select(query_account, {'lower({table_account}.blk_address)'.format(
+            table_account=TableName.USER): blkaddress.lower()})
         if err.isError():
             return {}, DopError(308, "The account could not be retrieved.")
 
@@ -832,19 +1344,17 @@ class dbProviderPostgres(providerPersistence):
                         {table_account}.blk_address,
                         {table_account}.blk_password
         FROM            {table_account}, {table_session}
-        where           {table_session}.value = '{s_session}'
-        AND             {table_session}.token = '{s_auth_token}'
+        where           {table_session}.value = ?
+        AND             {table_session}.token = ?
         AND             {table_session}.client = {table_account}.id
         """.format(
             table_account=TableName.USER,
-            table_session=TableName.SESSION,
-            s_session=session,
-            s_auth_token=auth_token
+            table_session=TableName.SESSION
         )
 
         #logger.debug(query_account) # TODO better logging with userdata
 
-        accounts, err = self._sql_select(query_account)
+        accounts, err = self._sql_select(query_account, values=[session, auth_token])
         
         if err.isError():
             return {}, DopError(308, "The account could not be retrieved.")
@@ -878,17 +1388,24 @@ class dbProviderPostgres(providerPersistence):
                         task, 
                         uuid
         FROM            {table_transaction}
-        WHERE           hash ilike '{this_hash}'
+        WHERE           lower(hash) = lower(?)
         """.format(
-            table_transaction=TableName.TRANSACTION,
-            this_hash=hash
+            table_transaction=TableName.TRANSACTION
         )
 
         #logger.debug(query_transaction) # TODO better logging via userdata
 
-        transactions, err = self._sql_select(query_transaction)
+        # hot query (transaction by hash): prepared statement
+        err, cursor = self._execute_with_retry(query_transaction, (hash,), prepare=True)
         if err.isError():
             return {}, DopError(309, "The transaction information could not be retrieved.")
+        try:
+            transactions = serialize(cursor.fetchall(), cursor)
+        except Exception as e:
+            print(f"{int(time.time())} | {getframeinfo(currentframe()).filename} | "\
+                    f"{getframeinfo(currentframe()).lineno} | {type(e)} | {traceback.format_exc()}", file = sys.stderr)
+            sys.stderr.flush()
+            return {}, DopError(309, "The transaction information could not be retrieved.")
         
         if len(transactions) == 0:
             return {}, DopError(0, "The transaction information could not be retrieved.")
@@ -906,6 +1423,9 @@ class dbProviderPostgres(providerPersistence):
 
     
     def delete_session(self, id: int) -> DopError: 
+        self._auth_invalidate_session(id)
+        if self._session_touches is not None:
+            self._session_touches.forget(id)
         try:
             table_name = Session.table_name()
             query =  "DELETE from {} WHERE id=?;".format(table_name)
@@ -966,12 +1486,60 @@ class dbProviderPostgres(providerPersistence):
 
      
     def update_session(self, session_id, **kwargs) -> DopError:
+        self._auth_invalidate_session(session_id)
         return self._sql_update(
             Session.table_name(),
             #_where={'client': session_client},
             _where = {'id': session_id},
             update=kwargs)
 
+    def touch_session(self, session_id, last_updated) -> DopError:
+        if self._session_touches is None:
+            return self.update_session(session_id, last_updated=last_updated)
+        # written by _flush_session_touches, after the commit of a later transaction
+        self._session_touches.touch(session_id, last_updated)
+        return DopError()
+
+    def session_last_touch(self, session_id):
+        if self._session_touches is None:
+            return None
+        return self._session_touches.last_touch(session_id)
+
+    def _flush_session_touches(self):
+        # write the buffered touches with a single statement, in a transaction of its own;
+        # the touches are given back to the buffer if the update fails
+        touches = self._session_touches.drain()
+        if len(touches) == 0:
+            return
+
+        rows = ", ".join(["(CAST(? AS BIGINT), CAST(? AS TIMESTAMPTZ))"] * len(touches))
+        query = f"""
+            UPDATE  {Session.table_name()} AS s
+            SET     last_updated = v.last_updated
+            FROM    (VALUES {rows}) AS v(id, last_updated)
+            WHERE   s.id = v.id
+            AND     (s.last_updated IS NULL OR s.last_updated < v.last_updated);
+        """
+        values = []
+        # sorted by id: the flushes of the lanes and processes lock the rows in the same order
+        for session_id, last_updated in sorted(touches.items()):
+            values.extend([session_id, last_updated.isoformat()])
+
+        err, cursor = self._execute_with_retry(query, values)
+        if not err.isError():
+            try:
+                self._connection.commit()
+                return
+            except Exception as e:
+                print(f"{int(time.time())} | {getframeinfo(currentframe()).filename} | "\
+                        f"{getframeinfo(currentframe()).lineno} | {type(e)} | {traceback.format_exc()}", file = sys.stderr)
+                sys.stderr.flush()
+        try:
+            self._connection.rollback()
+        except Exception:
+            pass
+        self._session_touches.restore(touches)
+
      
     def update_encrypted_session(self, session, **kwargs) -> DopError : 
         # This update is called when the user connects on a new session_value 
@@ -991,18 +1559,18 @@ class dbProviderPostgres(providerPersistence):
         # insert or update, to be used in the encryption_login processor
         encSession_obj, err = self.get_encrypted_session({'session_id': encSession.session_id})
         if not encSession_obj: 
-            _id, err = self._insert_obj(encSession, EncryptedSessionSchema)
+            _id, err = self._insert_obj(encSession)
             return err
         elif err.isError() or isinstance(encSession_obj, list):
             return DopError(310, "Error while reading encrypted session information.")
-        return self.update_encrypted_session(encSession.session_id, **EncryptedSessionSchema().dump(encSession))
+        return self.update_encrypted_session(encSession.session_id, **encSession.to_row())
     # via multi-session, there should be only an insert_obj here
 
     
     def create_encrypted_session(self, encSession:  EncryptedSession) -> DopError:
         """
         """
-        _id, err = self._insert_obj(encSession, EncryptedSessionSchema)
+        _id, err = self._insert_obj(encSession)
         return err
 
       
@@ -1013,9 +1581,17 @@ class dbProviderPostgres(providerPersistence):
         return self._select_obj(EncryptedSession, where)
 
 
+    def _product_document(self, product: dict) -> dict:
+        # the properties are aggregated by PROPERTIES_JOIN in a json array
+        properties = product.get('properties')
+        if isinstance(properties, (str, bytes)):
+            product['properties'] = json.loads(properties)
+        return product
+
     def get_product_summary(self, product_id) -> Tuple[dict, DopError]:
         # NOTE in processor using this function, ensure that 
         # "created_at" (datetime) is serialized correctly
+        # the document includes the number of subscriptions and the properties (one round-trip)
 
         query_product = """
                 SELECT 
@@ -1026,37 +1602,39 @@ class dbProviderPostgres(providerPersistence):
                   p.created_at,
                   p.tariff_price, 
                   p.tariff_period,
-                  a.name as publisher_name
+                  a.name as publisher_name,
+                  t.no_subscriptions,
+                  props.properties
                   FROM {table_product} as p
                   JOIN {product_usage} as tu ON p.id = tu.product_id 
                   JOIN {table_user} as a ON tu.account_id = a.id
-                  WHERE p.id = '{product_id}' AND tu.usage = 1
+                  {subscriptions_join}
+                  {properties_join}
                   """.format(
-                    product_id=product_id,
                     table_product=TableName.PRODUCT,
                     product_usage=TableName.PRODUCT_USAGE,
-                    table_user=TableName.USER
+                    table_user=TableName.USER,
+                    subscriptions_join=self.SUBSCRIPTIONS_JOIN,
+                    properties_join=self.PROPERTIES_JOIN
                   )
        
-        products, err = self._sql_select(query_product)
+        if not product_id:
+            return {}, DopError(0, "The product details could not be retrieved.")
+        products, err = self._sql_select(query_product, {'p.id': product_id, 'tu.usage': 1}, prepare=True)
         if err.isError():
             return {}, DopError(312, "The product details could not be retrieved.")
 
         if len(products) == 0:
             return {}, DopError(0, "The product details could not be retrieved.")    
     
-        product = products[0]
+        product = self._product_document(products[0])
         return product, err
          
     
     def get_product_details(self, product_id) -> Tuple[dict, DopError]:
-         # TODO improve this
-        #   GRAZ
         """
-        The following was removed
-        SELECT pr.property_value as property_value
-        LEFT JOIN {table_property_product} as pp ON pp.product = p.id
-        LEFT JOIN {table_property} as pr ON pp.property = pr.id
+        The published product, with the number of its subscriptions and its
+        properties (property_name, property_value), in one round-trip
         """
         query_product = """
                 SELECT 
@@ -1080,26 +1658,30 @@ class dbProviderPostgres(providerPersistence):
                   status,
                   publisher,
                   a.name as publisher_name, 
-                  a.username as publisher_username
+                  a.username as publisher_username,
+                  t.no_subscriptions,
+                  props.properties
                   
                 FROM {table_product} as p 
                 JOIN {table_user} as a ON p.publisher = a.id
-                
-                WHERE status=2 AND 
-                      p.id='{product_id}'
+                {subscriptions_join}
+                {properties_join}
         """.format(
-            product_id=product_id,
             table_product=TableName.PRODUCT,
-            table_user=TableName.USER
+            table_user=TableName.USER,
+            subscriptions_join=self.SUBSCRIPTIONS_JOIN,
+            properties_join=self.PROPERTIES_JOIN
            )
-        products, err = self._sql_select(query_product)
+        if not product_id:
+            return {}, DopError(0, "The product details could not be retrieved.")
+        products, err = self._sql_select(query_product, {'p.status': 2, 'p.id': product_id}, prepare=True)
         if err.isError():
             return {}, DopError(312, "The product details could not be retrieved.")
 
         if len(products) == 0:
             return {}, DopError(0, "The product details could not be retrieved.")
         
-        product = products[0]
+        product = self._product_document(products[0])
         return product, err
 
     
@@ -1122,12 +1704,12 @@ class dbProviderPostgres(providerPersistence):
 
 
     def create_property(self, property: Property) -> Tuple[int, DopError]:
-        _id, err = self._insert_obj(property, PropertySchema)
+        _id, err = self._insert_obj(property)
         return _id, err
 
 
     def create_property_product(self, property_product: PropertyProduct) -> DopError:
-        _id, err = self._insert_obj(property_product, PropertyProductSchema)
+        _id, err = self._insert_obj(property_product)
         return err
 
 
@@ -1138,7 +1720,7 @@ class dbProviderPostgres(providerPersistence):
     def create_purpose_of_usage(self, 
                                 purpose: PurposeOfUsage)\
                                 -> Tuple[int, DopError]:
-        _id, err = self._insert_obj(purpose, PurposeOfUsageSchema)
+        _id, err = self._insert_obj(purpose)
         return _id, err
     
     
@@ -1189,7 +1771,7 @@ class dbProviderPostgres(providerPersistence):
                                     subscription: ProductSubscription)  \
                                     -> Tuple[int, DopError]:
         
-        _id, err = self._insert_obj(subscription, ProductSubscriptionSchema)
+        _id, err = self._insert_obj(subscription)
         if err.isError():
             return 0, err
 
@@ -1225,10 +1807,12 @@ class dbProviderPostgres(providerPersistence):
                 ON ps.subscriber = a.id
                 INNER JOIN {PurposeOfUsage.table_name()} as pos
                 ON ps.purpose_id = pos.id
-                WHERE ps.id IN %s
+                WHERE ps.id IN ({",".join(["?"] * len(where or []))})
                 """
         
-        err, cursor = self._execute_with_retry(query, (tuple(where),))
+        if not where:
+            return [], DopError()
+        err, cursor = self._execute_with_retry(query, list(where))
         
         if err.isError():
             return [], DopError(106, "An error occurred while executing a select query.")
@@ -1418,64 +2002,98 @@ class dbProviderPostgres(providerPersistence):
         return self._sql_update(
             ProductSubscription.table_name(),
             _where={'id': subscription_id}, 
-            update=ProductSubscriptionSchema().dump(modified_entry)) 
+            update=modified_entry.to_row()) 
 
     def delete_product_subscription(self, 
                                     subscription_id,
                                     subscriber_id,
                                     product_id
                                     ) -> DopError:
-        
-        # TODO decide on method parameters; the method can be as this one or there can be 
-        # only subscription_id as parameter, and a select internally to get 
-        # subscriber_id and product_id
-        try:
-            table_name = ProductSubscription.table_name()
-          
-            sql = "DELETE from {} WHERE id=?;".format(table_name)
-            err, cursor = self._execute_with_retry(sql, [subscription_id])
+        """
+        Delete the subscription and one product usage entry of its subscriber,
+        in one statement (subscriber_id and product_id are those of the subscription)
+        """
+        deleted, err = self._delete_subscriptions("ps.id = ?", [subscription_id])
+        return err
+
+    def delete_product_subscriptions(self, subscription_ids: list) \
+                                    -> Tuple[list, DopError]:
+        deleted = []
+        ids = list(subscription_ids)
+        # one statement for every BULK_DELETE_SIZE subscriptions
+        for start in range(0, len(ids), self.BULK_DELETE_SIZE):
+            chunk = ids[start:start + self.BULK_DELETE_SIZE]
+            rows, err = self._delete_subscriptions(
+                "ps.id IN ({})".format(",".join(["?"] * len(chunk))), chunk)
             if err.isError():
-                return err 
-            
+                return deleted, err
+            deleted.extend(rows)
+        return deleted, DopError()
 
-            # first of all, check if there is more than one product usage entry, 
-            # and delete only one entry (at random basically)
-            # NOTE there should be as many product_usage entries for this 
-            # account for this product as there are product_subscription entries
-            where = {
-                "account_id" : subscriber_id, 
-                "product_id" : product_id,
-                "usage" : 2
-            }
-            usages, err = self.get_product_usage(where)
-            if err.isError(): 
-                return err 
-            
-            if isinstance(usages, ProductUsage): 
-                usages = [usages]
+    def delete_product_subscriptions_of_product(self, product_id, subscriber_id=None) \
+                                    -> Tuple[list, DopError]:
+        if subscriber_id is None:
+            return self._delete_subscriptions("ps.product = ?", [product_id])
+        return self._delete_subscriptions("ps.product = ? AND ps.subscriber = ?", [product_id, subscriber_id])
 
-            # if usages is None? 
-            if len(usages):
-                to_delete = usages[-1].id 
-            
-                table_name = ProductUsage.table_name()
-                sql2 = "DELETE from {} WHERE id=?;".format(table_name)
-                err, cursor = self._execute_with_retry(sql2, [to_delete])
-                if err.isError():
-                    return err 
-                
-            return DopError()
+    def _delete_subscriptions(self, condition: str, values: list) -> Tuple[list, DopError]:
+        """
+        Delete the subscriptions that satisfy condition and, for each of them, one 
+        of the product usage entries (usage 2) of its subscriber for its product.
+        NOTE there are as many product usage entries of a subscriber for a product 
+        as there are subscriptions
+        A single statement, whatever the number of subscriptions: the deleted 
+        subscriptions (id, subscriber, product) are returned
+        """
+        def build() -> str:
+            return """
+            WITH deleted AS (
+                DELETE FROM {table_subscription} AS ps
+                WHERE {condition}
+                RETURNING ps.id, ps.subscriber, ps.product
+            ), released AS (
+                SELECT subscriber, product, count(*) AS n
+                FROM deleted GROUP BY subscriber, product
+            ), usages AS (
+                SELECT u.id FROM (
+                    SELECT pu.id, r.n, row_number() OVER (
+                        PARTITION BY pu.account_id, pu.product_id ORDER BY pu.id DESC) AS rn
+                    FROM {table_usage} AS pu
+                    JOIN released AS r ON pu.account_id = r.subscriber AND pu.product_id = r.product
+                    WHERE pu.usage = 2) AS u
+                WHERE u.rn <= u.n
+            ), deleted_usages AS (
+                DELETE FROM {table_usage} AS pu
+                USING usages
+                WHERE pu.id = usages.id
+                RETURNING pu.id
+            )
+            SELECT id, subscriber, product FROM deleted
+            """.format(
+                table_subscription=ProductSubscription.table_name(),
+                table_usage=ProductUsage.table_name(),
+                condition=condition
+            )
+
+        if len(values) == 0 or not all(values):
+            return [], DopError()
+        try:
+            query = self._sql_texts.get(('delete_subscriptions', condition), build)
+            err, cursor = self._execute_with_retry(query, values)
+            if err.isError():
+                return [], err
+            return rows_to_dicts(cursor, cursor.fetchall()), DopError()
         except Exception as e:
             if e.args and len(e.args) > 0:
                 print(f"{int(time.time())} | {getframeinfo(currentframe()).filename} | "\
                         f"{getframeinfo(currentframe()).lineno} | {type(e)} | {traceback.format_exc()}", file = sys.stderr)
                 sys.stderr.flush()
-                return DopError(353, "An exception occurred when deleting the subscriber.")      # TODO update: deleting the subscription              
-            return DopError(353, "An exception occurred when deleting the subscriber.")
+                return [], DopError(353, "An exception occurred when deleting the subscriber.")      # TODO update: deleting the subscription              
+            return [], DopError(353, "An exception occurred when deleting the subscriber.")
 
     def insert_account_role(self, account_role: AccountRole) \
                         -> Tuple[int, DopError ]:
-        _id, err = self._insert_obj(account_role, AccountRoleSchema)
+        _id, err = self._insert_obj(account_role)
         return _id, err 
 
     def get_account_role(self, where:dict = {})\
@@ -1572,22 +2190,42 @@ class dbProviderPostgres(providerPersistence):
                     max_retry -= 1
                     print(f"{int(time.time())} | {getframeinfo(currentframe()).filename} | "\
                             f"{getframeinfo(currentframe()).lineno} | Recovering from last error. Retries left: {max_retry}.\n", file = sys.stderr)
-                    self.close()
-                    self._recovery_delay()
+                    self._disconnect()
+                    err = self._recovery()
+                    if err.isError():
+                        return err, cursor
                     continue
                 return DopError(123, "Non recoverable error while getting database cursor."), cursor  # not recoverable
             return DopError(0), cursor      # success
         return DopError(124,"Non recoverable error while getting database cursor: maximum number of attempts exceeded" ), cursor      
 
 
-    def _execute_with_retry(self, query, values=None) -> Tuple[DopError, pyodbc.Cursor]:
+    def _execute_with_retry(self, query, values=None, prepare: bool = False) -> Tuple[DopError, pyodbc.Cursor]:
+        """
+        prepare: the query is a hot one, it is executed with the prepared statement 
+        of the connection (see sql_cache.StatementCache)
+        """
+        if not _is_read_query(str(query)):
+            self._tx_wrote = True
+        elif self._read_only and not self._tx_wrote and self._replica_config is not None:
+            cursor = self._replica_execute(query, values)
+            if cursor is not None:
+                return DopError(0), cursor
         max_retry = self._recovery_max
         cursor = None
+        started = time.perf_counter()
         while max_retry > 0: 
             err = self.open()
             if err.isError():
                 return err, cursor
-            err, cursor = self._cursor() 
+            if prepare:
+                cursor, reused = self._statements().cursor(query, self._connection)
+                if reused:
+                    self._stmt_hits += 1
+                else:
+                    self._stmt_misses += 1
+            else:
+                err, cursor = self._cursor() 
 
             if err.isError():
                 return err, cursor
@@ -1601,40 +2239,69 @@ class dbProviderPostgres(providerPersistence):
                     max_retry -= 1
                     print(f"{int(time.time())} | {getframeinfo(currentframe()).filename} | "\
                             f"{getframeinfo(currentframe()).lineno} | Recovering from last error. Retries left: {max_retry}.\n", file = sys.stderr)
-                    self.close()
-                    self._recovery_delay()
+                    self._disconnect()
+                    err = self._recovery()
+                    if err.isError():
+                        self._record_query(query, values, started, 0, self._recovery_max - max_retry, True)
+                        return err, cursor
                     continue
                 print(f"{int(time.time())} | {getframeinfo(currentframe()).filename} | "\
                             f"{getframeinfo(currentframe()).lineno} | Error: {e}\n", file = sys.stderr)
-                    
+                self._record_query(query, values, started, 0, self._recovery_max - max_retry, True)
                 return DopError(121, "Non recoverable error while executing a query."), cursor # not recoverable
+            if self._breaker is not None:
+                self._breaker.record_success()
+            self._record_query(query, values, started, cursor.rowcount, self._recovery_max - max_retry, False)
             return DopError(0), cursor    #  success
+        self._record_query(query, values, started, 0, self._recovery_max, True)
         return DopError(122, "Query could not be executed: maximum number of attempts exceeded."), cursor
 
-    def _sql_select(self, base_query, where: dict = None, logic_op: str = 'AND', limit=-1, offset=-1) \
-            -> Tuple[list, DopError]:
-      
-        query = base_query
+    def _select_query(self, base_query, where: dict = None, logic_op: str = 'AND', paged: bool = False,
+                      values: list = None) -> Tuple[str, list]:
+        # the text of the select query and its values
+        # values: bound to the placeholders of base_query, which is cached as it is 
+        # (it must not embed any value)
         # TODO Select with columns name
-        values = []
-        _where = []
+        values = list(values) if values else []
+        columns = []
         if where:
             for attribute, value in where.items():
                 if value:
-                    _where.append('{attribute}=?'.format(attribute=attribute))
+                    columns.append(attribute)
                     values.append(value)
-            where_clause = ' {logic_op} '.format(logic_op=logic_op).join(_where)
-            query += " WHERE {where_clause}".format(
-                where_clause=where_clause
-            )
-        if limit != -1 and offset != -1:
-            query += f" LIMIT {limit} OFFSET {offset} "
-        err, cursor = self._execute_with_retry(query, values)
+
+        def build() -> str:
+            query = base_query
+            if where:
+                where_clause = ' {logic_op} '.format(logic_op=logic_op).join(
+                    ['{attribute}=?'.format(attribute=attribute) for attribute in columns])
+                query += " WHERE {where_clause}".format(
+                    where_clause=where_clause
+                )
+            if paged:
+                query += " LIMIT ? OFFSET ? "
+            return query
+
+        query = self._sql_texts.get(('select', base_query, tuple(columns), logic_op, bool(where), paged), build)
+        return query, values
+
+    def _sql_select(self, base_query, where: dict = None, logic_op: str = 'AND', limit=-1, offset=-1,
+                    prepare: bool = False, mapper = rows_to_dicts, values: list = None) -> Tuple[list, DopError]:
+        """
+        mapper(cursor, rows) maps the rows of the result set, by default to a list of dict
+        values: bound to the ? placeholders of base_query (before the values of where)
+        """
+      
+        paged = limit != -1 and offset != -1
+        query, values = self._select_query(base_query, where, logic_op, paged, values)
+        if paged:
+            values.extend([int(limit), int(offset)])
+        err, cursor = self._execute_with_retry(query, values, prepare)
         if err.isError():
             return [], DopError(106, "An error occurred while executing a select query.")
         try:
             row = cursor.fetchall()
-            data = serialize(row, cursor)
+            data = mapper(cursor, row)
         except Exception as e:
             if e.args and len(e.args) > 0:
                 print(f"{int(time.time())} | {getframeinfo(currentframe()).filename} | "\
@@ -1653,10 +2320,10 @@ class dbProviderPostgres(providerPersistence):
         for key, value in update.items():
             if value:
                 values.append(value)
-                _set.append('{key} = ?'.format(key=key))
+                _set.append(key)
         for attribute, value in _where.items():
             if value:
-                where.append('{attribute}=?'.format(attribute=attribute))
+                where.append(attribute)
                 values.append(value)
             else:
                 return DopError(1)
@@ -1664,9 +2331,10 @@ class dbProviderPostgres(providerPersistence):
             # TODO check if this is to be considered and error
             return DopError(108, "No update requested")
         try:
-            query = 'UPDATE {} '.format(
-                table_name) + ' SET ' + ','.join(_set) + ' WHERE ' + ' AND '.join(where)
-            c = self._connection.cursor()
+            query = self._sql_texts.get(('update', table_name, tuple(_set), tuple(where)),
+                lambda: 'UPDATE {} '.format(table_name) + ' SET ' + \
+                    ','.join(['{key} = ?'.format(key=key) for key in _set]) + ' WHERE ' + \
+                    ' AND '.join(['{attribute}=?'.format(attribute=attribute) for attribute in where]))
             # self._execute(c, query, values)
             err, cursor = self._execute_with_retry(query, values)
             if err.isError():
@@ -1682,19 +2350,20 @@ class dbProviderPostgres(providerPersistence):
 
     def _sql_insert(self, table_name, obj: dict) -> Tuple[Union[int, None], DopError]:
       
-        query = "INSERT INTO {} ".format(table_name)
         cols = []
         values = []
-        params = []
         for attribute, value in obj.items():
             if value:
                 cols.append(attribute)
-                params.append('?')
                 values.append(value)
-        cols = ' (' + ", ".join(cols) + ')'
-        params = ' (' + ', '.join(params) + ')'
-        query += cols + ' VALUES ' + params
-        query += ' RETURNING id;'
+
+        def build() -> str:
+            query = "INSERT INTO {} ".format(table_name)
+            query += ' (' + ", ".join(cols) + ')' + ' VALUES ' + ' (' + ', '.join(['?'] * len(cols)) + ')'
+            query += ' RETURNING id;'
+            return query
+
+        query = self._sql_texts.get(('insert', table_name, tuple(cols)), build)
         try:
             err, cursor = self._execute_with_retry(query, values)
         except pyodbc.IntegrityError as e:
@@ -1715,20 +2384,90 @@ class dbProviderPostgres(providerPersistence):
         #logger.debug(_id[0][0]) # TODO better logging management - userdata
         return _id[0][0], err
 
-    def _select_obj(self, model: Type[Model], where_clause: dict, logic_op: str = 'AND') \
-            -> Tuple[Union[list, Model, None], DopError]:
+    def _sql_insert_many(self, table_name, objs: list) -> Tuple[list, DopError]:
+        """
+        Multi-row INSERT ... VALUES of objs: one statement for every run of consecutive 
+        objects that set the same columns (as _sql_insert, the columns that are not set 
+        are omitted and take their DEFAULT); the text of a statement only depends on 
+        the table, the columns and the number of rows. Returns the ids, in the order of objs
+        """
+        ids = []
+        start = 0
+        while start < len(objs):
+            cols = [attribute for attribute, value in objs[start].items() if value]
+            if len(cols) == 0:
+                return ids, DopError(110, "An exception occurred during insert operation.")
+            end = start + 1
+            while end < len(objs) and [attribute for attribute, value in objs[end].items() if value] == cols:
+                end += 1
+            values = [obj[attribute] for obj in objs[start:end] for attribute in cols]
+
+            def build(cols=cols, rows=end - start) -> str:
+                row = '(' + ', '.join(['?'] * len(cols)) + ')'
+                query = "INSERT INTO {} ".format(table_name)
+                query += ' (' + ", ".join(cols) + ')' + ' VALUES ' + ', '.join([row] * rows)
+                query += ' RETURNING id;'
+                return query
+
+            query = self._sql_texts.get(('insert_many', table_name, tuple(cols), end - start), build)
+            err, cursor = self._execute_with_retry(query, values)
+            if err.isError():
+                return ids, err
+            # the ids are returned in the order of the rows of VALUES
+            ids.extend([row[0] for row in cursor.fetchall()])
+            start = end
+        return ids, DopError()
+
+    def bulk_insert(self, models: list) -> Tuple[list, DopError]:
+        """
+        Insert the models with multi-row statements, one for every run of (at most 
+        BULK_INSERT_SIZE) consecutive models of the same table that set the same 
+        columns: returns the generated ids, in the order of the models
+        """
+        ids = []
+        try:
+            start = 0
+            while start < len(models):
+                table_name = models[start].table_name()
+                end = start + 1
+                while end < len(models) and end - start < self.BULK_INSERT_SIZE and \
+                        models[end].table_name() == table_name:
+                    end += 1
+                run_ids, err = self._sql_insert_many(table_name, [model.to_row() for model in models[start:end]])
+                if err.isError():
+                    return ids, err
+                ids.extend(run_ids)
+                start = end
+        except pyodbc.IntegrityError as e:
+            print(f"{int(time.time())} | {getframeinfo(currentframe()).filename} | "\
+                    f"{getframeinfo(currentframe()).lineno} | {type(e)} | {traceback.format_exc()}", file = sys.stderr)
+            sys.stderr.flush()
+            return ids, DopError(113, "Error in insert: integrity constraint violated.")
+        except Exception as e:
+            print(f"{int(time.time())} | {getframeinfo(currentframe()).filename} | "\
+                    f"{getframeinfo(currentframe()).lineno} | {type(e)} | {traceback.format_exc()}", file = sys.stderr)
+            sys.stderr.flush()
+            return ids, DopError(114, "Insert query error.")
+        return ids, DopError()
+
+    def _select_obj(self, model: Type[Model], where_clause: dict, logic_op: str = 'AND', 
+                    prepare: bool = False) -> Tuple[Union[list, Model, None], DopError]:
        
         try:
             base_query = """
             SELECT * FROM {}
             """.format(model.table_name())
+            # the rows are mapped to the model without intermediate dict
             data, err = self._sql_select(base_query,
                                          where_clause,
-                                         logic_op)
+                                         logic_op, 
+                                         prepare=prepare,
+                                         mapper=lambda cursor, rows: (columns(cursor), rows))
             
             if err.isError():
                 return None, err
-            if len(data) == 0:
+            names, rows = data
+            if len(rows) == 0:
                 return None, DopError(0, "Empty result set.")
         except Exception as e:
             print(f"{int(time.time())} | {getframeinfo(currentframe()).filename} | "\
@@ -1737,13 +2476,9 @@ class dbProviderPostgres(providerPersistence):
             return None, DopError(111, "An exception occurred during select operation.")
         try:
             # TODO try with schema load / postload
-            if isinstance(data, list) and len(data) > 1:
-                result = []
-                for element in data:
-                    tmp = model(**element)
-                    result.append(tmp)
-            else:
-                result = model(**data[0])
+            result = rows_to_models(model, names, rows)
+            if len(result) == 1:
+                result = result[0]
         except Exception as e:
             print(f"{int(time.time())} | {getframeinfo(currentframe()).filename} | "\
                     f"{getframeinfo(currentframe()).lineno} | {type(e)} | {traceback.format_exc()}", file = sys.stderr)
@@ -1751,9 +2486,9 @@ class dbProviderPostgres(providerPersistence):
             return None, DopError(112, "An exception occurred while mapping extracted data to model.")
         return result, DopError()
 
-    def _insert_obj(self, model, schema) -> Tuple[Union[int, None], DopError]:
+    def _insert_obj(self, model) -> Tuple[Union[int, None], DopError]:
         try:
-            obj = schema().dump(model)
+            obj = model.to_row()
             _id, err = self._sql_insert(model.table_name(), obj)
             if err.isError():
                 return None, err
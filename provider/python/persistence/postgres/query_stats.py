@@ -0,0 +1,104 @@
+#   SPDX-License-Identifier: Apache-2.0
+# © Copyright Ecosteer 2024
+
+#   ver:    1.0
+#   date:   18/10/2026
+
+"""
+Per query shape statistics of the postgres persistence provider.
+
+The shape of a query is its SQL text with the whitespace collapsed and the
+literals replaced by ?, so that the statements that differ only by their
+values (or by the layout of the text) are accounted together. For each shape:
+calls, errors, retries, rows, total and max latency, latency histogram.
+"""
+
+import re
+from threading import Lock
+
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r"\s+")
+
+
+def query_shape(query: str) -> str:
+    return _SPACES.sub(' ', _LITERALS.sub('?', str(query))).strip()
+
+
+class QueryStats:
+
+    # upper bounds (ms) of the buckets of the latency histogram, the last bucket is unbounded
+    BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+    MAX_SHAPES = 512        # the queries of further shapes are accounted as OTHER
+    OTHER = "<other>"
+
+    def __init__(self, max_shapes: int = MAX_SHAPES):
+        self._max_shapes = max_shapes
+        self._lock = Lock()
+        self._shapes = {}       # query text -> shape
+        self._entries = {}      # shape -> counters
+
+    def shape(self, query) -> str:
+        # the query texts are few (see sql_cache.SqlTextCache): their shape is computed once
+        text = str(query)
+        shape = self._shapes.get(text, None)
+        if shape is None:
+            shape = query_shape(text)
+            with self._lock:
+                if len(self._shapes) < 4 * self._max_shapes:
+                    self._shapes[text] = shape
+        return shape
+
+    def record(self, shape: str, elapsed_s: float, rows: int = 0, retries: int = 0, error: bool = False):
+        elapsed_ms = elapsed_s * 1000
+        bucket = len(self.BUCKETS_MS)
+        for idx, bound in enumerate(self.BUCKETS_MS):
+            if elapsed_ms <= bound:
+                bucket = idx
+                break
+        with self._lock:
+            entry = self._entries.get(shape, None)
+            if entry is None:
+                if len(self._entries) >= self._max_shapes:
+                    shape = self.OTHER
+                    entry = self._entries.get(shape, None)
+                if entry is None:
+                    entry = {"calls": 0, "errors": 0, "retries": 0, "rows": 0,
+                             "total_ms": 0.0, "max_ms": 0.0,
+                             "histogram": [0] * (len(self.BUCKETS_MS) + 1)}
+                    self._entries[shape] = entry
+            entry["calls"] += 1
+            entry["retries"] += retries
+            entry["rows"] += max(rows, 0)
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["histogram"][bucket] += 1
+            if error:
+                entry["errors"] += 1
+
+    def stats(self) -> dict:
+        """
+        shape -> counters, the histogram is a dict: "<=bound_ms" (and "inf") -> calls
+        """
+        labels = [f"<={bound}" for bound in self.BUCKETS_MS] + ["inf"]
+        with self._lock:
+            result = {}
+            for shape, entry in self._entries.items():
+                result[shape] = {
+                    "calls": entry["calls"],
+                    "errors": entry["errors"],
+                    "retries": entry["retries"],
+                    "rows": entry["rows"],
+                    "avg_ms": entry["total_ms"] / entry["calls"],
+                    "max_ms": entry["max_ms"],
+                    "histogram": dict(zip(labels, entry["histogram"]))
+                }
+            return result
+
+
+_shared_query_stats = QueryStats()
+
+
+def shared_query_stats() -> QueryStats:
+    # one set of statistics per process, shared by the providers of the lanes
+    return _shared_query_stats
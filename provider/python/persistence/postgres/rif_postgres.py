@@ -12,10 +12,6 @@ from common.python.error import DopError
 from common.python.rif.model.rif_models import RifTableName, RifAdvertisement, \
     RifAdvertisementInterest, RifPrivateMessage, RifSubscriptionNews
 
-from common.python.rif.model.rif_schemas import RifAdvertisementSchema, \
-    RifAdvertisementInterestSchema, RifPrivateMessageSchema, \
-    RifSubscriptionNewsSchema
-
 from provider.python.persistence.postgres.postgres_provider import  dbProviderPostgres
 from provider.python.persistence.postgres.postgres_provider import *
 
@@ -27,7 +23,7 @@ class RIFdbProviderPostgres(dbProviderPostgres):
     def insert_rif_advertisement(self, rif_advert: RifAdvertisement) \
         -> Tuple[Union[int, str, None], DopError]:
 
-        _id, err = self._insert_obj(rif_advert,  RifAdvertisementSchema)
+        _id, err = self._insert_obj(rif_advert)
         return _id, err
     
     def get_rif_advertisement(self, where: dict={}) \
@@ -39,7 +35,7 @@ class RIFdbProviderPostgres(dbProviderPostgres):
 
     def insert_rif_advert_interest(self, rif_advert_int: RifAdvertisementInterest) \
         -> Tuple[Union[int, str, None], DopError]:
-        _id, err = self._insert_obj(rif_advert_int,  RifAdvertisementInterestSchema)
+        _id, err = self._insert_obj(rif_advert_int)
         return _id, err
     
     def get_rif_advert_interest(self, where: dict={}) \
@@ -51,7 +47,7 @@ class RIFdbProviderPostgres(dbProviderPostgres):
     
     def insert_rif_priv_mess(self, rif_priv_mess: RifPrivateMessage) \
         -> Tuple[Union[int, str, None], DopError]:
-        _id, err = self._insert_obj(rif_priv_mess,  RifPrivateMessageSchema)
+        _id, err = self._insert_obj(rif_priv_mess)
         return _id, err
     
  
@@ -102,7 +98,7 @@ class RIFdbProviderPostgres(dbProviderPostgres):
 
     def insert_rif_subscription_news(self, rif_sub_news: RifSubscriptionNews)\
         -> Tuple[Union[int, str, None], DopError]:
-        _id, err = self._insert_obj(rif_sub_news,  RifSubscriptionNewsSchema)
+        _id, err = self._insert_obj(rif_sub_news)
         return _id, err
 
     def get_rif_subscription_news(self, where={}):
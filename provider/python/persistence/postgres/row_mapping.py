@@ -0,0 +1,40 @@
+#   SPDX-License-Identifier: Apache-2.0
+# © Copyright Ecosteer 2024
+
+#   ver:    1.0
+#   date:   18/10/2026
+
+"""
+Mapping of the rows of a result set to records (dict) and models.
+
+The column names are read once per result set (cursor.description) and
+every row is then mapped with dict(zip(columns, row)), instead of looking
+up cursor.description for every cell.
+"""
+
+from typing import List
+
+
+def columns(cursor) -> List[str]:
+    if cursor.description is None:
+        return []
+    return [d[0] for d in cursor.description]
+
+
+def row_to_dict(cursor, row) -> dict:
+    if not row:
+        return {}
+    return dict(zip(columns(cursor), row))
+
+
+def rows_to_dicts(cursor, rows) -> List[dict]:
+    names = columns(cursor)
+    return [dict(zip(names, row)) for row in rows]
+
+
+def rows_to_models(model, names: List[str], rows) -> list:
+    """
+    Map the rows to instances of model: the keyword arguments of the
+    model constructor are the column names of the result set
+    """
+    return [model(**dict(zip(names, row))) for row in rows]
@@ -0,0 +1,91 @@
+#   SPDX-License-Identifier: Apache-2.0
+# © Copyright Ecosteer 2024
+
+#   ver:    1.0
+#   date:   18/10/2026
+
+"""
+Caches of the SQL generated by the postgres persistence provider.
+
+SqlTextCache keeps the SQL text generated for each query shape, i.e.
+(kind, table/base query, column set, operator), so that the text of the
+select/update/insert statements is built once per shape.
+
+StatementCache keeps, for a connection, one cursor per hot query shape:
+pyodbc prepares the statement the first time it is executed on a cursor
+and reuses the prepared statement when the same SQL is executed again on
+that cursor (with the psqlODBC driver the statement is prepared on the
+server, thus it is not planned again at every execution).
+"""
+
+from collections import OrderedDict
+from threading import Lock
+
+
+class SqlTextCache:
+
+    DEFAULT_SIZE = 1024
+
+    def __init__(self, max_size: int = DEFAULT_SIZE):
+        self._max_size = max_size
+        self._lock = Lock()
+        self._texts = OrderedDict()     # shape -> SQL text
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, shape: tuple, build_fun) -> str:
+        """
+        Return the SQL text of the shape: build_fun() generates it on a miss
+        """
+        with self._lock:
+            text = self._texts.get(shape, None)
+            if text is not None:
+                self._hits += 1
+                self._texts.move_to_end(shape)
+                return text
+            self._misses += 1
+
+        text = build_fun()
+        with self._lock:
+            self._texts[shape] = text
+            while len(self._texts) > self._max_size:
+                self._texts.popitem(last=False)
+        return text
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._texts),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups > 0 else 0.0
+            }
+
+
+class StatementCache:
+    """
+    The prepared statements (cursors) of the hot query shapes of one connection
+    """
+
+    def __init__(self):
+        self._cursors = {}      # shape -> cursor
+
+    def cursor(self, shape: tuple, connection):
+        """
+        Return (cursor, reused): reused is False if the statement has still to be prepared
+        """
+        cursor = self._cursors.get(shape, None)
+        if cursor is not None:
+            return cursor, True
+        cursor = connection.cursor()
+        self._cursors[shape] = cursor
+        return cursor, False
+
+
+_shared_text_cache = SqlTextCache()
+
+
+def shared_sql_text_cache() -> SqlTextCache:
+    # the SQL text does not depend on the connection: one cache per process
+    return _shared_text_cache
@@ -20,6 +20,7 @@ from common.python.model.models import User, Transaction, Product, Session, \
 from common.python.model.models import ProductUsage
 from common.python.model.models import PurposeOfUsage, ProductSubscription
 from common.python.model.models import AccountRole
+from common.python.model.models import OutboxTransaction
 
 
 class providerPersistence(Provider):
@@ -32,6 +33,75 @@ class providerPersistence(Provider):
     # stopEvent 
     # ...
 
+
+    @property
+    def auth_cache(self):
+        """
+        AuthCache of the (session, auth_token) lookups, None if the provider does 
+        not cache them: the provider keeps it consistent with its own updates
+        """
+        return None
+
+    def pool_stats(self) -> dict:
+        """
+        Metrics of the connection pool (size, checkouts, wait times), 
+        empty if the provider does not pool its connections
+        """
+        return {}
+
+    def sql_cache_stats(self) -> dict:
+        """
+        Hit ratios of the SQL text and prepared statement caches,
+        empty if the provider does not cache them
+        """
+        return {}
+
+    def query_stats(self) -> dict:
+        """
+        Per query shape calls, errors, retries, rows and latency histogram,
+        empty if the provider does not instrument its queries
+        """
+        return {}
+
+    def circuit_stats(self) -> dict:
+        """
+        State and counters of the circuit breaker of the database,
+        empty if the provider does not have one
+        """
+        return {}
+
+    def available(self, timeout_s: float = 0) -> bool:
+        """
+        False if the database is known to be unavailable (the circuit is open):
+        the caller can wait up to timeout_s for it to be available again
+        """
+        return True
+
+    def set_read_only(self, read_only: bool):
+        """
+        The caller (e.g. a read-only processor) only reads: the provider can execute 
+        its selects on a read replica, as long as the transaction did not write
+        """
+        pass
+
+    def replica_stats(self) -> dict:
+        """
+        Lag and reads of the read replica, empty if the provider does not have one
+        """
+        return {}
+
+    def attach_logger(self, logger):
+        """
+        The logger provider of the slow queries and of the query budget warnings
+        """
+        pass
+
+    def set_query_context(self, label: str):
+        """
+        Label (e.g. the input event) of the queries of the next transaction,
+        reported with the slow queries and the query budget warnings
+        """
+        pass
     
     @abstractmethod
     def begin_transaction(self) -> DopError: 
@@ -60,6 +130,34 @@ class providerPersistence(Provider):
         """
         """
 
+    @abstractmethod
+    def create_outbox_transaction(self, outbox: OutboxTransaction) -> DopError:
+        """
+        Save the contract call to be sent by the submitter (within the transaction of the caller)
+        """
+
+    @abstractmethod
+    def claim_outbox_transaction(self) -> Tuple[dict, DopError]:
+        """
+        The oldest outbox transaction to be sent (pending or signed) whose retry delay
+        has elapsed, locked until the end of the transaction; {} if there is none
+        """
+
+    @abstractmethod
+    def update_outbox_transaction(self, outbox_id: int, status: int, tx_hash: str = None,
+                                  raw_tx: str = None, error: str = None, retry_s: int = 0) -> DopError:
+        """
+        Set the status (and tx_hash, raw_tx) of the outbox transaction; error: the attempt
+        failed (attempts is incremented), the transaction is retried in retry_s seconds
+        """
+
+    @abstractmethod
+    def bulk_insert(self, models: list) -> Tuple[list, DopError]: 
+        """
+        Insert many models (e.g. the news of many subscribers) with as few statements
+        as possible: returns the generated ids, in the order of the models
+        """
+
     @abstractmethod
     def create_product(self, product: Product, uuid: str) -> Tuple[int, DopError]: 
         """
@@ -123,16 +221,21 @@ class providerPersistence(Provider):
 
     
     @abstractmethod
-    def get_sets_products(self, account_id, subset, where: dict = None) \
+    def get_sets_products(self, account_id, subset, where: dict = None, limit=-1, offset=-1,
+                          keyset: bool = False, after: dict = None, page_size: int = 0) \
         -> Tuple[Union[dict, list, None], DopError]:
         """
+        keyset: rows ordered by (created_at, id), after: created_at and id of the last 
+        row of the previous page, page_size > 0: an iterator of pages is returned
         """
     
     
     @abstractmethod
-    def get_other_products(self, account_id, where: dict= None) \
+    def get_other_products(self, account_id, where: dict= None, limit=-1, offset=-1,
+                           keyset: bool = False, after: dict = None, page_size: int = 0) \
         -> Tuple[Union[dict, list, None], DopError]:
         """
+        see get_sets_products
         """
 
 
@@ -205,6 +308,19 @@ class providerPersistence(Provider):
         """
         """
 
+    def touch_session(self, session_id, last_updated) -> DopError:
+        """
+        Refresh the last_updated of a session: the provider may defer the write
+        (see session_last_touch)
+        """
+        return self.update_session(session_id, last_updated=last_updated)
+
+    def session_last_touch(self, session_id):
+        """
+        The last_updated of a session touched but not yet written, None if there is none
+        """
+        return None
+
 
 
     @abstractmethod
@@ -304,6 +420,22 @@ class providerPersistence(Provider):
         
         """
         """
+
+    @abstractmethod
+    def delete_product_subscriptions(self, subscription_ids: list) \
+                                    -> Tuple[list, DopError]:
+        """
+        Delete many subscriptions (and the product usages of their subscribers) 
+        with set-based statements: returns the deleted subscriptions (id, subscriber, product)
+        """
+
+    @abstractmethod
+    def delete_product_subscriptions_of_product(self, product_id, subscriber_id=None) \
+                                    -> Tuple[list, DopError]:
+        """
+        Delete all the subscriptions of a product (of one subscriber, if subscriber_id is set):
+        returns the deleted subscriptions (id, subscriber, product)
+        """
     
     @abstractmethod
     def insert_account_role(self, account_role: AccountRole) \
@@ -0,0 +1,89 @@
+#   SPDX-License-Identifier: Apache-2.0
+# © Copyright Ecosteer 2024
+
+#   ver:    1.0
+#   date:   18/10/2026
+
+"""
+Write-behind buffer of the session touches (session.last_updated).
+
+Every authenticated imperative refreshes the last_updated of its session:
+instead of updating the session row each time, the persistence provider
+records the latest touch of each session here and writes all of them with
+a single bulk update every few seconds (or as soon as enough sessions have
+been touched). Until it is flushed, a touch is visible through last_touch,
+which the expiry checks consult together with the persisted last_updated.
+"""
+
+import time
+from threading import Lock
+
+
+class SessionTouchBuffer:
+
+    DEFAULT_INTERVAL = 5        # seconds
+    DEFAULT_MAX_SESSIONS = 256
+
+    def __init__(self, interval_s: float = DEFAULT_INTERVAL, max_sessions: int = DEFAULT_MAX_SESSIONS):
+        self._interval_s = interval_s
+        self._max_sessions = max_sessions
+        self._lock = Lock()
+        self._touches = {}              # Session.id -> latest last_updated (datetime)
+        self._flushed_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._touches)
+
+    def touch(self, session_id, last_updated):
+        with self._lock:
+            current = self._touches.get(session_id, None)
+            if current is None or current < last_updated:
+                self._touches[session_id] = last_updated
+
+    def last_touch(self, session_id):
+        # the buffered last_updated of the session, None if there is none
+        with self._lock:
+            return self._touches.get(session_id, None)
+
+    def forget(self, session_id):
+        # the session has been deleted
+        with self._lock:
+            self._touches.pop(session_id, None)
+
+    def due(self) -> bool:
+        with self._lock:
+            if len(self._touches) == 0:
+                return False
+            return len(self._touches) >= self._max_sessions or \
+                time.monotonic() - self._flushed_at >= self._interval_s
+
+    def drain(self) -> dict:
+        # take the touches to be flushed: only one caller gets each of them
+        with self._lock:
+            touches = self._touches
+            self._touches = {}
+            self._flushed_at = time.monotonic()
+            return touches
+
+    def restore(self, touches: dict):
+        # give back the touches of a failed flush, keeping the most recent ones
+        for session_id, last_updated in touches.items():
+            self.touch(session_id, last_updated)
+
+
+_shared_lock = Lock()
+_shared = {}
+
+
+def shared_session_touch_buffer(interval_s: float = SessionTouchBuffer.DEFAULT_INTERVAL,
+                                max_sessions: int = SessionTouchBuffer.DEFAULT_MAX_SESSIONS) -> SessionTouchBuffer:
+    """
+    Return the buffer shared by all the persistence providers of the process
+    configured with the same flush policy (e.g. the providers of the execution lanes)
+    """
+    with _shared_lock:
+        buffer = _shared.get((interval_s, max_sessions), None)
+        if buffer is None:
+            buffer = SessionTouchBuffer(interval_s, max_sessions)
+            _shared[(interval_s, max_sessions)] = buffer
+        return buffer
@@ -8,18 +8,136 @@ from common.python.error import DopError
 from provider.python.provider import Provider
 
 
+class InputDelivery:
+    """
+    A message delivered by an input provider that has to be settled by the
+    consumer once it has been processed: 
+
+    - settle(DopError()): the message was processed (e.g. the transaction was committed) 
+                          and can be acknowledged;
+    - settle(err), err recoverable: the processing failed because of an infrastructure 
+                          error, the message is delivered again (up to max_retries times);
+    - settle(err), err not recoverable (or no retries left): the message is a poison 
+                          message, it is dead-lettered;
+    - defer(), then settle(err): the message was not processed (e.g. the database is 
+                          unavailable), it is delivered again without counting a retry.
+
+    settle can be called by any thread, only the first call is effective
+    """
+
+    ACK = 0
+    RETRY = 1
+    DEAD = 2
+    REQUEUE = 3
+
+    def __init__(self, tag, redelivered: bool, retries: int, max_retries: int, settle_fun):
+        self._tag = tag
+        self._redelivered = redelivered
+        self._retries = retries
+        self._max_retries = max_retries
+        self._settle_fun = settle_fun
+        self._settled = False
+        self._deferred = False
+        self._err = DopError()
+
+    @property
+    def tag(self):
+        return self._tag
+
+    @property
+    def redelivered(self) -> bool:
+        return self._redelivered
+
+    @property
+    def retries(self) -> int:
+        return self._retries
+
+    @property
+    def err(self) -> DopError:
+        return self._err
+
+    def defer(self):
+        self._deferred = True
+
+    def will_retry(self, err: DopError) -> bool:
+        if err.isError() and self._deferred:
+            return True
+        return err.isError() and err.isRecoverable() and self._retries < self._max_retries
+
+    def settle(self, err: DopError = None):
+        if self._settled:
+            return
+        self._settled = True
+        if err is None:
+            err = DopError()
+        self._err = err
+
+        if not err.isError():
+            outcome = InputDelivery.ACK
+        elif self._deferred:
+            outcome = InputDelivery.REQUEUE
+        elif self.will_retry(err):
+            outcome = InputDelivery.RETRY
+        else:
+            outcome = InputDelivery.DEAD
+        self._settle_fun(self, outcome)
+
+
 class inputPresentationProvider(Provider):
 
 
     def __init__(self):
         super().__init__()
+        #   callback function: on_data_batch_fun(message_topic: str, message_payloads: list, userdata)
+        self._on_data_batch_fun = None
+        #   callback function: on_delivery_fun(message_topic: str, message_payload: str, delivery: InputDelivery, userdata)
+        self._on_delivery_fun = None
 
     @abstractmethod
     def read(self) -> DopError:
         """Reads a message"""
+
+    def set_on_data_batch_callback(self, fun_callback):
+        """
+        assign the user defined callback for batches of messages
+        """
+        self._on_data_batch_fun = fun_callback
+
+    def _on_data_batch(self, event_topic: str, event_msgs: list):
+        """
+        this method has to be called by the inherited class to notify
+        the availability of a batch of messages: when the batch callback
+        returns, all the messages of the batch have been processed; 
+        if no batch callback is assigned, the messages are notified one 
+        at a time with the data callback
+        """
+        if self._on_data_batch_fun != None:
+            self._on_data_batch_fun(event_topic, event_msgs, self._userdata)
+            return
+        for event_msg in event_msgs:
+            self._on_data(event_topic, event_msg)
  
 
     #   init
     #   open
     #   close
 
+    def set_on_delivery_callback(self, fun_callback):
+        """
+        assign the user defined callback for messages that are settled 
+        by the consumer (see InputDelivery)
+        """
+        self._on_delivery_fun = fun_callback
+
+    def _on_delivery(self, event_topic: str, event_msg: str, delivery: InputDelivery):
+        """
+        this method has to be called by the inherited class to notify the 
+        availability of a message that has to be settled by the consumer; 
+        if no delivery callback is assigned, the message is notified with 
+        the data callback and then acknowledged
+        """
+        if self._on_delivery_fun != None:
+            self._on_delivery_fun(event_topic, event_msg, delivery, self._userdata)
+            return
+        self._on_data(event_topic, event_msg)
+        delivery.settle(DopError())
@@ -1,7 +1,6 @@
 #   SPDX-License-Identifier: Apache-2.0
 # © Copyright Ecosteer 2024
 
-import datetime
 from typing import Tuple, List
 
 
@@ -50,6 +49,18 @@ class AuthenticationCheckProcessor(ProcessorProvider):
 
         session = header.session
         token = payload.get('auth_token', None)
+
+        # the (session, token) pair is looked up in the cache of the provider first
+        auth_cache = db.auth_cache
+        cached = auth_cache.get(session, token) if auth_cache is not None else None
+        if cached is not None:
+            session_obj, user = cached
+            if self._is_session_expired(session_obj, db):
+                err = DopUtils.create_dop_error(DopUtils.ERR_SESSION_EXPIRED)
+                err.notifiable = False
+                return err
+            data_stack.push(User.__name__, user)
+            return DopError()
         
         session_obj, perr = db.get_session(where={'token': token,
                                             'value': event.header.session},
@@ -67,7 +78,7 @@ class AuthenticationCheckProcessor(ProcessorProvider):
             return err
         
         # Check that the session is not expired
-        if self._is_session_expired(session_obj):
+        if self._is_session_expired(session_obj, db):
             err = DopUtils.create_dop_error(DopUtils.ERR_SESSION_EXPIRED)
             err.notifiable = False
             
@@ -82,16 +93,13 @@ class AuthenticationCheckProcessor(ProcessorProvider):
                 err.perr = perr 
             return err 
         
-        
+        if auth_cache is not None:
+            auth_cache.put(session, token, session_obj, user)
         data_stack.push(User.__name__, user)
         return DopError()
     
     
-    def _is_session_expired(self, session) -> bool:
+    def _is_session_expired(self, session, db) -> bool:
         # TODO MAX_AGE can be a configuration value of this processor
-        now = datetime.datetime.utcnow()
-        difference = (now - session.last_updated).total_seconds()
-        if difference > DopUtils.MAX_AGE:
-            # expired
-            return True
-        return False
+        # the touches not yet written by the provider (write-behind) are taken into account
+        return DopUtils.is_session_expired(session, db)
@@ -9,7 +9,6 @@ from common.python.error import DopError
 from common.python.event import DopEvent, DopEventHeader, DopEventPayload
 from common.python.new_processor_env import ProcessorEnvs
 from common.python.model.models import Session, EncryptedSession
-from common.python.model.schemas import EncryptedSessionSchema
 from common.python.utils import DopUtils
 
 
@@ -140,7 +139,7 @@ class DopCipherSuiteSelectionProcessor(ProcessorProvider):
         )
 
         
-        perr = db.update_encrypted_session(session_id,**EncryptedSessionSchema().dump(encrypted_session_obj))
+        perr = db.update_encrypted_session(session_id,**encrypted_session_obj.to_row())
         if perr.isError():
             # infrastructural error
             err = DopError(DopUtils.ERR_PL_ENC_SESSION_NOT_CREATED['id'], DopUtils.ERR_PL_ENC_SESSION_NOT_CREATED['msg']) 
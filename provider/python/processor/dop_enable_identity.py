@@ -12,8 +12,7 @@ import json
 from provider.python.processor.provider_processor import ProcessorProvider 
 from common.python.error import DopError, LogSeverity
 from common.python.event import DopEvent, DopEventHeader, DopEventPayload
-from common.python.model.models import User, Transaction
-from common.python.model.schemas import UserSchema
+from common.python.model.models import User, Transaction, OutboxTransaction
 from common.python.new_processor_env import ProcessorEnvs
 
 
@@ -164,12 +163,15 @@ class DopEnableIdentityProcessor(ProcessorProvider):
         # TODO: extend account table to save 'secret' as well; blk_passw is used as proxy_secret 
         # ATTENTION: no two users can have the same 'subject' - so use a uuid instead 
         # as parameter to the blk provider call
-        perr, tid = blk.memberCreate(_id, "secret", blk_passw) 
-
-        if perr.isError():
-            err = DopUtils.create_dop_error(DopUtils.ERR_IP_SIGNUP)
-            err.perr = perr
-            return err
+        call_args = [_id, "secret", blk_passw]
+        tid = None
+        if not self.outbox:
+            perr, tid = blk.memberCreate(*call_args) 
+
+            if perr.isError():
+                err = DopUtils.create_dop_error(DopUtils.ERR_IP_SIGNUP)
+                err.perr = perr
+                return err
         
 
         
@@ -185,7 +187,7 @@ class DopEnableIdentityProcessor(ProcessorProvider):
                 name=screen_name,
                 blk_address=address
             )
-        data = UserSchema().dump(new_user)
+        data = new_user.to_dict()
         data['original_session']  = event.header.session
 
         transaction = Transaction(
@@ -197,7 +199,11 @@ class DopEnableIdentityProcessor(ProcessorProvider):
         )
 
         # save tid and data about user in blk_transaction table  
-        perr = db.create_transaction(transaction)
+        if self.outbox:
+            # sent by the submitter component, that saves the transaction with its hash
+            perr = db.create_outbox_transaction(OutboxTransaction.of(transaction, 'memberCreate', call_args))
+        else:
+            perr = db.create_transaction(transaction)
         if perr.isError():
             err = DopUtils.create_dop_error(DopUtils.ERR_PL_TRANSACT_SAVE)
             err.perr = perr
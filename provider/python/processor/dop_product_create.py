@@ -17,8 +17,7 @@ from provider.python.processor.provider_processor import ProcessorProvider
 from common.python.error import DopError
 from common.python.event import DopEvent, DopEventHeader, DopEventPayload
 
-from common.python.model.models import  User, Product, Transaction
-from common.python.model.schemas import ProductSchema
+from common.python.model.models import  User, Product, Transaction, OutboxTransaction
 
 from common.python.new_processor_env import ProcessorEnvs
 from common.python.utils import DopUtils, TransactionEvents as te
@@ -161,29 +160,30 @@ class DopProductCreateProcessor(ProcessorProvider):
         
         # instead of returning the smart contract address, return the tid 
 
-        perr, tx_hash = blk.productCreate(
+        call_args = [
             uuid_str, 
             publisher_address, 
             publisher_address,
             user.blk_password, 
             price, 
             period
-        )
-        #err hex 64 - decimal 100 - member does not exist?
-
-        if perr.isError():
-            err = DopUtils.create_dop_error(DopUtils.ERR_IP_DEPLOY)
-            err.perr = perr
-            return err
+        ]
+        tx_hash = None
+        if not self.outbox:
+            perr, tx_hash = blk.productCreate(*call_args)
+            #err hex 64 - decimal 100 - member does not exist?
+
+            if perr.isError():
+                err = DopUtils.create_dop_error(DopUtils.ERR_IP_DEPLOY)
+                err.perr = perr
+                return err
         
         # Save the tx_hash(transaction id) in the database, together with 
         # any other information needed for the completion of the request 
         
 
         product = Product(**obj)
-        data = ProductSchema().dumps(product)
-        
-        data_js = json.loads(data)
+        data_js = product.to_dict()
         data_js["original_session"] = event.header.session
 
         transaction = Transaction(
@@ -194,7 +194,11 @@ class DopProductCreateProcessor(ProcessorProvider):
             params=json.dumps(data_js)
         )
 
-        perr = db.create_transaction(transaction)
+        if self.outbox:
+            # sent by the submitter component, that saves the transaction with its hash
+            perr = db.create_outbox_transaction(OutboxTransaction.of(transaction, 'productCreate', call_args))
+        else:
+            perr = db.create_transaction(transaction)
         if perr.isError():
             err = DopUtils.create_dop_error(DopUtils.ERR_PL_TRANSACT_SAVE)
             err.perr = perr
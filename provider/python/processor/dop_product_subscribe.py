@@ -14,7 +14,7 @@ from common.python.error import DopError
 from common.python.event import DopEvent, DopEventHeader, DopEventPayload
 from common.python.new_processor_env import ProcessorEnvs
 from common.python.utils import DopUtils, BlockchainEvents as be
-from common.python.model.models import Transaction, User
+from common.python.model.models import Transaction, User, OutboxTransaction
 
 from common.python.model.models import PurposeOfUsage, ProductSubscription
 
@@ -178,17 +178,20 @@ class DopProductSubscribeProcessor(ProcessorProvider):
         
         perr, sid_address = blk.marketplaceAddress(subscription_id)
 
-        perr, transaction_hash = blk.subscriptionCreate(
+        call_args = [
                 subscription_id,        #   application layer address of the new subscription
                 product_addr,
                 subscriber_addr,
                 secret
-        )
-
-        if perr.isError():
-            err = DopUtils.create_dop_error(DopUtils.ERR_IP_SUB)
-            err.perr = perr 
-            return err
+        ]
+        transaction_hash = None
+        if not self.outbox:
+            perr, transaction_hash = blk.subscriptionCreate(*call_args)
+
+            if perr.isError():
+                err = DopUtils.create_dop_error(DopUtils.ERR_IP_SUB)
+                err.perr = perr 
+                return err
         
         # In the params saved into database, I need the data 
         # to be used in ProductSubscription
@@ -210,7 +213,11 @@ class DopProductSubscribeProcessor(ProcessorProvider):
             params=data
         )
 
-        perr = db.create_transaction(transaction)
+        if self.outbox:
+            # sent by the submitter component, that saves the transaction with its hash
+            perr = db.create_outbox_transaction(OutboxTransaction.of(transaction, 'subscriptionCreate', call_args))
+        else:
+            perr = db.create_transaction(transaction)
         if perr.isError():
             err = DopUtils.create_dop_error(DopUtils.ERR_PL_TRANSACT_SAVE)
             err.perr = perr
@@ -151,8 +151,12 @@ class DopProductSubscriptionsProcessor(ProcessorProvider):
     
         whole_visibility = (isOwner or query_t == 'sub')
 
+        # blk_info of all the subscriptions, read with one request to the intermediation platform
+        blk_infos = blk.batch_call([('subscriptionInfo', (subscription_addr, user.blk_address, user.blk_password))
+                                    for subscription_addr in subscriptions])
+
         updated_subscriptions = []
-        for subscription_addr in subscriptions:
+        for subscription_addr, (blk_err, blk_info) in zip(subscriptions, blk_infos):
             # retrieve from db and from blk info about this subscription;  
             # NOTE table subscription was extended in order to save the blk address 
 
@@ -183,9 +187,7 @@ class DopProductSubscriptionsProcessor(ProcessorProvider):
                 print(subscription_addr)
 
             # blk_info product, subscriber, tog, status -- need only tog, status
-            perr, blk_info = blk.subscriptionInfo(subscription_addr, user.blk_address, user.blk_password)
-            
-            if not perr.isError():
+            if not blk_err.isError():
                 
                 prod_blk = blk_info.pop('product')
                 # Substitute addr of subscriber with worker id of subscriber 
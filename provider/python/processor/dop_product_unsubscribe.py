@@ -14,7 +14,7 @@ from common.python.error import DopError
 from common.python.event import DopEvent, DopEventHeader, DopEventPayload
 from common.python.new_processor_env import ProcessorEnvs
 from common.python.utils import DopUtils, BlockchainEvents as be
-from common.python.model.models import Transaction, User
+from common.python.model.models import Transaction, User, OutboxTransaction
 
 
 
@@ -172,17 +172,20 @@ class DopProductUnsubscribeProcessor(ProcessorProvider):
         #    subscriber_pass,
         #    product_address
         #    )
-        perr, transaction_hash = blk.subscriptionDelete(
+        call_args = [
             subscription_addr, 
             product_address,
             subscriber_address, 
             subscriber_pass
-        )
-
-        if perr.isError():
-            err = DopUtils.create_dop_error(DopUtils.ERR_IP_UNSUB)
-            err.perr = perr
-            return err
+        ]
+        transaction_hash = None
+        if not self.outbox:
+            perr, transaction_hash = blk.subscriptionDelete(*call_args)
+
+            if perr.isError():
+                err = DopUtils.create_dop_error(DopUtils.ERR_IP_UNSUB)
+                err.perr = perr
+                return err
         
         data = json.dumps({"subscription_id": subscription_id,
                            "subscription_address" : subscription_addr,
@@ -198,7 +201,11 @@ class DopProductUnsubscribeProcessor(ProcessorProvider):
             params = data
         )
 
-        perr = db.create_transaction(transaction)
+        if self.outbox:
+            # sent by the submitter component, that saves the transaction with its hash
+            perr = db.create_outbox_transaction(OutboxTransaction.of(transaction, 'subscriptionDelete', call_args))
+        else:
+            perr = db.create_transaction(transaction)
         if perr.isError():
             err = DopUtils.create_dop_error(DopUtils.ERR_PL_TRANSACT_SAVE)
             err.perr = perr
@@ -20,13 +20,28 @@ from common.python.utils import DopUtils
 
 class DopProductsListProcessor(ProcessorProvider):
 
+    PAGE_SIZE = 100     # default size of the pages of a streamed (not paginated) list
+
     def __init__(self):
         super().__init__()
         self._config = ""
         self._event_type = DopEvent.DOP_PRODUCTS_LIST
+        self._page_size = DopProductsListProcessor.PAGE_SIZE
 
     def init(self, config: str) -> DopError:
+        """
+        config (optional): "page_size=100;"
+        """
         self._config = config
+        err, conf = DopUtils.config_to_dict(config)
+        if err.isError():
+            return err
+        try:
+            _, self._page_size = DopUtils.config_get_int(conf, ['page_size'], DopProductsListProcessor.PAGE_SIZE)
+        except ValueError:
+            return DopError(1, "page_size must be an integer.")
+        if self._page_size <= 0:
+            return DopError(1, "page_size must be greater than zero.")
         return DopError()
 
     def open(self) -> DopError:
@@ -57,12 +72,24 @@ class DopProductsListProcessor(ProcessorProvider):
             "task":"1",
             "event":"dop_products_list",
             "params":   {
-                            "set_range":    {"from":"0", "to":"50"},
+                            "set_range":    {"from":"0", "to":"50"} 
+                                            | {"size": "50", "after": {"created_at": "...", "id": "..."}},
                             "type": "all"|"other"|"published"|"subscribed",
                             "filter": { 'id': ''},
                             "auth_token":   "890fghja%%432?98"
                         }
         }
+
+        set_range: 
+        - from/to: offset pagination
+        - size/after: keyset pagination on (created_at, id), after is the "next" 
+          property of the previous page (omitted for the first page); the reply 
+          carries "next" as long as there may be more products
+        - no set_range: the whole list is returned as a sequence of notifications 
+          of (at most) page_size products, with the properties "page" and "last";
+          the pages are notified while the result set is being read (the 
+          persistence connection has to set UseDeclareFetch=1 and Fetch=page_size 
+          for the rows to be fetched from the server a page at a time)
         """
 
         if self._event_type == event.header.event:
@@ -96,14 +123,28 @@ class DopProductsListProcessor(ProcessorProvider):
         
         
         filter = payload.get('filter', None)
-        pagination = payload.get('set_range',  {"from":"-1", "to":"-1"})
-        fr = int(pagination.get('from',-1))  # offset
-        to = int(pagination.get('to',-1))    # limit is to - fr + 1
-        
-        if fr != -1 and to != -1:
-            limit = to - fr + 1
+        pagination = payload.get('set_range', None)
+        keyset = pagination is not None and ('size' in pagination or 'after' in pagination)
+        after = None
+        page_size = 0
+        if keyset:
+            limit = int(pagination.get('size', self._page_size))
+            after = pagination.get('after', None)
+            fr = -1
+        elif pagination is not None:
+            fr = int(pagination.get('from',-1))  # offset
+            to = int(pagination.get('to',-1))    # limit is to - fr + 1
+            
+            if fr != -1 and to != -1:
+                limit = to - fr + 1
+            else:
+                limit = -1
         else:
+            # no pagination: the result set is streamed in pages
+            fr = -1
             limit = -1
+            keyset = True
+            page_size = self._page_size
 
         # type of query: all, published, other, set
 
@@ -126,14 +167,15 @@ class DopProductsListProcessor(ProcessorProvider):
             type_q="all"       
 
         if not (filter.get('id', None) and len(filter.values()) == 1):
+            page = {"limit": limit, "offset": fr, "keyset": keyset, "after": after, "page_size": page_size}
             if type_q == "published" or type_q == "subscribed":
-                products, perr = db.get_sets_products(user.id, subset= {"set":type_q}, where=filter) 
+                products, perr = db.get_sets_products(user.id, subset= {"set":type_q}, where=filter, **page) 
             
             elif type_q == "other":
-                products, perr =  db.get_other_products(user.id, where = filter) 
+                products, perr =  db.get_other_products(user.id, where = filter, **page) 
 
             elif type_q == 'all':
-                products, perr = db.get_all_products(where = filter, limit = limit, offset = fr)
+                products, perr = db.get_all_products(where = filter, **page)
 
             else: 
                 envs.events.push(header.event, DopEvent(header, DopEventPayload({
@@ -146,6 +188,8 @@ class DopProductsListProcessor(ProcessorProvider):
         else: 
             # FILTER: ONLY ID 
             # Get a detailed product with all the attributes
+            keyset = False
+            page_size = 0
             is_subscriber = False
             products_subscriber = None
            
@@ -181,33 +225,76 @@ class DopProductsListProcessor(ProcessorProvider):
             })))
             return err
 
+        if page_size > 0:
+            return self._push_pages(envs, header, products, filter, type_q, phase)
+
+        results = self._results(products)
+        reply = {
+                    "err": 0, 
+                    "filter" : filter, 
+                    "phase": phase,
+                    "type": type_q, 
+                    "set": results
+                }
+        if keyset:
+            # there may be more products only if the page is full
+            last = results[-1] if len(results) > 0 else None
+            reply["next"] = {"created_at": last.get('created_at'), "id": str(last.get('id'))} \
+                if last is not None and limit != -1 and len(results) >= limit else None
+
+        envs.events.push(header.event, DopEvent(header, DopEventPayload(reply))) 
+        return DopError()
+
+    def _push_pages(self, envs: ProcessorEnvs, header: DopEventHeader, pages, filter, type_q: str, phase: int) \
+            -> DopError:
+        # one notification for each page of the streamed result set, the last one is flagged:
+        # a page is notified as soon as the next one is fetched (while the result set is 
+        # being read), or pushed onto the events stack if the worker cannot notify it
+        index = 0
+        current = None
+        for page in pages:
+            if current is not None:
+                err = self._push_page(envs, header, current, filter, type_q, phase, index, False)
+                if err.isError():
+                    return err
+                index += 1
+            current = page
+        return self._push_page(envs, header, current if current is not None else [], filter, type_q, phase, index, True)
+
+    def _push_page(self, envs: ProcessorEnvs, header: DopEventHeader, products, filter, type_q: str, 
+                   phase: int, index: int, last: bool) -> DopError:
+        event = DopEvent(header,
+                    DopEventPayload({
+                        "err": 0, 
+                        "filter" : filter, 
+                        "phase": phase,
+                        "type": type_q, 
+                        "set": self._results(products),
+                        "page": index,
+                        "last": last
+                }))
+        if envs.notify is not None:
+            return envs.notify(header.event, event)
+        envs.events.push(header.event, event)
+        return DopError()
+
+    def _results(self, products) -> list:
         products = DopUtils.serialize_datetime(products)
 
-        
         if not isinstance(products, list):
             
             product = products
             if 'blk_address' in product:
                 product.pop('blk_address')
 
-            results = [product]
-        else:
-            results = []
-            for product in products:
-
-                mkt_product = product
-                if 'blk_address' in mkt_product:
-                    mkt_product.pop('blk_address')
-                    
-                results.append(mkt_product)
-    
-        envs.events.push(header.event, DopEvent(header,
-                    DopEventPayload({
-                        "err": 0, 
-                        "filter" : filter, 
-                        "phase": phase,
-                        "type": type_q, 
-                        "set": results
-                }))) 
-        return DopError()
+            return [product]
+
+        results = []
+        for product in products:
 
+            mkt_product = product
+            if 'blk_address' in mkt_product:
+                mkt_product.pop('blk_address')
+                
+            results.append(mkt_product)
+        return results
@@ -20,7 +20,7 @@ class DopRecipientSetProcessor(ProcessorProvider):
     def __init__(self):
         super().__init__()
         self._config = ""
-        self._event_types = {"dop_recipient_set", "dop_enable_identity"}
+        self._event_type = {"dop_recipient_set", "dop_enable_identity"}
 
     def init(self, config: str) -> DopError:
         self._config = config
@@ -67,7 +67,7 @@ class DopRecipientSetProcessor(ProcessorProvider):
         """
 
 
-        if event.header.event in self._event_types:
+        if event.header.event in self._event_type:
             
             return self._handle_event(event, envs)
 
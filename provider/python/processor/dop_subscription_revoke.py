@@ -12,7 +12,7 @@ from provider.python.processor.provider_processor import ProcessorProvider
 
 from common.python.error import DopError
 from common.python.event import DopEvent, DopEventHeader, DopEventPayload
-from common.python.model.models import ProductSubscription, Transaction, User
+from common.python.model.models import ProductSubscription, Transaction, User, OutboxTransaction
 from common.python.new_processor_env import ProcessorEnvs
 from common.python.utils import DopUtils,  BlockchainEvents as be
 
@@ -161,12 +161,15 @@ class DopSubscriptionRevokeProcessor(ProcessorProvider):
 
         # ALL GOOD, Revoke
         
-        perr, tx_hash = blk.subscriptionRevoke(subscription.blk_address, publisher.blk_password)
-
-        if perr.isError():
-            err = DopUtils.create_dop_error(DopUtils.ERR_IP_GRANT)
-            err.perr = perr
-            return err
+        call_args = [subscription.blk_address, publisher.blk_password]
+        tx_hash = None
+        if not self.outbox:
+            perr, tx_hash = blk.subscriptionRevoke(*call_args)
+
+            if perr.isError():
+                err = DopUtils.create_dop_error(DopUtils.ERR_IP_GRANT)
+                err.perr = perr
+                return err
         
         data = {
             "subscription_id": subscription_id,
@@ -182,7 +185,11 @@ class DopSubscriptionRevokeProcessor(ProcessorProvider):
             params = json.dumps(data)
         ) 
         
-        perr = db.create_transaction(transaction)
+        if self.outbox:
+            # sent by the submitter component, that saves the transaction with its hash
+            perr = db.create_outbox_transaction(OutboxTransaction.of(transaction, 'subscriptionRevoke', call_args))
+        else:
+            perr = db.create_transaction(transaction)
         if perr.isError():
             err = DopUtils.create_dop_error(DopUtils.ERR_PL_DEPOSIT)
             err.perr = perr
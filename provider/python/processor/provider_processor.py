@@ -14,6 +14,33 @@ class ProcessorProvider(Provider):
         super().__init__()
         self._config = ""
         self._event_type = None
+        self._read_only = False
+        self._outbox = False
+
+    @property
+    def read_only(self) -> bool:
+        """
+        True if the processor only reads ("read_only" in the configuration of the 
+        processor or of the pipeline): its selects can be executed by the read replica
+        """
+        return self._read_only
+
+    @read_only.setter
+    def read_only(self, read_only: bool):
+        self._read_only = read_only
+
+    @property
+    def outbox(self) -> bool:
+        """
+        True if the processor saves its contract calls in the outbox ("outbox" in 
+        the configuration of the processor) instead of sending the transactions:
+        they are sent by the submitter component
+        """
+        return self._outbox
+
+    @outbox.setter
+    def outbox(self, outbox: bool):
+        self._outbox = outbox
 
     # on_error
     # on_data
@@ -34,4 +61,34 @@ class ProcessorProvider(Provider):
         :params envs
 
         Return DopError: an indication of success or failure
-        """
\ No newline at end of file
+        """
+
+    def event_types(self):
+        """
+        Return the set of the event types handled by the processor (declared 
+        by _event_type), or None if the processor handles any event ("*")
+        """
+        if self._event_type is None or self._event_type == "*":
+            return None
+        if isinstance(self._event_type, str):
+            return {self._event_type}
+        return set(self._event_type)
+
+    def event_ids(self):
+        """
+        Return the set of the blockchain event_ids (of an event_set) consumed by 
+        the processor (declared by _event_id_content), or None if the processor 
+        does not consume blockchain logs
+        """
+        event_id_content = getattr(self, "_event_id_content", None)
+        if event_id_content is None:
+            return None
+        if isinstance(event_id_content, str):
+            return {event_id_content}
+        return set(event_id_content)
+    #   A processor may also define the coroutine
+    #
+    #       async def handle_event_async(self, event: DopEvent, envs: ProcessorEnvs) -> DopError
+    #
+    #   which is awaited by the asyncio runtime of the worker (doof_worker_async) in place 
+    #   of handle_event; processors without it are run by the runtime in a thread pool.
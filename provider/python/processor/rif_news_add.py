@@ -124,6 +124,7 @@ class RifNewsAddProcessor(ProcessorProvider):
             # Q: Does this ever happen?
             print("Multiple pieces of info in 1 log event.")
 
+        news = []
         for p in to_proc: 
             try: 
                 ps = envs.data.get(ProductSubscription.__name__)[0]
@@ -154,10 +155,11 @@ class RifNewsAddProcessor(ProcessorProvider):
                 send_to = product.get('publisher') # owner of product
             )
 
-            _id, perr = db.insert_rif_subscription_news(sub_news)
+            news.append(sub_news)
 
-            if perr.isError():
-                return perr 
-            
+        # all the news of the log event with one statement
+        _ids, perr = db.bulk_insert(news)
+        if perr.isError():
+            return perr 
 
         return DopError()
@@ -9,7 +9,6 @@ from provider.python.processor.provider_processor import ProcessorProvider
 from common.python.error import DopError
 from common.python.event import DopEvent, DopEventHeader, DopEventPayload
 from common.python.model.models import Session
-from common.python.model.schemas import SessionSchema
 from common.python.new_processor_env import ProcessorEnvs
 from common.python.utils import DopUtils
 
@@ -43,30 +42,42 @@ class UpdateSessionProcessor(ProcessorProvider):
         session = event.header.session
         token = payload.get('auth_token', None)
         
-        session_obj, perr = db.get_session(where={'token': token,
-                                            'value': event.header.session},
-                                    )
-        if perr.isError():
-            perr.notifiable = False 
-            return perr 
+        auth_cache = db.auth_cache
+        cached = auth_cache.get(session, token) if auth_cache is not None else None
+        if cached is not None:
+            session_obj = cached[0]
+        else:
+            session_obj, perr = db.get_session(where={'token': token,
+                                                'value': event.header.session},
+                                        )
+            if perr.isError():
+                perr.notifiable = False 
+                return perr 
         if session_obj is None:
             err = DopError(1)
             err.notifiable = False
             return err
         
-        update = {
-            "last_updated":datetime.utcnow()
-        } 
-        session_update = Session(
-            client=session_obj.client,
-            value=session,
-            last_updated=datetime.utcnow()
-        )
+        last_updated = datetime.utcnow()
 
-        perr = db.update_session(session_obj.id, **SessionSchema().dump(session_update))
+        # the provider may coalesce the touches of the session (write-behind)
+        perr = db.touch_session(session_obj.id, last_updated)
         if perr.isError():
             return perr 
 
+        # cache the refreshed session
+        if cached is not None:
+            session_update = Session(
+                id=session_obj.id,
+                client=session_obj.client,
+                value=session,
+                token=session_obj.token,
+                status=session_obj.status,
+                created_at=session_obj.created_at,
+                last_updated=last_updated
+            )
+            auth_cache.put(session, token, session_update, cached[1])
+
         return DopError()
     
     
\ No newline at end of file